@@ -1,14 +1,112 @@
 import os
-
-import ollama
-from sentence_transformers import SentenceTransformer
+import threading
 
 input_dir = os.path.join("data", "input")
 output_dir = os.path.join("data", "output")
+cache_dir = os.path.join("data", "cache")
 
 os.makedirs(input_dir, exist_ok=True)
 os.makedirs(output_dir, exist_ok=True)
 
-model = SentenceTransformer("emrecan/bert-base-turkish-cased-mean-nli-stsb-tr")
+# html_icerik_*_uyumu.csv tam tabloları (parça × sorgu) yazılsın mı? Top-K dosyaları her durumda
+# doğrudan skor matrisinden üretilir; WRITE_FULL_TABLES=0 tam tabloları atlar (G/Ç ve bellek K ile
+# büyür) — rakip_analiz, onnx_parite, vektor_indeksi --bench ve sorgu.py/niyet.py bu tabloları okur.
+write_full_tables = os.getenv("WRITE_FULL_TABLES", "1") != "0"
+# Tam tabloların biçimi: "csv" | "parquet" (sözlük kodlu metin + float32 skor; pyarrow gerekir)
+table_format = os.getenv("TABLE_FORMAT", "csv")
+
+# Top-K içerik seçimi: "exact" (kaba kuvvet) | "ivf" | "hnsw" (çok sayfalı büyük derlemler için yaklaşık)
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "exact")
+
+# Sayfa içeriği çıkarımı: "snapshot" (page_source + lxml) | "script" (tek JS çağrısı) | "webdriver" (eleman eleman, eski)
+SCRAPE_EXTRACT = os.getenv("SCRAPE_EXTRACT", "snapshot")
+# Parçalama: "etiket" (eski: h1–h3/p/div/li/table elemanlarının tüm metni) |
+# "yaprak" (yalnızca yaprak metin blokları, en yakın semantik etiket + XPath; iç içe div tekrarı yok)
+SEGMENTATION = os.getenv("SEGMENTATION", "etiket")
+# Sayfayı render eden tarayıcı: "playwright" (paylaşılan sıcak havuz) | "selenium" (çağrı başına Chrome)
+SCRAPE_ENGINE = os.getenv("SCRAPE_ENGINE", "playwright")
+# Önce düz HTTP GET; statik HTML içerik sezgisinden geçemezse tarayıcıyla render
+FETCH_HTTP_FIRST = os.getenv("FETCH_HTTP_FIRST", "1") != "0"
+# HTML önbelleği (data/cache/html): bu süreden eski kayıtlar koşullu istekle doğrulanır;
+# HTML_OFFLINE=1 ise yalnızca önbellekten okunur (tekrarlanabilir çalıştırmalar)
+HTML_CACHE_TTL = float(os.getenv("HTML_CACHE_TTL", str(24 * 3600)))
+HTML_OFFLINE = os.getenv("HTML_OFFLINE", "0") == "1"
+# Site taraması: CRAWL_MAX_PAGES > 1 ise main.py başlangıç URL'sinden iç linkleri izler
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "1"))
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "2"))
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+CRAWL_DELAY = float(os.getenv("CRAWL_DELAY", "0.25"))  # aynı hosta ardışık istekler arası (sn)
+# Artımlı güncelleme: output_dir/manifest.json ile fark alınır, yalnızca yeni/değişen parçalar skorlanır
+INCREMENTAL = os.getenv("INCREMENTAL", "1") != "0"
+# Sayfa keşfi: "links" (iç linkleri izle) | "sitemap" (sitemap.xml; yalnızca lastmod'u yeni sayfalar getirilir)
+CRAWL_DISCOVERY = os.getenv("CRAWL_DISCOVERY", "links")
+# Tarayıcı havuzu: eş zamanlı Chromium sayısı ve kaç sayfada bir yeniden başlatılacağı
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+
+MODEL_NAME = "emrecan/bert-base-turkish-cased-mean-nli-stsb-tr"
+# "torch": tam hassasiyet sentence_transformers | "onnx-int8": ONNX Runtime + dinamik int8 (CPU)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+# >1 ise büyük parça kümeleri bu kadar işçi süreçte (her biri kendi model kopyasıyla) kodlanır
+ENCODE_WORKERS = int(os.getenv("ENCODE_WORKERS", "0"))
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")  # Ollama arka planda çalışmalı
+# Aynı anda sunucuya giden istek sayısı; sunucunun OLLAMA_NUM_PARALLEL ayarıyla eşleşmeli
+OLLAMA_PARALLEL = int(os.getenv("OLLAMA_PARALLEL", os.getenv("OLLAMA_NUM_PARALLEL", "4")))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "120"))  # istek başına (sn)
+OLLAMA_RETRIES = int(os.getenv("OLLAMA_RETRIES", "2"))      # zaman aşımı/bağlantı hatasında ek deneme
+# İyileştirme akışlarında (niyet_iylestir / sorgu_iyilestir) aynı anda işlenen satır; 1 = sıralı
+IYILESTIRME_PARALLEL = int(os.getenv("IYILESTIRME_PARALLEL", str(OLLAMA_PARALLEL)))
+# LLM yanıt önbelleği (data/cache/llm.sqlite): TTL sn (0 = süresiz); BYPASS=1 ise okunmaz, yalnızca yazılır
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "0"))
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+
+# ---- Tembel (ilk kullanımda yüklenen) kaynaklar ----
+# Model ve Ollama istemcisi import anında değil, ilk get_* çağrısında kurulur;
+# config'i import eden kısa script'ler model yükleme maliyetini ödemez.
+_model = None
+_model_lock = threading.Lock()
+_encoder = None
+_ollama_client = None
+_ollama_lock = threading.Lock()
+
+def get_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from modules.onnx_model import load_embedding_model
+                _model = load_embedding_model(MODEL_NAME, EMBED_BACKEND)
+    return _model
+
+def get_encoder():
+    """Parça kodlayıcısı: ENCODE_WORKERS > 1 ise çok süreçli havuz, değilse tek model."""
+    global _encoder
+    if ENCODE_WORKERS <= 1:
+        return get_model()
+    if _encoder is None:
+        with _model_lock:
+            if _encoder is None:
+                from modules.kodlama_havuzu import havuz_olustur
+                _encoder = havuz_olustur(workers=ENCODE_WORKERS, model_name=MODEL_NAME, backend=EMBED_BACKEND)
+    return _encoder
+
+def embed_cache_key(model_name: str = MODEL_NAME) -> str:
+    # Farklı backend'lerin vektörleri embedding deposunda karışmasın
+    return model_name if EMBED_BACKEND == "torch" else f"{model_name}@{EMBED_BACKEND}"
+
+def get_ollama_client():
+    global _ollama_client
+    if _ollama_client is None:
+        with _ollama_lock:
+            if _ollama_client is None:
+                import ollama
+                _ollama_client = ollama.Client(host=OLLAMA_HOST, timeout=OLLAMA_TIMEOUT)
+    return _ollama_client
 
-ollama_client = ollama.Client(host='http://localhost:11434')  # Ollama arka planda çalışmalı
+def __getattr__(name):
+    # Eski kullanım: `from config import model, ollama_client`
+    if name == "model":
+        return get_model()
+    if name == "ollama_client":
+        return get_ollama_client()
+    raise AttributeError(f"module 'config' has no attribute {name!r}")
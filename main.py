@@ -1,11 +1,16 @@
 import os
-import re
 
-from config import output_dir
-from modules.anlamsal_eslestirme import (anlamsal_eslestirme, tam_niyet_uyum_tablosu, tam_sorgu_uyum_tablosu, title_description_birbirine_uyum, title_description_uyumu)
-from modules.intent_classifier import niyet_belirle
-from modules.kullanici_sorgusu import sorgular
-from modules.sorgu import OUT_CSV, TOP_K, sort_query_similarity
+from config import CRAWL_DISCOVERY, CRAWL_MAX_PAGES, output_dir, table_format, write_full_tables
+from modules.anlamsal_eslestirme import anlamsal_eslestirme, title_description_birbirine_uyum, title_description_uyumu
+from modules.artimli import fark_ozeti, manifest_olustur, manifest_oku, manifest_yaz, top_k_guncelle, uyum_tablosu_guncelle
+from modules.icerik_indeksi import ContentIndex
+from modules.kullanici_sorgusu import get_sorgular
+from modules.llm_onbellek import get_llm_cache
+from modules.niyet import OUT_CSV as NIYET_OUT_CSV
+from modules.niyet_cozucu import niyetleri_coz, temizle_niyet  # noqa: F401  (temizle_niyet: eski import yolu)
+from modules.site_haritasi import tara_site_haritasi
+from modules.site_tarayici import tara
+from modules.sorgu import OUT_CSV, TOP_K
 from modules.webScraping import get_structured_web_content_selenium
 from pathlib import Path
 
@@ -26,106 +31,122 @@ def out_path(name: str) -> Path:
     return alt if alt.exists() else p
 
 
-def temizle_niyet(text: str) -> str:
-    if not text:
-        return ""
-    text = text.lower().strip()
-    text = re.sub(r"[.?!,:;]+$", "", text)
-    text = re.sub(r"\s+", " ", text)
-    text = text.replace('"', '').replace("'", '')
-    return text
-
-# ---- 1) URL ----
-url = "https://www.reklamvermek.com"  # isterseniz değiştirin
-if not url.startswith(("http://", "https://")):
-    url = "https://" + url
-
-# ---- 2) İçeriği topla (İLK ÖNCE BU!) ----
-print("\n🌐 Sayfa indiriliyor ve yapılandırılıyor...")
-content = get_structured_web_content_selenium(url)
-
-# ---- 3) Anlamsal eşleşmeler ----
-print("\n🔍 Anlamsal eşleşmeler yapılıyor...")
-eslesme_df = anlamsal_eslestirme(content)
-
-# ---- 4) Kullanıcı niyeti tahmini ----
-print("\n🧠 Kullanıcı niyetleri çıkarılıyor...")
-niyetler = []
-for s in eslesme_df["Sorgu"]:
-    niyet = niyet_belirle(s)
-    print(f"{s} → {niyet}")
-    niyetler.append(temizle_niyet(niyet))
-
-eslesme_df["Kullanıcı Niyeti"] = niyetler
-
-# ---- 5) Tüm içerik × niyet analizi ----
-if not os.path.exists(f"{output_dir}/html_icerik_niyet_uyumu.csv"):
-    print("\n📊 Tüm içerik × niyet eşleşmeleri oluşturuluyor...")
-    niyet_listesi = eslesme_df["Kullanıcı Niyeti"].unique().tolist()
-    tam_niyet_df = tam_niyet_uyum_tablosu(content, niyet_listesi)
-    tam_niyet_df.to_csv(f"{output_dir}/html_icerik_niyet_uyumu.csv", index=False)
-    print("✅ html_icerik_niyet_uyumu.csv yazıldı.")
-
-# ---- 6) Tüm içerik × sorgu analizi ----
-if not os.path.exists(f"{output_dir}/html_icerik_sorgu_uyumu.csv"):
-    print("\n📊 Tüm içerik × sorgu eşleşmeleri oluşturuluyor...")
-    tam_sorgu_df = tam_sorgu_uyum_tablosu(content, sorgular)
-    tam_sorgu_df.to_csv(f"{output_dir}/html_icerik_sorgu_uyumu.csv", index=False)
-    print("✅ html_icerik_sorgu_uyumu.csv yazıldı.")
-
-# ---- 7) Title & Description × sorgu uyumu ----
-if not os.path.exists(f"{output_dir}/title_description_uyum.csv"):
-    print("\n📝 Title/Description alanlarının sorgularla uyumu hesaplanıyor...")
-    title_desc_df = title_description_uyumu(content, sorgular)
-    title_desc_df.to_csv(f"{output_dir}/title_description_uyum.csv", index=False)
-    print("✅ title_description_uyum.csv yazıldı.")
-
-# ---- 8) Title ↔ Description kendi aralarında uyum ----
-if not os.path.exists(f"{output_dir}/title_description_kendi_uyumu.csv"):
-    print("\n📊 Title ile Description birbirine göre uyumu hesaplanıyor...")
-    title_meta_df = title_description_birbirine_uyum(content)
-    title_meta_df.to_csv(f"{output_dir}/title_description_kendi_uyumu.csv", index=False)
-    print("✅ title_description_kendi_uyumu.csv yazıldı.")
-
-
-# ---- 9) Sorgu benzerlik skoru hesaplama ----
-if not os.path.exists(f"{output_dir}/icerik_sorgu_top{TOP_K}.csv"):
+def main():
+    # Çok süreçli encode havuzu (ENCODE_WORKERS) işçileri bu dosyayı yeniden import eder;
+    # adımlar yalnızca doğrudan çalıştırmada yürür.
+    sorgular = get_sorgular()
+
+    # ---- 1) URL ----
+    url = "https://www.reklamvermek.com"  # isterseniz değiştirin
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+
+    # ---- 2) İçeriği topla (İLK ÖNCE BU!) ----
+    # Parçalar, vektörleri ve sorgu vektörleri bir kez hesaplanır; tüm adımlar bunu paylaşır
+    if CRAWL_DISCOVERY == "sitemap":
+        print("\n🗺️  Sitemap'ten sayfalar keşfediliyor (yalnızca değişenler getirilir)...")
+        sayfalar = tara_site_haritasi(url, max_sayfa=CRAWL_MAX_PAGES if CRAWL_MAX_PAGES > 1 else None)
+        if not sayfalar:
+            print("⚠️  Sitemap'ten sayfa alınamadı, link taramasına dönülüyor...")
+            sayfalar = tara(url)
+        indeks = ContentIndex.from_pages(sayfalar)
+    elif CRAWL_MAX_PAGES > 1:
+        print(f"\n🌐 Site taranıyor (en fazla {CRAWL_MAX_PAGES} sayfa)...")
+        indeks = ContentIndex.from_pages(tara(url))
+    else:
+        print("\n🌐 Sayfa indiriliyor ve yapılandırılıyor...")
+        content = get_structured_web_content_selenium(url)
+        indeks = ContentIndex(content)
+
+    # Önceki çalıştırmanın manifestiyle fark: yalnızca yeni/değişen parçalar skorlanır
+    onceki = manifest_oku()
+    manifest = manifest_olustur(indeks)
+    if onceki:
+        print(fark_ozeti(onceki, manifest))
+
+    # ---- 3) Anlamsal eşleşmeler ----
+    print("\n🔍 Anlamsal eşleşmeler yapılıyor...")
+    eslesme_df = anlamsal_eslestirme(indeks)
+
+    # ---- 4) Kullanıcı niyeti tahmini ----
+    print("\n🧠 Kullanıcı niyetleri çıkarılıyor...")
+    # Etiketli/benzer sorgular LLM'e gitmez; kalanlar eş zamanlı (OLLAMA_PARALLEL) sınıflandırılır
+    niyetler = niyetleri_coz(eslesme_df["Sorgu"])
+
+    eslesme_df["Kullanıcı Niyeti"] = niyetler
+    niyet_listesi = [n for n in eslesme_df["Kullanıcı Niyeti"].unique().tolist() if n]
+
+    # ---- 5) Tüm içerik × niyet analizi (isteğe bağlı tam tablo) ----
+    if write_full_tables:
+        print("\n📊 Tüm içerik × niyet eşleşmeleri oluşturuluyor...")
+        yol = uyum_tablosu_guncelle(indeks, niyet_listesi, "Kullanıcı Niyeti", f"{output_dir}/html_icerik_niyet_uyumu.csv",
+                                    onceki, manifest, table_format)
+        print(f"✅ {yol} yazıldı." if yol else "✅ html_icerik_niyet_uyumu güncel, atlandı.")
+
+    # ---- 6) Tüm içerik × sorgu analizi (isteğe bağlı tam tablo) ----
+    if write_full_tables:
+        print("\n📊 Tüm içerik × sorgu eşleşmeleri oluşturuluyor...")
+        yol = uyum_tablosu_guncelle(indeks, sorgular, "Sorgu", f"{output_dir}/html_icerik_sorgu_uyumu.csv",
+                                    onceki, manifest, table_format)
+        print(f"✅ {yol} yazıldı." if yol else "✅ html_icerik_sorgu_uyumu güncel, atlandı.")
+
+    # ---- 7) Title & Description × sorgu uyumu ----
+    if not os.path.exists(f"{output_dir}/title_description_uyum.csv"):
+        print("\n📝 Title/Description alanlarının sorgularla uyumu hesaplanıyor...")
+        title_desc_df = title_description_uyumu(indeks, sorgular)
+        title_desc_df.to_csv(f"{output_dir}/title_description_uyum.csv", index=False)
+        print("✅ title_description_uyum.csv yazıldı.")
+
+    # ---- 8) Title ↔ Description kendi aralarında uyum ----
+    if not os.path.exists(f"{output_dir}/title_description_kendi_uyumu.csv"):
+        print("\n📊 Title ile Description birbirine göre uyumu hesaplanıyor...")
+        title_meta_df = title_description_birbirine_uyum(indeks)
+        title_meta_df.to_csv(f"{output_dir}/title_description_kendi_uyumu.csv", index=False)
+        print("✅ title_description_kendi_uyumu.csv yazıldı.")
+
+
+    # ---- 9) Sorgu başına Top-K (doğrudan skor matrisinden) ----
     print("\n📈 Sorgu benzerlik skorları sıralanıyor...")
-    sort_query_similarity()
-    print(f"✅ {OUT_CSV} yazıldı.")
+    yol = top_k_guncelle(indeks, sorgular, "Sorgu", TOP_K, OUT_CSV, onceki, manifest)
+    print(f"✅ {yol} yazıldı." if yol else f"✅ {OUT_CSV} güncel, atlandı.")
 
-# ---- 10) Niyet benzerlik skoru hesaplama ----
-if not os.path.exists(f"{output_dir}/icerik_niyet_top{TOP_K}.csv"):
+    # ---- 10) Niyet başına Top-K (doğrudan skor matrisinden) ----
     print("\n📈 Niyet benzerlik skorları sıralanıyor...")
-    from modules.niyet import sort_intent_similarity
-    sort_intent_similarity()
-    print(f"✅ {OUT_CSV} yazıldı.")
+    yol = top_k_guncelle(indeks, niyet_listesi, "Kullanıcı Niyeti", TOP_K, NIYET_OUT_CSV, onceki, manifest)
+    print(f"✅ {yol} yazıldı." if yol else f"✅ {NIYET_OUT_CSV} güncel, atlandı.")
+    manifest_yaz(manifest)
 
 
-# ---- 11) Niyet İyileştirme (LLM) ----
-NIYET_TOPK = os.path.join(output_dir, f"icerik_niyet_top{TOP_K}.csv")
-NIYET_IYI  = os.path.join(output_dir, "icerik_niyet_iyilestirme.csv")
+    # ---- 11) Niyet İyileştirme (LLM) ----
+    NIYET_TOPK = os.path.join(output_dir, f"icerik_niyet_top{TOP_K}.csv")
+    NIYET_IYI  = os.path.join(output_dir, "icerik_niyet_iyilestirme.csv")
 
 
-if os.path.exists(NIYET_TOPK):
+    if os.path.exists(NIYET_TOPK):
         print("\n🧩 Niyet iyileştirme başlıyor...")
         from modules.niyet_iylestir import run_niyet_flow
         run_niyet_flow()
         print(f"✅ {NIYET_IYI} yazıldı.")
-else:
+    else:
         print(f"\n⚠️  Niyet Top{TOP_K} bulunamadı, iyileştirme adımı atlandı: {NIYET_TOPK}")
 
 
 
-# ---- 12) Sorgu İyileştirme (LLM) ----
-SORGU_TOPK = os.path.join(output_dir, f"icerik_sorgu_top{TOP_K}.csv")
-SORGU_IYI  = os.path.join(output_dir, "icerik_sorgu_iyilestirme.csv")
+    # ---- 12) Sorgu İyileştirme (LLM) ----
+    SORGU_TOPK = os.path.join(output_dir, f"icerik_sorgu_top{TOP_K}.csv")
+    SORGU_IYI  = os.path.join(output_dir, "icerik_sorgu_iyilestirme.csv")
 
 
-if os.path.exists(SORGU_TOPK):
+    if os.path.exists(SORGU_TOPK):
         print("\n🧩 Sorgu iyileştirme başlıyor...")
         from modules.sorgu_iyilestir import run_sorgu_flow
         run_sorgu_flow()
         print(f"✅ {SORGU_IYI} yazıldı.")
-else:
+    else:
         print(f"\n⚠️  Sorgu Top{TOP_K} bulunamadı, iyileştirme adımı atlandı: {SORGU_TOPK}")
+
+    print(f"\n🧠 {get_llm_cache().ozet()}")
+
+
+if __name__ == "__main__":
+    main()
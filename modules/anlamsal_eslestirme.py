@@ -1,43 +1,27 @@
-from itertools import chain
-
+import numpy as np
 import pandas as pd
-import torch
-from sentence_splitter import SentenceSplitter
-from sentence_transformers import util
-
-from config import model
-from modules.kullanici_sorgusu import sorgular
 
-# Türkçe için cümle ayırıcı
-splitter = SentenceSplitter(language='tr')
+from config import VECTOR_INDEX
+from modules.icerik_indeksi import ContentIndex, cumlelere_bol  # noqa: F401  (cumlelere_bol: eski import yolu)
+from modules.kullanici_sorgusu import get_sorgular
 
-def cumlelere_bol(metin):
-    if not isinstance(metin, str):
-        return []
-    return splitter.split(metin)
+# Tüm fonksiyonlar content olarak dict ya da ContentIndex kabul eder; main.py
+# indeksi bir kez kurup hepsine verir, böylece sayfa ve sorgular bir kez kodlanır.
 
 # ✅ 1. Anlamsal eşleştirme (tek eşleşme)
 def anlamsal_eslestirme(content):
+    indeks = ContentIndex.of(content)
+    metinler = indeks.bloklar
 
-    metinler = list(
-        chain(
-            content["headings"].get("h1", []),
-            content["headings"].get("h2", []),
-            content["headings"].get("h3", []),
-            content.get("paragraphs", []),
-            content.get("div_texts", []),
-            content.get("lists", []),
-            content.get("tables", [])
-        )
-    )
-    sorgu_vecs = model.encode(sorgular, convert_to_tensor=True)
-    metin_vecs = model.encode(metinler, convert_to_tensor=True)
+    sorgular = get_sorgular()
+    sorgu_vecs = indeks.hedef_vektorleri(sorgular)
+    metin_vecs = indeks.blok_vektorleri()
 
     results = []
     for i, sorgu in enumerate(sorgular):
-        skorlar = util.cos_sim(sorgu_vecs[i], metin_vecs)[0]
-        en_yuksek_idx = torch.argmax(skorlar).item()
-        en_yuksek_skor = skorlar[en_yuksek_idx].item()
+        skorlar = metin_vecs @ sorgu_vecs[i]
+        en_yuksek_idx = int(np.argmax(skorlar))
+        en_yuksek_skor = float(skorlar[en_yuksek_idx])
         eslesen_metin = metinler[en_yuksek_idx]
 
         results.append({
@@ -50,91 +34,116 @@ def anlamsal_eslestirme(content):
     return sonuc_df
 
 # ✅ 2. Tüm sorgulara göre içerik eşleşmeleri
-def tam_sorgu_uyum_tablosu(content, sorgular: list):
+def _uyum_tablosu(content, hedefler: list, hedef_kolon: str, kaynaklari_ac: bool = False) -> pd.DataFrame:
+    indeks = ContentIndex.of(content)
+    hedefler = list(hedefler)
+    if not len(indeks.parcalar) or not hedefler:
+        kolonlar = ["HTML Kaynağı", "Web İçeriği", hedef_kolon, "Benzerlik Skoru"]
+        return pd.DataFrame(columns=kolonlar if kaynaklari_ac else kolonlar + ["Tüm Kaynaklar"])
+
+    # Tekil parça × hedef kosinüs matrisi tek işlemde
+    skorlar = indeks.parca_vektorleri() @ indeks.hedef_vektorleri(hedefler).T
+    return indeks.parcalar.tablo(skorlar, hedefler, hedef_kolon, kaynaklari_ac=kaynaklari_ac)
+
+def tam_sorgu_uyum_tablosu(content, sorgular: list, kaynaklari_ac: bool = False):
     print("🔍 Sorgular ile cümle cümle eşleşme başlatıldı...")
+    return _uyum_tablosu(content, sorgular, "Sorgu", kaynaklari_ac)
 
-    tum_parcalar = []
-    for tag, liste in content["headings"].items():
-        for metin in liste:
-            for cumle in cumlelere_bol(metin):
-                tum_parcalar.append({"html": tag, "icerik": cumle.strip()})
-
-    for tag in ["paragraphs", "div_texts", "lists", "tables"]:
-        for metin in content.get(tag, []):
-            for cumle in cumlelere_bol(metin):
-                tum_parcalar.append({"html": tag, "icerik": cumle.strip()})
-
-    result_rows = []
-    for parca in tum_parcalar:
-        icerik = parca["icerik"]
-        icerik_vec = model.encode(icerik, convert_to_tensor=True)
-        sorgu_vecs = model.encode(sorgular, convert_to_tensor=True)
-
-        cosine_scores = util.cos_sim(icerik_vec, sorgu_vecs)[0]
-        for i, skor in enumerate(cosine_scores):
-            result_rows.append({
-                "HTML Kaynağı": parca["html"],
-                "Web İçeriği": icerik,
-                "Sorgu": sorgular[i],
-                "Benzerlik Skoru": round(float(skor), 4)
-            })
-
-    df = pd.DataFrame(result_rows)
-    return df
-
-def tam_niyet_uyum_tablosu(content, niyet_listesi: list):
+def tam_niyet_uyum_tablosu(content, niyet_listesi: list, kaynaklari_ac: bool = False):
     print("🔍 Niyetler ile cümle cümle eşleşme başlatıldı...")
-
-    tum_parcalar = []
-    for tag, liste in content["headings"].items():
-        for metin in liste:
-            for cumle in cumlelere_bol(metin):
-                tum_parcalar.append({"html": tag, "icerik": cumle.strip()})
-
-    for tag in ["paragraphs", "div_texts", "lists", "tables"]:
-        for metin in content.get(tag, []):
-            for cumle in cumlelere_bol(metin):
-                tum_parcalar.append({"html": tag, "icerik": cumle.strip()})
-
-    result_rows = []
-    for parca in tum_parcalar:
-        icerik = parca["icerik"]
-        icerik_vec = model.encode(icerik, convert_to_tensor=True)
-        niyet_vecs = model.encode(niyet_listesi, convert_to_tensor=True)
-
-        cosine_scores = util.cos_sim(icerik_vec, niyet_vecs)[0]
-        for i, skor in enumerate(cosine_scores):
-            result_rows.append({
-                "HTML Kaynağı": parca["html"],
-                "Web İçeriği": icerik,
-                "Kullanıcı Niyeti": niyet_listesi[i],
-                "Benzerlik Skoru": round(float(skor), 4)
-            })
-
-    df = pd.DataFrame(result_rows)
-    return df
+    return _uyum_tablosu(content, niyet_listesi, "Kullanıcı Niyeti", kaynaklari_ac)
+
+# ✅ 3. Tam tabloyu yazmadan hedef başına Top-K (sort_query_similarity / sort_intent_similarity çıktısı)
+def _en_iyi_k(parca_vecs: np.ndarray, hedef_vecs: np.ndarray, k: int, blok: int = 2048):
+    """(k × m skor, k × m parça id) — skor matrisi bloklar halinde; her sütun için yalnızca K aday tutulur."""
+    m = len(hedef_vecs)
+    en_iyi_skor = np.empty((0, m), dtype=np.float32)
+    en_iyi_idx = np.empty((0, m), dtype=np.int64)
+    for bas in range(0, len(parca_vecs), blok):
+        skor = parca_vecs[bas:bas + blok] @ hedef_vecs.T
+        idx = np.broadcast_to(np.arange(bas, bas + len(skor))[:, None], skor.shape)
+        aday_skor = np.vstack([en_iyi_skor, skor])
+        aday_idx = np.vstack([en_iyi_idx, idx])
+        kk = min(k, aday_skor.shape[0])
+        sec = np.argpartition(-aday_skor, kk - 1, axis=0)[:kk]
+        en_iyi_skor = np.take_along_axis(aday_skor, sec, axis=0)
+        en_iyi_idx = np.take_along_axis(aday_idx, sec, axis=0)
+    return en_iyi_skor, en_iyi_idx
+
+def _top_k_df(depo, hedefler: list, hedef_kolon: str, en_iyi_skor: np.ndarray, en_iyi_idx: np.ndarray) -> pd.DataFrame:
+    """Aday matrislerinden (k × m; boş aday id'si -1) hedefe göre artan, skora göre azalan tablo."""
+    kolonlar = [hedef_kolon, "HTML Kaynağı", "Web İçeriği", "Benzerlik Skoru"]
+    m = len(hedefler)
+    # Her sütunu skora göre azalan sırala
+    sira = np.argsort(-en_iyi_skor, axis=0, kind="stable")
+    en_iyi_skor = np.take_along_axis(en_iyi_skor, sira, axis=0)
+    en_iyi_idx = np.take_along_axis(en_iyi_idx, sira, axis=0)
+
+    metinler = np.array(depo.metinler, dtype=object)
+    html = np.array([ks[0]["html"] for ks in depo.kaynaklar], dtype=object)
+    hedef_sirasi = sorted(range(m), key=lambda j: hedefler[j])  # eski çıktı: hedefe göre artan
+    secili = en_iyi_idx[:, hedef_sirasi].T.ravel()
+    kk = en_iyi_idx.shape[0]
+    gecerli = secili >= 0  # yaklaşık indeks K'dan az aday döndürebilir
+    secili = secili[gecerli]
+    data = {
+        hedef_kolon: np.repeat(np.array(hedefler, dtype=object)[hedef_sirasi], kk)[gecerli],
+        "HTML Kaynağı": html[secili],
+        "Web İçeriği": metinler[secili],
+        "Benzerlik Skoru": np.round(en_iyi_skor[:, hedef_sirasi].T.ravel().astype(np.float64), 4)[gecerli],
+    }
+    for anahtar, kolon in depo.ek_kolonlar():
+        data[kolon] = depo.ek_degerleri(anahtar)[secili]
+        kolonlar = kolonlar + [kolon]
+    return pd.DataFrame(data, columns=kolonlar)
+
+def _top_k_tablosu(content, hedefler: list, hedef_kolon: str, k: int = 10, blok: int = 2048,
+                   vektor_indeksi: str = VECTOR_INDEX) -> pd.DataFrame:
+    indeks = ContentIndex.of(content)
+    depo = indeks.parcalar
+    hedefler = list(dict.fromkeys(hedefler))
+    if not len(depo) or not hedefler or k <= 0:
+        return pd.DataFrame(columns=[hedef_kolon, "HTML Kaynağı", "Web İçeriği", "Benzerlik Skoru"])
+
+    parca_vecs = indeks.parca_vektorleri()
+    hedef_vecs = indeks.hedef_vektorleri(hedefler)
+    if vektor_indeksi != "exact":
+        # Yaklaşık arama (ivf/hnsw): büyük çok sayfalı derlemlerde tam skor matrisi yerine
+        skor, idx = indeks.vektor_indeksi(vektor_indeksi).search(hedef_vecs, k)
+        en_iyi_skor, en_iyi_idx = skor.T, idx.T
+    else:
+        en_iyi_skor, en_iyi_idx = _en_iyi_k(parca_vecs, hedef_vecs, k, blok)
+    return _top_k_df(depo, hedefler, hedef_kolon, en_iyi_skor, en_iyi_idx)
+
+def sorgu_top_k_tablosu(content, sorgular: list, k: int = 10) -> pd.DataFrame:
+    print(f"🔍 Sorgu başına Top-{k} içerik doğrudan skor matrisinden seçiliyor...")
+    return _top_k_tablosu(content, sorgular, "Sorgu", k)
+
+def niyet_top_k_tablosu(content, niyet_listesi: list, k: int = 10) -> pd.DataFrame:
+    print(f"🔍 Niyet başına Top-{k} içerik doğrudan skor matrisinden seçiliyor...")
+    return _top_k_tablosu(content, niyet_listesi, "Kullanıcı Niyeti", k)
 
 # ✅ 4. Başlık ve açıklama ile sorguların anlamsal uyumu
 def title_description_uyumu(content: dict, sorgular: list) -> pd.DataFrame:
-    baslik = content.get("title", "")
-    aciklama = content.get("meta_description", "")
-
-    entries = [("title", baslik), ("meta_description", aciklama)]
+    indeks = ContentIndex.of(content)
     sonuc = []
+    if not sorgular:
+        return pd.DataFrame(sonuc)
 
-    for alan_adi, metin in entries:
+    # Sorgular alan başına değil, bir kez (indeks kaydından) alınır
+    sorgu_vecs = indeks.hedef_vektorleri(sorgular)
+    for alan_adi in ("title", "meta_description"):
+        metin = indeks.get(alan_adi, "")
         if not metin:
             continue
-        metin_vec = model.encode(metin, convert_to_tensor=True)
-        sorgu_vecs = model.encode(sorgular, convert_to_tensor=True)
+        skorlar = sorgu_vecs @ indeks.alan_vektoru(alan_adi)
 
         for i, sorgu in enumerate(sorgular):
-            skor = util.cos_sim(metin_vec, sorgu_vecs[i])[0][0].item()
             sonuc.append({
                 "Alan": alan_adi,
                 "İçerik": metin,
                 "Kullanıcı Sorgusu": sorgu,
-                "Benzerlik Skoru": round(skor, 4)
+                "Benzerlik Skoru": round(float(skorlar[i]), 4)
             })
 
     return pd.DataFrame(sonuc)
@@ -142,8 +151,9 @@ def title_description_uyumu(content: dict, sorgular: list) -> pd.DataFrame:
 
 # ✅ Başlık ve açıklama arasında benzerlik skoru hesaplayan fonksiyon
 def title_description_birbirine_uyum(content: dict) -> pd.DataFrame:
-    title = content.get("title", "").strip()
-    description = content.get("meta_description", "").strip()
+    indeks = ContentIndex.of(content)
+    title = indeks.alanlar["title"]
+    description = indeks.alanlar["meta_description"]
 
     if not title or not description:
         return pd.DataFrame([{
@@ -152,12 +162,10 @@ def title_description_birbirine_uyum(content: dict) -> pd.DataFrame:
             "Benzerlik Skoru": "veri eksik",
         }])
 
-    title_vec = model.encode(title, convert_to_tensor=True)
-    desc_vec = model.encode(description, convert_to_tensor=True)
-    skor = util.cos_sim(title_vec, desc_vec)[0][0].item()
+    skor = float(np.dot(indeks.alan_vektoru("title"), indeks.alan_vektoru("meta_description")))
 
     return pd.DataFrame([{
         "title": title,
         "meta_description": description,
         "Benzerlik Skoru": round(skor, 4),
-    }])
\ No newline at end of file
+    }])
@@ -0,0 +1,211 @@
+# modules/artimli.py — sayfa/parça özetleriyle artımlı skor güncelleme
+#
+# Her çalıştırmanın sonunda output_dir/manifest.json yazılır:
+#   model     -> embedding önbellek anahtarı (değişirse her şey baştan hesaplanır)
+#   sayfalar  -> {url: sayfa içeriğinin sha1'i}
+#   parcalar  -> tekil parçaların normalize metin anahtarları (vektor_deposu.text_key)
+#   ciktilar  -> {dosya adı: {"hedefler", "k" | "kaynaklari_ac"}} bu manifestle üretilen tablolar
+# Sonraki çalıştırmada önceki manifestle fark alınır:
+#   * hiçbir sayfa ve hedef değişmediyse tablo dosyasına dokunulmaz
+#   * html_icerik_*_uyumu: önceki tablodaki (parça, hedef) skorları aynen alınır; yalnızca
+#     yeni parçalar ve yeni hedefler kodlanıp skorlanır, kalkan parçalar düşer
+#   * Top-K: hedef başına adaylar = önceki Top-K'da kalan parçalar ∪ yeni parçalar.
+#     Önceki listeden parça kalktıysa ve geriye K'dan az aday kaldıysa (ya da hedef yeniyse)
+#     o hedef tüm parçalara karşı yeniden skorlanır — sonuç tam hesapla aynıdır.
+# Kapatmak için INCREMENTAL=0 (eski davranış: dosya varsa adım atlanır).
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from modules.anlamsal_eslestirme import _en_iyi_k, _top_k_df, _top_k_tablosu, _uyum_tablosu
+from modules.icerik_indeksi import ContentIndex
+from modules.tablo_io import tablo_oku, tablo_var_mi, tablo_yaz
+
+try:
+    from config import INCREMENTAL, VECTOR_INDEX, embed_cache_key, output_dir
+except Exception:
+    output_dir = os.path.join("data", "output")
+    INCREMENTAL = os.getenv("INCREMENTAL", "1") != "0"
+    VECTOR_INDEX = os.getenv("VECTOR_INDEX", "exact")
+
+    def embed_cache_key() -> str:
+        return "emrecan/bert-base-turkish-cased-mean-nli-stsb-tr"
+
+MANIFEST = os.path.join(output_dir, "manifest.json")
+_ICERIK_ALANLARI = ("headings", "paragraphs", "div_texts", "lists", "tables", "bloklar")
+
+# ---------- manifest ----------
+def sayfa_ozeti(content: dict) -> str:
+    """Parçaların çıkarıldığı alanların sha1'i (title/meta ve linkler hariç)."""
+    veri = {k: content.get(k) for k in _ICERIK_ALANLARI}
+    return hashlib.sha1(json.dumps(veri, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+def manifest_olustur(indeks: ContentIndex) -> dict:
+    sayfalar = indeks.sayfalar or {indeks.get("url", ""): indeks.content}
+    return {
+        "model": embed_cache_key(),
+        "sayfalar": {url: sayfa_ozeti(c) for url, c in sayfalar.items()},
+        "parcalar": indeks.parcalar.anahtarlar(),
+        "ciktilar": {},
+    }
+
+def manifest_oku(yol: str = MANIFEST) -> dict | None:
+    try:
+        with open(yol, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def manifest_yaz(manifest: dict, yol: str = MANIFEST):
+    os.makedirs(os.path.dirname(yol) or ".", exist_ok=True)
+    with open(yol + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(yol + ".tmp", yol)
+
+def fark_ozeti(onceki: dict, simdiki: dict) -> str:
+    es, ys = onceki.get("sayfalar", {}), simdiki["sayfalar"]
+    degisen = sum(1 for u, h in ys.items() if u in es and es[u] != h)
+    yeni_sayfa = sum(1 for u in ys if u not in es)
+    silinen_sayfa = sum(1 for u in es if u not in ys)
+    ep, yp = set(onceki.get("parcalar", [])), set(simdiki["parcalar"])
+    return (f"🧾 Önceki çalıştırmaya göre: {degisen} sayfa değişti, {yeni_sayfa} yeni, {silinen_sayfa} kalktı; "
+            f"{len(yp - ep)} yeni parça, {len(ep - yp)} parça kalktı, {len(yp & ep)} aynı.")
+
+def _onceki_cikti(onceki: dict | None, simdiki: dict, yol: str) -> dict | None:
+    """Önceki çalıştırmanın bu tablo için kaydı; model farklıysa ya da dosya yoksa None."""
+    if not onceki or onceki.get("model") != simdiki["model"] or not tablo_var_mi(yol):
+        return None
+    return onceki.get("ciktilar", {}).get(os.path.basename(yol))
+
+def _parca_idleri(depo, metinler) -> np.ndarray:
+    """Tablodaki 'Web İçeriği' değerlerinin güncel tekil parça id'leri; kalkanlar -1."""
+    kodlar, tekiller = pd.factorize(pd.Series(metinler, dtype=object))
+    ids = [depo.bul(t) if isinstance(t, str) else None for t in tekiller]
+    # sondaki -1: factorize boş değerlere -1 kodu verir, o da bu elemana düşer
+    return np.array([-1 if i is None else i for i in ids] + [-1], dtype=np.int64)[kodlar]
+
+# ---------- artımlı hesap ----------
+def artimli_uyum_tablosu(content, hedefler: list, hedef_kolon: str, onceki_df: pd.DataFrame | None,
+                         kaynaklari_ac: bool = False) -> pd.DataFrame:
+    """Tam uyum tablosu; onceki_df'teki skorlar yeniden kullanılır, yalnızca eksik hücreler skorlanır."""
+    indeks = ContentIndex.of(content)
+    depo = indeks.parcalar
+    hedefler = list(hedefler)
+    if onceki_df is None or onceki_df.empty or not len(depo) or not hedefler:
+        return _uyum_tablosu(indeks, hedefler, hedef_kolon, kaynaklari_ac)
+
+    n, m = len(depo), len(hedefler)
+    skorlar = np.full((n, m), np.nan, dtype=np.float32)
+    satir = _parca_idleri(depo, onceki_df["Web İçeriği"].to_numpy())
+    sutun_no = {h: j for j, h in enumerate(hedefler)}
+    sutun = onceki_df[hedef_kolon].map(sutun_no).fillna(-1).to_numpy(dtype=np.int64)
+    gecerli = (satir >= 0) & (sutun >= 0)
+    skorlar[satir[gecerli], sutun[gecerli]] = pd.to_numeric(onceki_df["Benzerlik Skoru"], errors="coerce").to_numpy()[gecerli]
+
+    yeni_hedef = np.flatnonzero(np.isnan(skorlar).all(axis=0))
+    if yeni_hedef.size:
+        skorlar[:, yeni_hedef] = indeks.parca_vektorleri() @ indeks.hedef_vektorleri([hedefler[j] for j in yeni_hedef]).T
+    eksik = np.flatnonzero(np.isnan(skorlar).any(axis=1))
+    if eksik.size:
+        skorlar[eksik] = indeks.parca_alt_vektorleri(eksik) @ indeks.hedef_vektorleri(hedefler).T
+    print(f"♻️  Artımlı uyum: {eksik.size} parça ve {yeni_hedef.size} hedef skorlandı, "
+          f"{n - eksik.size} parça önceki tablodan alındı.")
+    return depo.tablo(skorlar, hedefler, hedef_kolon, kaynaklari_ac=kaynaklari_ac)
+
+def artimli_top_k_tablosu(content, hedefler: list, hedef_kolon: str, k: int, onceki_df: pd.DataFrame | None,
+                          onceki_parcalar: set[str], onceki_k: int | None = None) -> pd.DataFrame:
+    """Hedef başına Top-K; yalnızca yeni parçalar ve önceki Top-K adayları skorlanır."""
+    indeks = ContentIndex.of(content)
+    depo = indeks.parcalar
+    hedefler = list(dict.fromkeys(hedefler))
+    onceki_k = onceki_k or k
+    if onceki_df is None or onceki_df.empty or not len(depo) or not hedefler or k <= 0 or onceki_k < k:
+        return _top_k_tablosu(indeks, hedefler, hedef_kolon, k)
+
+    yeni = np.array([i for i, a in enumerate(depo.anahtarlar()) if a not in onceki_parcalar], dtype=np.int64)
+    onceki_ids = pd.Series(_parca_idleri(depo, onceki_df["Web İçeriği"].to_numpy()), index=onceki_df.index)
+    gruplar = {h: g.to_numpy() for h, g in onceki_ids.groupby(onceki_df[hedef_kolon].to_numpy(), sort=False)}
+
+    tam, adaylar = [], {}
+    for j, h in enumerate(hedefler):
+        ids = gruplar.get(h)
+        kalan = ids[ids >= 0] if ids is not None else None
+        # önceki liste K ile kesildiyse dışarıda kalanlar en fazla son skora eşitti;
+        # elimizde K aday kalmadıysa onlardan biri girebilir → tam skorla
+        if kalan is None or (len(ids) >= onceki_k and len(kalan) < k):
+            tam.append(j)
+        else:
+            adaylar[j] = np.union1d(kalan, yeni)
+
+    m = len(hedefler)
+    en_iyi_skor = np.full((k, m), -np.inf, dtype=np.float32)
+    en_iyi_idx = np.full((k, m), -1, dtype=np.int64)
+    hedef_vecs = indeks.hedef_vektorleri(hedefler)
+    havuz = np.unique(np.concatenate(list(adaylar.values()))) if adaylar else np.empty(0, dtype=np.int64)
+    if havuz.size:
+        havuz_vecs = indeks.parca_alt_vektorleri(havuz)
+        for j, ids in adaylar.items():
+            if not ids.size:
+                continue
+            s = havuz_vecs[np.searchsorted(havuz, ids)] @ hedef_vecs[j]
+            kk = min(k, len(s))
+            sec = np.argpartition(-s, kk - 1)[:kk]
+            en_iyi_skor[:kk, j], en_iyi_idx[:kk, j] = s[sec], ids[sec]
+    if tam:
+        tv = hedef_vecs[tam]
+        if VECTOR_INDEX != "exact":
+            s, i = indeks.vektor_indeksi(VECTOR_INDEX).search(tv, k)
+            s, i = s.T, i.T
+        else:
+            s, i = _en_iyi_k(indeks.parca_vektorleri(), tv, k)
+        en_iyi_skor[:len(s), tam], en_iyi_idx[:len(i), tam] = s, i
+    print(f"♻️  Artımlı Top-{k}: {yeni.size} yeni parça, {havuz.size} aday; "
+          f"{len(tam)}/{m} hedef tüm parçalara karşı skorlandı.")
+    return _top_k_df(depo, hedefler, hedef_kolon, en_iyi_skor, en_iyi_idx)
+
+# ---------- main.py adımları ----------
+def _ayni_sayfalar(onceki: dict, simdiki: dict) -> bool:
+    return onceki.get("sayfalar") == simdiki["sayfalar"]
+
+def uyum_tablosu_guncelle(indeks: ContentIndex, hedefler: list, hedef_kolon: str, yol: str,
+                          onceki: dict | None, simdiki: dict, fmt: str | None = None,
+                          kaynaklari_ac: bool = False) -> str | None:
+    """Tam uyum tablosunu yazar ve yolunu döndürür; tablo zaten günceldeyse None."""
+    hedefler = list(hedefler)
+    bilgi = {"hedefler": hedefler, "kaynaklari_ac": kaynaklari_ac}
+    if not INCREMENTAL and tablo_var_mi(yol):
+        return None
+    eski = _onceki_cikti(onceki, simdiki, yol) if INCREMENTAL else None
+    if eski is not None and eski == bilgi and _ayni_sayfalar(onceki, simdiki):
+        simdiki["ciktilar"][os.path.basename(yol)] = bilgi
+        return None
+    onceki_df = tablo_oku(yol) if eski is not None else None
+    df = artimli_uyum_tablosu(indeks, hedefler, hedef_kolon, onceki_df, kaynaklari_ac)
+    yazilan = tablo_yaz(df, yol, fmt)
+    simdiki["ciktilar"][os.path.basename(yol)] = bilgi
+    return yazilan
+
+def top_k_guncelle(indeks: ContentIndex, hedefler: list, hedef_kolon: str, k: int, yol: str,
+                   onceki: dict | None, simdiki: dict) -> str | None:
+    """Top-K CSV'sini yazar ve yolunu döndürür; tablo zaten günceldeyse None."""
+    hedefler = list(dict.fromkeys(hedefler))
+    bilgi = {"hedefler": sorted(hedefler), "k": k}
+    if not INCREMENTAL and os.path.exists(yol):
+        return None
+    eski = _onceki_cikti(onceki, simdiki, yol) if INCREMENTAL else None
+    if eski is not None and eski == bilgi and _ayni_sayfalar(onceki, simdiki):
+        simdiki["ciktilar"][os.path.basename(yol)] = bilgi
+        return None
+    if eski is not None:
+        df = artimli_top_k_tablosu(indeks, hedefler, hedef_kolon, k, tablo_oku(yol),
+                                   set(onceki.get("parcalar", [])), eski.get("k"))
+    else:
+        df = _top_k_tablosu(indeks, hedefler, hedef_kolon, k)
+    df.to_csv(yol, index=False, encoding="utf-8-sig")
+    simdiki["ciktilar"][os.path.basename(yol)] = bilgi
+    return yol
@@ -0,0 +1,96 @@
+# modules/baslangic_olcum.py — modüllerin import (başlangıç) süresini ölçer
+#
+# Kullanım (proje kökünden):
+#   python -m modules.baslangic_olcum
+#   python -m modules.baslangic_olcum --tekrar 5 --detay 10 modules.rakip_analiz
+#
+# Her modül temiz bir alt süreçte import edilir; böylece önceki import'ların
+# önbelleği ölçümü bozmaz. --detay N, `-X importtime` çıktısından en pahalı
+# N bağımlılığı da gösterir.
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULLER = [
+    "config",
+    "modules.kullanici_sorgusu",
+    "modules.vektor_deposu",
+    "modules.parca_deposu",
+    "modules.anlamsal_eslestirme",
+    "modules.intent_classifier",
+    "modules.sorgu",
+    "modules.niyet",
+    "modules.niyet_iylestir",
+    "modules.sorgu_iyilestir",
+    "modules.webScraping",
+    "modules.rakip_analiz",
+]
+HEDEF_SN = 1.0  # kısa CLI işleri için hedef başlangıç süresi
+
+_OLCUM_KODU = (
+    "import importlib, time, sys\n"
+    "t = time.perf_counter()\n"
+    "importlib.import_module(sys.argv[1])\n"
+    "print(time.perf_counter() - t)\n"
+)
+
+def import_suresi(modul: str) -> float | None:
+    r = subprocess.run([sys.executable, "-c", _OLCUM_KODU, modul], cwd=ROOT,
+                       capture_output=True, text=True)
+    if r.returncode != 0:
+        son = (r.stderr.strip().splitlines() or ["?"])[-1]
+        print(f"   ⚠️  {modul}: import başarısız → {son}")
+        return None
+    return float(r.stdout.strip().splitlines()[-1])
+
+def en_pahali_bagimliliklar(modul: str, n: int) -> list[tuple[float, str]]:
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modul}"], cwd=ROOT,
+                       capture_output=True, text=True)
+    satirlar = []
+    for line in r.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum_us, name = line.split(":", 1)[1].split("|")
+        girinti = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        satirlar.append((girinti, int(cum_us) / 1e6, name.strip()))
+
+    # Modülün doğrudan bağımlılıkları: kök satırından geriye, bir önceki kök satırına kadar
+    kok_idx = next((i for i, (g, _, ad) in enumerate(satirlar) if g == 0 and ad == modul), None)
+    if kok_idx is None:
+        return []
+    cocuklar = []
+    for g, sn, ad in reversed(satirlar[:kok_idx]):
+        if g == 0:
+            break
+        if g == 1:
+            cocuklar.append((sn, ad))
+    return sorted(cocuklar, reverse=True)[:n]
+
+def main():
+    ap = argparse.ArgumentParser(description="Modül başına başlangıç (import) süresi ölçümü")
+    ap.add_argument("moduller", nargs="*", default=MODULLER, help="Ölçülecek modüller (vars: hepsi)")
+    ap.add_argument("--tekrar", type=int, default=3, help="Modül başına ölçüm sayısı (medyan raporlanır)")
+    ap.add_argument("--detay", type=int, default=0, help="Her modül için en pahalı N bağımlılığı göster")
+    args = ap.parse_args()
+
+    print(f"⏱  Başlangıç ölçümü | python={sys.executable} | tekrar={args.tekrar}\n")
+    print(f"{'Modül':<32} {'medyan':>9} {'min':>9}  durum")
+    for m in args.moduller:
+        olcumler = [t for t in (import_suresi(m) for _ in range(max(1, args.tekrar))) if t is not None]
+        if not olcumler:
+            continue
+        med, mn = statistics.median(olcumler), min(olcumler)
+        durum = "✅" if med < HEDEF_SN else "🐢"
+        print(f"{m:<32} {med*1000:>7.0f}ms {mn*1000:>7.0f}ms  {durum}")
+        if args.detay:
+            for sn, ad in en_pahali_bagimliliklar(m, args.detay):
+                print(f"    └ {ad:<40} {sn*1000:>7.0f}ms")
+
+if __name__ == "__main__":
+    main()
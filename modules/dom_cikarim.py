@@ -0,0 +1,331 @@
+# modules/dom_cikarim.py — tek DOM anlık görüntüsünden yapılandırılmış içerik
+#
+# get_structured_web_content_selenium'un eski yolu her etiket için find_elements,
+# her eleman için .text / get_attribute çağırır; her biri ayrı bir WebDriver HTTP
+# isteğidir. Burada sayfa bir kez alınır ve aynı sonuç sözlüğü tek geçişte kurulur:
+#   html_to_content(html, url)  -> page_source (veya herhangi bir HTML) + lxml
+#   EXTRACT_JS                  -> tarayıcıda tek execute_script, JSON döner
+#   yaprak_bloklar(kok)         -> yalnızca yaprak metin blokları (en yakın semantik etiket + XPath)
+#
+# Eski alanlar (div_texts vb.) her elemanın tüm alt ağaç metnidir; iç içe her div
+# torunlarının metnini tekrar içerir. yaprak_bloklar'da her metin düğümü yalnızca en
+# yakın blok atasına yazılır, toplam blok metni sayfa metniyle doğrusal büyür.
+#
+# Görünür metin, Selenium'un .text davranışına yakın olacak şekilde üretilir:
+# blok elemanlar satır sonu, <br> satır sonu, satır içi boşluklar tek boşluk,
+# script/style/gizli (hidden, style="display:none") elemanlar metinsiz.
+# Stil sayfasıyla gizlenen elemanlar lxml yolunda görünmez sayılmaz.
+#
+# Parite kontrolü (kayıtlı HTML fixture'ları üzerinde):
+#   python -m modules.dom_cikarim --kaydet https://site.com        # canlı: webdriver + html fixture yaz
+#   python -m modules.dom_cikarim data/fixtures/dom/site_com.html  # offline: lxml ↔ kayıtlı beklenen
+#   python -m pytest tests/test_dom_cikarim.py                      # tüm fixture'lar (+ Chromium varsa EXTRACT_JS)
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+from urllib.parse import urljoin, urlparse
+
+from lxml import html as lxml_html
+
+FIXTURE_DIR = os.path.join("data", "fixtures", "dom")
+
+_ATLA = {"script", "style", "noscript", "template", "head", "title", "meta", "link"}
+_BLOK = {
+    "address", "article", "aside", "blockquote", "body", "caption", "dd", "details", "dialog", "div", "dl",
+    "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hgroup", "hr", "html", "legend", "li", "main", "nav", "ol", "p", "pre", "section", "summary", "table",
+    "tbody", "thead", "tfoot", "tr", "ul",
+}
+_HUCRE = {"td", "th"}
+_SEMANTIK = {"h1", "h2", "h3", "p", "li", "td", "th"}
+_GIZLI_STIL = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+_BOSLUK = re.compile(r"\s+")
+_NL = None  # belirteç akışında satır sonu
+
+def _gizli_mi(el) -> bool:
+    if el.get("hidden") is not None:
+        return True
+    if el.tag == "input" and (el.get("type") or "").lower() == "hidden":
+        return True
+    return bool(_GIZLI_STIL.search(el.get("style") or ""))
+
+class _MetinAkisi:
+    """DOM'u bir kez dolaşır; her eleman için belirteç akışındaki [başlangıç, bitiş) aralığını tutar."""
+
+    def __init__(self, root):
+        self.tokens: list[str | None] = []
+        self.aralik: dict = {}
+        self._gez(root, pre=False)
+
+    def _gez(self, el, pre: bool):
+        tag = el.tag if isinstance(el.tag, str) else ""
+        bas = len(self.tokens)
+        if not tag or tag in _ATLA or _gizli_mi(el):
+            self.aralik[el] = (bas, bas)
+            return
+        pre = pre or tag in ("pre", "textarea")
+        blok = tag in _BLOK
+        if blok:
+            self.tokens.append(_NL)
+        elif tag in _HUCRE:
+            self.tokens.append(" ")
+        elif tag == "br":
+            self.tokens.append(_NL)
+        if el.text:
+            self._metin(el.text, pre)
+        for c in el:
+            self._gez(c, pre)
+            if c.tail:
+                self._metin(c.tail, pre)
+        if blok:
+            self.tokens.append(_NL)
+        self.aralik[el] = (bas, len(self.tokens))
+
+    def _metin(self, t: str, pre: bool):
+        if pre:
+            for i, satir in enumerate(t.split("\n")):
+                if i:
+                    self.tokens.append(_NL)
+                self.tokens.append(satir)
+        else:
+            self.tokens.append(_BOSLUK.sub(" ", t))
+
+    def metin(self, el) -> str:
+        bas, bit = self.aralik.get(el, (0, 0))
+        ham = "".join("\n" if t is _NL else t for t in self.tokens[bas:bit])
+        satirlar = (re.sub(r"[ \t\f\v\r]+", " ", s).strip() for s in ham.split("\n"))
+        return "\n".join(s for s in satirlar if s)
+
+def yaprak_bloklar(kok, min_uzunluk: int = 1) -> list[dict]:
+    """Belge sırasıyla yaprak metin blokları: {"metin", "etiket", "xpath"}.
+
+    Blok/hücre elemanının kendi satır içi metni (iç içe blok çocukları hariç) bir bloktur;
+    etiket en yakın h1–h3/p/li/td/th atası, yoksa bloğun kendi etiketidir.
+    """
+    agac = kok.getroottree()
+    out: list[dict] = []
+
+    def bosalt(kap, tampon: list):
+        metin = _BOSLUK.sub(" ", "".join(tampon)).strip()
+        tampon.clear()
+        if len(metin) >= min_uzunluk:
+            el, sem = kap
+            out.append({"metin": metin, "etiket": sem or el.tag, "xpath": agac.getpath(el)})
+
+    def gez(el, kap, tampon: list):
+        tag = el.tag if isinstance(el.tag, str) else ""
+        if not tag or tag in _ATLA or _gizli_mi(el):
+            return
+        blok = tag in _BLOK or tag in _HUCRE
+        if blok:
+            bosalt(kap, tampon)  # üst bloğun bu noktaya kadarki metni ayrı yaprak
+            kap, tampon = (el, tag if tag in _SEMANTIK else kap[1]), []
+        elif tag == "br":
+            tampon.append(" ")
+        if el.text:
+            tampon.append(el.text)
+        for c in el:
+            gez(c, kap, tampon)
+            if c.tail:
+                tampon.append(c.tail)
+        if blok:
+            bosalt(kap, tampon)
+
+    gez(kok, (kok, kok.tag if kok.tag in _SEMANTIK else None), [])
+    return out
+
+def _elemanlar(root, tag: str):
+    return [el for el in root.iter(tag)]
+
+def html_to_content(html: str, url: str, title: str | None = None, base_url: str | None = None) -> dict:
+    """page_source'tan get_structured_web_content_selenium ile aynı sözlüğü tek geçişte üretir.
+
+    url iç/dış link ayrımı için (eski davranış: istenen URL'nin alan adı), base_url ise
+    göreli linklerin çözümlenmesi için kullanılır (yönlendirme sonrası adres; <base> varsa o).
+    """
+    root = lxml_html.fromstring(html) if html and html.strip() else lxml_html.fromstring("<html></html>")
+    akis = _MetinAkisi(root)
+    domain = urlparse(url).netloc
+
+    def metinler(tag):
+        texts = [t for t in (akis.metin(el) for el in _elemanlar(root, tag)) if t]
+        logging.info(f"<{tag}> etiketlerinden {len(texts)} adet içerik bulundu.")
+        return texts
+
+    if title is None:
+        t = root.find(".//title")
+        title = _BOSLUK.sub(" ", t.text_content()).strip() if t is not None else ""
+
+    result = {
+        "title": title,
+        "meta_description": "",
+        "headings": {"h1": metinler("h1"), "h2": metinler("h2"), "h3": metinler("h3")},
+        "paragraphs": metinler("p"),
+        "div_texts": metinler("div"),
+        "lists": [],
+        "tables": [],
+        "emphasis": {"strong": metinler("strong"), "em": metinler("em")},
+        "images_alt": [],
+        "links": {"internal": [], "external": []},
+        "bloklar": yaprak_bloklar(root),
+    }
+
+    meta = root.xpath("//meta[@name='description']")
+    if meta:
+        result["meta_description"] = meta[0].get("content")
+        logging.info(f"Meta description bulundu: {(result['meta_description'] or '')[:80]}...")
+    else:
+        logging.warning("Meta description bulunamadı.")
+
+    for tag in ["ul", "ol"]:
+        count = 0
+        for el in _elemanlar(root, tag):
+            for li in el.iter("li"):
+                text = akis.metin(li)
+                if text:
+                    result["lists"].append(text)
+                    count += 1
+        logging.info(f"<{tag}> listelerinden toplam {count} madde bulundu.")
+
+    tables = _elemanlar(root, "table")
+    result["tables"] = [t for t in (akis.metin(el) for el in tables) if t]
+    logging.info(f"{len(tables)} adet <table> bulundu, {len(result['tables'])} tanesi dolu.")
+
+    for img in _elemanlar(root, "img"):
+        alt = img.get("alt")
+        if alt:
+            result["images_alt"].append(alt.strip())
+    logging.info(f"{len(result['images_alt'])} adet <img alt='...'> bulundu.")
+
+    base = base_url or url
+    base_el = root.find(".//base[@href]")
+    if base_el is not None:
+        base = urljoin(base, base_el.get("href"))
+    for a in _elemanlar(root, "a"):
+        href = a.get("href")
+        if href is None:
+            continue
+        full_url = urljoin(base, href.strip())
+        link_info = {"text": akis.metin(a), "url": full_url}
+        kova = "internal" if domain in urlparse(full_url).netloc else "external"
+        result["links"][kova].append(link_info)
+    logging.info(f"{len(result['links']['internal'])} iç link, {len(result['links']['external'])} dış link bulundu.")
+    return result
+
+# Tarayıcı içinde tek seferde çalışan karşılığı: innerText (görünmeyen eleman → "")
+EXTRACT_JS = r"""
+const url = arguments[0];
+const domain = new URL(url).host;
+const vis = el => el.getClientRects().length > 0;
+const txt = el => vis(el) ? (el.innerText || "").trim() : "";
+const texts = tag => Array.from(document.getElementsByTagName(tag)).map(txt).filter(Boolean);
+const meta = document.querySelector("meta[name='description']");
+const lists = [];
+for (const tag of ["ul", "ol"])
+  for (const el of document.getElementsByTagName(tag))
+    for (const li of el.getElementsByTagName("li")) { const t = txt(li); if (t) lists.push(t); }
+const links = {internal: [], external: []};
+for (const a of document.getElementsByTagName("a")) {
+  if (!a.hasAttribute("href")) continue;
+  let full; try { full = new URL(a.getAttribute("href").trim(), document.baseURI).href; } catch (e) { continue; }
+  let host = ""; try { host = new URL(full).host; } catch (e) {}
+  (host.includes(domain) ? links.internal : links.external).push({text: txt(a), url: full});
+}
+return JSON.stringify({
+  title: document.title,
+  meta_description: meta ? meta.getAttribute("content") : "",
+  headings: {h1: texts("h1"), h2: texts("h2"), h3: texts("h3")},
+  paragraphs: texts("p"),
+  div_texts: texts("div"),
+  lists: lists,
+  tables: texts("table"),
+  emphasis: {strong: texts("strong"), em: texts("em")},
+  images_alt: Array.from(document.getElementsByTagName("img")).map(i => i.getAttribute("alt")).filter(Boolean).map(s => s.trim()),
+  links: links,
+});
+"""
+
+# ---------- parite ----------
+def _duz(d: dict, on: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        if isinstance(v, dict):
+            out.update(_duz(v, f"{on}{k}."))
+        else:
+            out[f"{on}{k}"] = v
+    return out
+
+def icerik_farki(beklenen: dict, gelen: dict) -> dict[str, dict]:
+    """İki içerik sözlüğünü alan alan karşılaştırır; yalnızca farklı alanları döndürür."""
+    a, b = _duz(beklenen), _duz(gelen)
+    fark = {}
+    for k in sorted(set(a) | set(b)):
+        x, y = a.get(k), b.get(k)
+        if x == y:
+            continue
+        if isinstance(x, list) and isinstance(y, list):
+            kx = [json.dumps(i, ensure_ascii=False, sort_keys=True) for i in x]
+            ky = [json.dumps(i, ensure_ascii=False, sort_keys=True) for i in y]
+            sx, sy = set(kx), set(ky)
+            fark[k] = {"beklenen": len(x), "gelen": len(y),
+                       "eksik": [i for i in kx if i not in sy][:5],
+                       "fazla": [i for i in ky if i not in sx][:5]}
+        else:
+            fark[k] = {"beklenen": x, "gelen": y}
+    return fark
+
+def _fixture_adi(url: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", urlparse(url).netloc + urlparse(url).path).strip("_") or "sayfa"
+
+def fixture_kaydet(url: str, fixture_dir: str = FIXTURE_DIR) -> str:
+    """Sayfayı eski (eleman eleman) yöntemle çıkarır; HTML + beklenen JSON'u fixture olarak yazar."""
+    from modules.webScraping import get_structured_web_content_selenium
+    os.makedirs(fixture_dir, exist_ok=True)
+    kayit = {}
+    beklenen = get_structured_web_content_selenium(url, mode="webdriver", snapshot_out=kayit)
+    for k in ("bekleme_ms", "getirme_yolu"):  # ölçüm / getirme yolu, içerik değil
+        beklenen.pop(k, None)
+    yol = os.path.join(fixture_dir, _fixture_adi(url) + ".html")
+    with open(yol, "w", encoding="utf-8") as f:
+        f.write(kayit["html"])
+    with open(os.path.splitext(yol)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump({"url": url, "base_url": kayit.get("base_url", url), "beklenen": beklenen},
+                  f, ensure_ascii=False, indent=2)
+    return yol
+
+def fixture_kontrol(html_yolu: str) -> dict[str, dict]:
+    with open(os.path.splitext(html_yolu)[0] + ".json", encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(html_yolu, encoding="utf-8") as f:
+        html = f.read()
+    gelen = html_to_content(html, meta["url"], title=meta["beklenen"].get("title"), base_url=meta.get("base_url"))
+    gelen.pop("bloklar", None)  # eski yolda karşılığı yok
+    return icerik_farki(meta["beklenen"], gelen)
+
+def main():
+    ap = argparse.ArgumentParser(description="DOM anlık görüntü çıkarımı — eski yöntemle parite kontrolü")
+    ap.add_argument("fixtures", nargs="*", help="Kontrol edilecek .html fixture'ları (yanında .json beklenen)")
+    ap.add_argument("--kaydet", nargs="*", default=[], metavar="URL", help="Canlı sayfalardan fixture üret")
+    ap.add_argument("--dir", default=FIXTURE_DIR)
+    args = ap.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    yollar = list(args.fixtures) + [fixture_kaydet(u, args.dir) for u in args.kaydet]
+    if not yollar and os.path.isdir(args.dir):
+        yollar = sorted(os.path.join(args.dir, f) for f in os.listdir(args.dir) if f.endswith(".html"))
+    hatali = 0
+    for yol in yollar:
+        fark = fixture_kontrol(yol)
+        print(f"{'✅' if not fark else '⚠️ '} {yol}: {len(fark)} farklı alan")
+        for k, v in fark.items():
+            print(f"    {k}: {json.dumps(v, ensure_ascii=False)[:300]}")
+        hatali += bool(fark)
+    sys.exit(1 if hatali else 0)
+
+if __name__ == "__main__":
+    main()
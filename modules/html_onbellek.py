@@ -0,0 +1,140 @@
+# modules/html_onbellek.py — ham ve render edilmiş HTML için disk önbelleği
+#
+# Anahtar: (URL, mod) — mod "http" (düz GET), "render:rakip", "render:playwright",
+# "icerik:script" gibi getirme yolunu belirtir. Her kayıt:
+#   <cache_dir>/html/<sha1>.gz    gzip'li gövde
+#   <cache_dir>/html/<sha1>.json  url, mod, final_url, status, etag, last_modified, alindi, dogrulandi
+# TTL dolmamışsa kayıt doğrudan döner. Dolmuşsa ve ETag/Last-Modified varsa koşullu
+# GET yapılır: 304 → kayıt tazelenir; değişmişse yeniden getirilir. Çevrimdışı modda
+# (HTML_OFFLINE=1) yalnızca önbellekten okunur; yoksa OnbellekYok yükseltilir.
+# Ayarlar: config.HTML_CACHE_TTL (sn), config.HTML_OFFLINE, HTML_CACHE_OFF=1 (tamamen kapat).
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+try:
+    from config import HTML_CACHE_TTL, HTML_OFFLINE, cache_dir
+except Exception:
+    cache_dir = os.path.join("data", "cache")
+    HTML_CACHE_TTL = float(os.getenv("HTML_CACHE_TTL", str(24 * 3600)))
+    HTML_OFFLINE = os.getenv("HTML_OFFLINE", "0") == "1"
+
+HTML_CACHE_DIR = os.getenv("HTML_CACHE_DIR", os.path.join(cache_dir, "html"))
+HTML_CACHE_OFF = os.getenv("HTML_CACHE_OFF", "0") == "1"
+
+class OnbellekYok(LookupError):
+    """Çevrimdışı modda istenen sayfa önbellekte yok."""
+
+def _anahtar(url: str, mod: str) -> str:
+    return hashlib.sha1(f"{mod}\n{url}".encode("utf-8")).hexdigest()
+
+def _atomik_yaz(path: str, data: bytes):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+class SnapshotCache:
+    def __init__(self, root: str = HTML_CACHE_DIR, ttl: float = HTML_CACHE_TTL, offline: bool = HTML_OFFLINE):
+        self.root = root
+        self.ttl = ttl
+        self.offline = offline
+        self.sayac = {"cache": 0, "revalidated": 0, "network": 0}
+        self._mu = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _yollar(self, url: str, mod: str) -> tuple[str, str]:
+        k = _anahtar(url, mod)
+        return os.path.join(self.root, k + ".gz"), os.path.join(self.root, k + ".json")
+
+    # ---- kayıt okuma/yazma ----
+    def get(self, url: str, mod: str) -> tuple[str, dict] | None:
+        gz, js = self._yollar(url, mod)
+        try:
+            with open(js, encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(gz, "rb") as f:
+                return f.read().decode("utf-8"), meta
+        except (OSError, ValueError, EOFError):
+            return None
+
+    def put(self, url: str, mod: str, body: str, **meta) -> dict:
+        gz, js = self._yollar(url, mod)
+        simdi = time.time()
+        meta = {"url": url, "mod": mod, "alindi": simdi, "dogrulandi": simdi,
+                **{k: v for k, v in meta.items() if v is not None}}
+        _atomik_yaz(gz, gzip.compress(body.encode("utf-8"), compresslevel=6))
+        _atomik_yaz(js, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        return meta
+
+    def _tazele(self, url: str, mod: str, meta: dict) -> dict:
+        meta = {**meta, "dogrulandi": time.time()}
+        _atomik_yaz(self._yollar(url, mod)[1], json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        return meta
+
+    def taze_mi(self, meta: dict) -> bool:
+        return time.time() - meta.get("dogrulandi", 0) < self.ttl
+
+    def _say(self, kaynak: str):
+        with self._mu:
+            self.sayac[kaynak] += 1
+
+    # ---- ana giriş ----
+    def fetch(self, url: str, mod: str, getir: Callable[[], tuple[str, dict]], ham: bool = False) -> tuple[str, dict]:
+        """Önbellekten ya da getir()'den (gövde, meta) döndürür; meta["kaynak"] nereden geldiğini söyler.
+
+        getir() -> (gövde, meta): meta'da final_url, status, etag, last_modified olabilir.
+        ham=True: gövde düz GET yanıtıdır; koşullu isteğin 200 yanıtı doğrudan yeni kayıt olur.
+        """
+        kayit = self.get(url, mod)
+        if kayit and (self.offline or self.taze_mi(kayit[1])):
+            self._say("cache")
+            return kayit[0], {**kayit[1], "kaynak": "cache"}
+        if self.offline:
+            raise OnbellekYok(f"Çevrimdışı mod: önbellekte yok ({mod}) {url}")
+
+        if kayit and (kayit[1].get("etag") or kayit[1].get("last_modified")):
+            from modules.http_getir import kosullu_get
+            try:
+                status, body, yeni = kosullu_get(url, kayit[1].get("etag"), kayit[1].get("last_modified"))
+            except Exception:
+                status, body, yeni = None, None, {}
+            if status == 304:
+                self._say("revalidated")
+                return kayit[0], {**self._tazele(url, mod, kayit[1]), "kaynak": "revalidated"}
+            if ham and status is not None and status < 400 and body is not None:
+                self._say("network")
+                return body, {**self.put(url, mod, body, **yeni), "kaynak": "network"}
+
+        body, meta = getir()
+        self._say("network")
+        if body and (meta.get("status") is None or meta["status"] < 400):
+            meta = self.put(url, mod, body, **meta)
+        return body, {**meta, "kaynak": "network"}
+
+_cache: SnapshotCache | None = None
+_cache_mu = threading.Lock()
+
+def get_cache() -> SnapshotCache | None:
+    """Paylaşılan önbellek; HTML_CACHE_OFF=1 ise None."""
+    global _cache
+    if HTML_CACHE_OFF:
+        return None
+    if _cache is None:
+        with _cache_mu:
+            if _cache is None:
+                _cache = SnapshotCache()
+    return _cache
+
+def onbellekli(url: str, mod: str, getir: Callable[[], tuple[str, dict]], ham: bool = False) -> tuple[str, dict]:
+    c = get_cache()
+    if c is None:
+        body, meta = getir()
+        return body, {**meta, "kaynak": "network"}
+    return c.fetch(url, mod, getir, ham=ham)
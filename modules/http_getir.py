@@ -0,0 +1,170 @@
+# modules/http_getir.py — önce düz HTTP, gerekirse tarayıcıyla render
+#
+# Sayfaların çoğu sunucu tarafında üretilir; bunlar için tarayıcı açmak saniyeler
+# harcar. getir(url, render) önce bağlantı havuzlu, sıkıştırmalı bir requests
+# oturumuyla GET yapar; statik HTML içerik sezgisinden geçemezse (ana metin yok,
+# yalnızca JS iskeleti, bot doğrulama sayfası, hata kodu) render(url) çağrılır.
+# Düz GET yanıtları html_onbellek'te ("http" modu) tutulur ve TTL sonrası koşullu
+# istekle doğrulanır. Hangi yolun kullanıldığı ve nedeni sonuçta kayıtlıdır:
+#   s = getir("https://site.com", render=fetch_html_rendered)
+#   s.yol -> "http" | "render" ; s.neden -> "ok" | "az_metin" | "js_iskelet" | "bot_dogrulama" | "http_404" ...
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from modules.html_onbellek import onbellekli
+
+try:
+    from config import FETCH_HTTP_FIRST
+except Exception:
+    FETCH_HTTP_FIRST = os.getenv("FETCH_HTTP_FIRST", "1") != "0"
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+MIN_METIN = int(os.getenv("HTTP_MIN_TEXT", "400"))  # statik HTML'de en az bu kadar görünür metin
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+
+_BOT_IMZALARI = re.compile(
+    r"cf-browser-verification|cf_chl_|challenge-platform|just a moment\.\.\.|attention required!|"
+    r"checking your browser|_incapsula_resource|px-captcha|g-recaptcha|h-captcha|"
+    r"ddos protection by|access denied|robot check|are you a robot|bot olmadığınızı",
+    re.I,
+)
+_JS_IPUCLARI = re.compile(
+    r"enable javascript|javascript is required|javascript'i etkinleştir|you need to enable javascript", re.I)
+_IS_KOK = re.compile(r"<div[^>]+id=[\"'](root|app|__next|__nuxt)[\"'][^>]*>\s*</div>", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w-]+)", re.I)
+
+@dataclass
+class SayfaSonucu:
+    url: str
+    html: str = ""
+    yol: str = "http"      # "http" | "render"
+    neden: str = "ok"      # statik HTML neden yetmedi (yol == "render" ise)
+    status: int | None = None
+    final_url: str | None = None
+    sure_ms: int = 0
+    kaynak: str = "network"  # "network" | "cache" | "revalidated" (html_onbellek)
+
+# ---------- oturum (bağlantı havuzu) ----------
+_session = None
+_session_mu = threading.Lock()
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_mu:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                s = requests.Session()
+                ad = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=1)
+                s.mount("http://", ad)
+                s.mount("https://", ad)
+                s.headers.update(HEADERS)
+                try:
+                    import brotli  # noqa: F401  (urllib3 br çözebilsin diye)
+                    s.headers["Accept-Encoding"] = "gzip, deflate, br"
+                except ImportError:
+                    s.headers["Accept-Encoding"] = "gzip, deflate"
+                _session = s
+    return _session
+
+def _coz(r) -> str:
+    """Yanıtı metne çevirir: başlıktaki charset, yoksa <meta charset>, yoksa utf-8."""
+    enc = None
+    if "charset=" in (r.headers.get("Content-Type") or "").lower():
+        enc = r.encoding
+    if not enc:
+        m = _META_CHARSET.search(r.content[:4096])
+        enc = m.group(1).decode("ascii", "ignore") if m else "utf-8"
+    try:
+        return r.content.decode(enc, errors="replace")
+    except LookupError:
+        return r.content.decode("utf-8", errors="replace")
+
+# ---------- içerik sezgisi ----------
+def _gorunur_metin(html: str) -> tuple[str, str]:
+    """(tüm gövde metni, main/article metni) — script/style/noscript hariç."""
+    from lxml import html as lxml_html
+    try:
+        root = lxml_html.fromstring(html)
+    except Exception:
+        return "", ""
+    for el in root.xpath("//script|//style|//noscript|//template"):
+        el.drop_tree()
+    body = root.find(".//body")
+    tum = " ".join((body if body is not None else root).text_content().split())
+    ana = " ".join(" ".join(n.text_content().split()) for n in root.xpath("//main|//article|//*[@role='main']"))
+    return tum, ana
+
+def statik_yeterli_mi(html: str, status: int | None = 200) -> tuple[bool, str]:
+    """Statik HTML doğrudan kullanılabilir mi? (karar, neden)."""
+    if status is not None and status >= 400:
+        return False, f"http_{status}"
+    if not html or not html.strip():
+        return False, "bos"
+    tum, ana = _gorunur_metin(html)
+    # doğrulama sayfaları kısadır; uzun sayfada geçen "access denied" vb. içeriktir
+    if len(tum) < 5 * MIN_METIN and _BOT_IMZALARI.search(html[:20000]):
+        return False, "bot_dogrulama"
+    if len(tum) < MIN_METIN:
+        if _IS_KOK.search(html) or _JS_IPUCLARI.search(html):
+            return False, "js_iskelet"
+        return False, "az_metin"
+    if _JS_IPUCLARI.search(tum[:500]) and len(ana) < MIN_METIN // 2:
+        return False, "js_iskelet"
+    return True, "ok"
+
+# ---------- getirme ----------
+def _meta(r) -> dict:
+    return {"status": r.status_code, "final_url": r.url,
+            "etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+
+def http_get(url: str, timeout: float = HTTP_TIMEOUT) -> tuple[str, dict]:
+    r = get_session().get(url, timeout=timeout, allow_redirects=True)
+    return _coz(r), _meta(r)
+
+def kosullu_get(url: str, etag: str | None = None, last_modified: str | None = None,
+                timeout: float = HTTP_TIMEOUT) -> tuple[int, str | None, dict]:
+    """If-None-Match / If-Modified-Since ile GET; 304'te gövde None."""
+    h = {}
+    if etag:
+        h["If-None-Match"] = etag
+    if last_modified:
+        h["If-Modified-Since"] = last_modified
+    r = get_session().get(url, headers=h, timeout=timeout, allow_redirects=True)
+    if r.status_code == 304:
+        return 304, None, {}
+    return r.status_code, _coz(r), _meta(r)
+
+def getir(url: str, render: Callable[[str], str] | None = None, http_ilk: bool = FETCH_HTTP_FIRST,
+          timeout: float = HTTP_TIMEOUT) -> SayfaSonucu:
+    """Önce HTTP; statik HTML yetersizse (ve render verilmişse) tarayıcıyla render."""
+    t0 = time.perf_counter()
+    s = SayfaSonucu(url)
+    if http_ilk:
+        try:
+            s.html, meta = onbellekli(url, "http", lambda: http_get(url, timeout), ham=True)
+            s.status, s.final_url, s.kaynak = meta.get("status"), meta.get("final_url"), meta["kaynak"]
+            ok, s.neden = statik_yeterli_mi(s.html, s.status)
+        except Exception as e:
+            ok, s.neden = False, f"http_hata:{type(e).__name__}"
+        if ok or render is None:
+            s.sure_ms = int((time.perf_counter() - t0) * 1000)
+            return s
+    else:
+        s.neden = "http_kapali"
+        if render is None:
+            return s
+    s.yol, s.html, s.status, s.final_url, s.kaynak = "render", render(url) or "", None, None, "network"
+    s.sure_ms = int((time.perf_counter() - t0) * 1000)
+    return s
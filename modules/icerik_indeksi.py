@@ -0,0 +1,188 @@
+# modules/icerik_indeksi.py — sayfa içeriği için tek seferlik parça + embedding indeksi
+#
+# ContentIndex, get_structured_web_content_selenium çıktısından (ya da site_tarayici ile
+# toplanan çok sayfadan: ContentIndex.from_pages) bir kez kurulur:
+#   bloklar   -> anlamsal_eslestirme'nin kullandığı ham blok metinleri
+#   parcalar  -> cümlelere bölünmüş, tekilleştirilmiş parçalar (FragmentStore)
+#               config.SEGMENTATION="yaprak" ise içerikteki yaprak bloklardan (dom_cikarim),
+#               her parça XPath'ini taşır
+#   alanlar   -> title / meta_description
+# Vektörler ilk istendiğinde bir kez hesaplanır; sorgu/niyet vektörleri de
+# metin başına bir kez kodlanıp kayıtta tutulur. Böylece bir çalıştırmada her
+# sayfa ve her sorgu yalnızca bir kez embed edilir.
+from __future__ import annotations
+
+import logging
+import threading
+from itertools import chain
+
+import numpy as np
+
+from config import SEGMENTATION, get_encoder
+from modules.parca_deposu import FragmentStore
+from modules.vektor_deposu import cached_encode
+from modules.vektor_indeksi import vektor_indeksi_olustur
+
+# Türkçe için cümle ayırıcı (ilk kullanımda kurulur)
+_splitter = None
+_splitter_lock = threading.Lock()
+
+def _get_splitter():
+    global _splitter
+    if _splitter is None:
+        with _splitter_lock:
+            if _splitter is None:
+                from sentence_splitter import SentenceSplitter
+                _splitter = SentenceSplitter(language='tr')
+    return _splitter
+
+def cumlelere_bol(metin):
+    if not isinstance(metin, str):
+        return []
+    return _get_splitter().split(metin)
+
+def _yaprak_mi(content) -> bool:
+    if SEGMENTATION != "yaprak":
+        return False
+    if content.get("bloklar") is None:
+        # script/webdriver çıkarımı yaprak blok üretmez
+        logging.warning("Yaprak bloklar yok (çıkarım modu snapshot değil); etiket parçalamasına dönülüyor.")
+        return False
+    return True
+
+def parca_kayitlari(content) -> list[tuple[str, str, dict]]:
+    """(html etiketi, cümle, ek kaynak bilgisi) üçlüleri; yaprak modda ek = {"xpath": ...}."""
+    if _yaprak_mi(content):
+        return [(b["etiket"], cumle.strip(), {"xpath": b["xpath"]})
+                for b in content["bloklar"] for cumle in cumlelere_bol(b["metin"])]
+    tum_parcalar = []
+    for tag, liste in content["headings"].items():
+        for metin in liste:
+            for cumle in cumlelere_bol(metin):
+                tum_parcalar.append((tag, cumle.strip(), {}))
+
+    for tag in ["paragraphs", "div_texts", "lists", "tables"]:
+        for metin in content.get(tag, []):
+            for cumle in cumlelere_bol(metin):
+                tum_parcalar.append((tag, cumle.strip(), {}))
+    return tum_parcalar
+
+def parcalari_topla(content) -> list[tuple[str, str]]:
+    """İçeriği (html etiketi, cümle) çiftlerine böler; sıra eski satır sırasıyla aynıdır."""
+    return [(tag, cumle) for tag, cumle, _ in parca_kayitlari(content)]
+
+def bloklari_topla(content) -> list[str]:
+    if _yaprak_mi(content):
+        return [b["metin"] for b in content["bloklar"]]
+    return list(
+        chain(
+            content["headings"].get("h1", []),
+            content["headings"].get("h2", []),
+            content["headings"].get("h3", []),
+            content.get("paragraphs", []),
+            content.get("div_texts", []),
+            content.get("lists", []),
+            content.get("tables", [])
+        )
+    )
+
+def kodla(metinler, model=get_encoder) -> np.ndarray:
+    # Tek seferde toplu encode; normalize edilmiş vektörlerin iç çarpımı = kosinüs
+    return cached_encode(model, list(metinler), normalize_embeddings=True)
+
+
+class ContentIndex:
+    def __init__(self, content: dict, model=get_encoder, sayfalar: dict[str, dict] | None = None):
+        """sayfalar ({url: içerik}) verilirse bloklar/parçalar tüm sayfalardan toplanır ve her
+        parça sayfa URL'sini taşır; title/meta alanları yine `content`ten (başlangıç sayfası) gelir."""
+        self.content = content
+        self.model = model
+        self.sayfalar = sayfalar
+        if sayfalar:
+            self.bloklar = [b for c in sayfalar.values() for b in bloklari_topla(c)]
+            self.parcalar = FragmentStore()
+            for url, c in sayfalar.items():
+                for html, metin, ek in parca_kayitlari(c):
+                    self.parcalar.ekle(html, metin, url=url, **ek)
+        else:
+            self.bloklar = bloklari_topla(content)
+            self.parcalar = FragmentStore()
+            for html, metin, ek in parca_kayitlari(content):
+                self.parcalar.ekle(html, metin, **ek)
+        self.alanlar = {
+            "title": (content.get("title") or "").strip(),
+            "meta_description": (content.get("meta_description") or "").strip(),
+        }
+        self._lock = threading.Lock()
+        self._blok_vecs: np.ndarray | None = None
+        self._parca_vecs: np.ndarray | None = None
+        self._hedef_vecs: dict[str, np.ndarray] = {}
+        self._ann: dict[str, object] = {}
+
+    @classmethod
+    def from_pages(cls, sayfalar: dict[str, dict], model=get_encoder) -> "ContentIndex":
+        """site_tarayici.tara çıktısından (ilk sayfa başlangıç sayfasıdır) site geneli indeks."""
+        if not sayfalar:
+            raise ValueError("En az bir sayfa gerekli.")
+        return cls(next(iter(sayfalar.values())), model=model, sayfalar=sayfalar)
+
+    @classmethod
+    def of(cls, content) -> "ContentIndex":
+        """content bir dict ise indeks kurar, zaten ContentIndex ise aynen döndürür."""
+        return content if isinstance(content, cls) else cls(content)
+
+    def __getitem__(self, key):
+        # dict gibi erişim: content["title"] vb. eski kullanım bozulmasın
+        return self.content[key]
+
+    def get(self, key, default=None):
+        return self.content.get(key, default)
+
+    # --- içerik vektörleri (bir kez) ---
+    def blok_vektorleri(self) -> np.ndarray:
+        with self._lock:
+            if self._blok_vecs is None:
+                self._blok_vecs = kodla(self.bloklar, self.model)
+            return self._blok_vecs
+
+    def parca_vektorleri(self) -> np.ndarray:
+        with self._lock:
+            if self._parca_vecs is None:
+                print(f"🧩 {self.parcalar.ozet()}")
+                self._parca_vecs = kodla(self.parcalar.metinler, self.model)
+            return self._parca_vecs
+
+    def parca_alt_vektorleri(self, idx) -> np.ndarray:
+        """Yalnızca verilen tekil parçaların vektörleri (artımlı güncelleme); tümü zaten
+        hesaplandıysa oradan, yoksa önbellek/model üzerinden yalnızca bu parçalar kodlanır."""
+        idx = np.asarray(idx, dtype=np.int64)
+        if self._parca_vecs is not None:
+            return self._parca_vecs[idx]
+        return kodla([self.parcalar.metinler[i] for i in idx], self.model)
+
+    def vektor_indeksi(self, tur: str = "exact", **kw):
+        """Parça vektörleri üzerinde (id = tekil parça sırası) arama indeksi; tür başına bir kez kurulur."""
+        vecs = self.parca_vektorleri()
+        with self._lock:
+            if tur not in self._ann:
+                ix = vektor_indeksi_olustur(tur, vecs.shape[1], **kw)
+                ix.add(vecs, ids=np.arange(len(vecs)))
+                self._ann[tur] = ix
+            return self._ann[tur]
+
+    def alan_vektoru(self, alan: str) -> np.ndarray | None:
+        metin = self.alanlar.get(alan, "")
+        return self.hedef_vektorleri([metin])[0] if metin else None
+
+    # --- sorgu / niyet kaydı ---
+    def hedef_vektorleri(self, hedefler) -> np.ndarray:
+        """Sorgu/niyet vektörleri; daha önce kodlanmış metinler yeniden kodlanmaz."""
+        hedefler = list(hedefler)
+        with self._lock:
+            eksik = [h for h in dict.fromkeys(hedefler) if h not in self._hedef_vecs]
+            if eksik:
+                for h, v in zip(eksik, kodla(eksik, self.model)):
+                    self._hedef_vecs[h] = v
+            if not hedefler:
+                return np.zeros((0, 0), dtype=np.float32)
+            return np.stack([self._hedef_vecs[h] for h in hedefler])
@@ -1,30 +1,82 @@
 # modules/intent_classifier.py (öneri)
+#
+# niyet_belirle(sorgu)        -> tek sorgu, tek Ollama çağrısı
+# niyetleri_belirle(sorgular) -> toplu: en fazla OLLAMA_PARALLEL istek aynı anda uçuşta,
+#                                istek başına zaman aşımı ve yeniden deneme; sonuçlar girdi sırasıyla.
+# Sunucu tarafında OLLAMA_NUM_PARALLEL aynı sayıya ayarlanmalı; fazlası sunucuda kuyrukta bekler.
+# client= verilerek başka bir Ollama (ör. yerel sahte HTTP sunucusu) kullanılabilir:
+#   niyetleri_belirle(sorgular, client=ollama.Client(host="http://127.0.0.1:11999"))
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
-from ollama import Client
 
-from config import ollama_client, output_dir
-from modules.kullanici_sorgusu import sorgular
+from config import OLLAMA_PARALLEL, OLLAMA_RETRIES, get_ollama_client, output_dir
+from modules.kullanici_sorgusu import get_sorgular
+from modules.llm_onbellek import llm_onbellekli
 
+NIYET_MODEL = "gemma3:4b"
 
-def niyet_belirle(sorgu: str) -> str:
+
+def niyet_belirle(sorgu: str, client=None) -> str:
     prompt = f'''
 Bir kullanıcı şu arama sorgusunu yazdı: "{sorgu}"
 Bu sorgunun özünde hangi amaç yatıyor?
 Lütfen yalnızca 3–5 kelimelik, sade ve tematik bir niyet ifadesi ver.
 Nokta veya açıklama yazma.
 '''
-    response = ollama_client.chat(
-        model='gemma3:4b',
-        messages=[{'role': 'user', 'content': prompt}]
-    )
-    return response['message']['content'].strip().lower()
+    messages = [{'role': 'user', 'content': prompt}]
+    client = client or get_ollama_client()
+    # aynı sorgu için yeniden çalıştırmada LLM'e gidilmez (llm_onbellek)
+    icerik = llm_onbellekli(NIYET_MODEL, messages,
+                            lambda: client.chat(model=NIYET_MODEL, messages=messages)['message']['content'])
+    return icerik.strip().lower()
+
+def _tekrar_denenir_mi(e: Exception) -> bool:
+    # zaman aşımı / bağlantı hataları ve sunucu tarafı (5xx, 429) hatalar geçicidir
+    kod = getattr(e, "status_code", None)
+    if kod is not None and kod >= 0:
+        return kod >= 500 or kod == 429
+    return isinstance(e, OSError) or type(e).__module__.startswith("httpx")
+
+def _dene(sorgu: str, client, deneme: int, bekleme: float) -> tuple[str | None, str | None]:
+    for i in range(deneme + 1):
+        try:
+            return niyet_belirle(sorgu, client), None
+        except Exception as e:
+            if i == deneme or not _tekrar_denenir_mi(e):
+                return None, f"{type(e).__name__}: {e}"
+            time.sleep(bekleme * (2 ** i))
+    return None, "deneme yok"
+
+def niyetleri_belirle(sorgular, esz_zamanli: int = OLLAMA_PARALLEL, deneme: int = OLLAMA_RETRIES,
+                      bekleme: float = 1.0, client=None, ilerleme: bool = True) -> list[str | None]:
+    """Sorguların niyetleri, girdi sırasıyla; tüm denemeleri başarısız olan sorgu için None.
+
+    Aynı sorgu bir kez sorulur. İstek başına zaman aşımı istemcinin ayarıdır (config.OLLAMA_TIMEOUT).
+    """
+    sorgular = list(sorgular)
+    tekil = list(dict.fromkeys(sorgular))
+    client = client or get_ollama_client()
+    sonuc: dict[str, str | None] = {}
+    t0 = time.time()
+    hatali = 0
+    with ThreadPoolExecutor(max_workers=max(1, esz_zamanli), thread_name_prefix="niyet") as ex:
+        isler = [(s, ex.submit(_dene, s, client, deneme, bekleme)) for s in tekil]
+        for i, (s, f) in enumerate(isler, 1):  # sırayla topla: çıktı akışı da girdi sırasında
+            sonuc[s], hata = f.result()
+            if hata:
+                hatali += 1
+                print(f"⚠️  {s} → niyet alınamadı ({hata})")
+            elif ilerleme:
+                print(f"[{i}/{len(tekil)}] {s} → {sonuc[s]}")
+    sure = time.time() - t0
+    print(f"✅ {len(tekil)} sorgu {sure:.1f} sn'de sınıflandırıldı "
+          f"({len(tekil) / max(sure, 1e-9):.2f} sorgu/sn, {esz_zamanli} eş zamanlı, {hatali} hata).")
+    return [sonuc[s] for s in sorgular]
 
 if __name__ == "__main__":
     # İsterseniz ayrı bir komutla sadece niyet temalarını üretirsiniz
-    sonuclar = []
-    for s in sorgular:
-        n = niyet_belirle(s)
-        print(f"{s} → {n}")
-        sonuclar.append({"Sorgu": s, "Kısa Niyet Teması": n})
+    sorgular = get_sorgular()
+    sonuclar = [{"Sorgu": s, "Kısa Niyet Teması": n or ""} for s, n in zip(sorgular, niyetleri_belirle(sorgular))]
     pd.DataFrame(sonuclar).to_csv(f"{output_dir}/sorgu_niyet_tema.csv", index=False)
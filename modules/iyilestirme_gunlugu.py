@@ -0,0 +1,223 @@
+# modules/iyilestirme_gunlugu.py — iyileştirme akışları için çökmeye dayanıklı satır günlüğü
+#
+# Her biten satır <cache_dir>/iyilestirme/<çıktı adı>.jsonl dosyasına bir JSON satırı olarak eklenir
+# (flush + fsync); çıktı CSV'si yalnızca akışın sonunda yazıldığı için 70. satırda çöken bir
+# çalıştırma artık LLM işini kaybetmez.
+#   {"parmak_izi": ..., "satir": {...çıktı satırı...}, "zaman": ...}
+# Parmak izi: sha256(akış, sorgu/niyet, HTML etiketi, metin, model, prompt sürümü) — prompt sürümü
+# prompt şablonunun özetidir; şablon ya da model değişince eski kayıtlar kendiliğinden geçersizleşir.
+# Yeniden başlatmada günlükte olan satırlar atlanır, CSV günlükten girdi sırasıyla yeniden kurulur.
+# Her çalıştırma güncel girdinin parmak izlerini (girdi sırasıyla) <ad>.sira.json'a yazar ve günlükten
+# bu listede olmayan kayıtları (eski top-K girdisi, model ya da prompt sürümü) budar; CLI ile yeniden
+# kurulan CSV de yalnızca bu listedeki satırlardan oluşur.
+# Hata veren satırlar günlüğe yazılmaz; sonraki çalıştırmada yeniden denenir. Çıktı CSV'sinde
+# Durum="hata" ve hata mesajıyla yer alırlar (Yeni Skor / Yüzde Değişim boş), değişmemiş satırla karışmaz.
+# gunluklu_iyilestir(...) niyet/sorgu akışlarının ortak satır hattıdır: parmak izi, günlük, havuz, çıktı sırası.
+#   python -m modules.iyilestirme_gunlugu data/output/icerik_niyet_iyilestirme.csv   # CSV'yi günlükten kur
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+import pandas as pd
+
+from modules.satir_havuzu import satirlari_isle
+
+try:
+    from config import cache_dir
+except Exception:
+    cache_dir = os.path.join("data", "cache")
+
+GUNLUK_DIR = os.path.join(cache_dir, "iyilestirme")
+
+def gunluk_yolu(cikti_csv: str) -> str:
+    ad = os.path.splitext(os.path.basename(cikti_csv))[0]
+    return os.path.join(GUNLUK_DIR, ad + ".jsonl")
+
+def sira_yolu(gunluk: str) -> str:
+    return os.path.splitext(gunluk)[0] + ".sira.json"
+
+def prompt_surumu(prompt_kur: Callable[..., str]) -> str:
+    """Prompt şablonunun özeti — yer tutucu girdilerle kurulan prompt'un sha256'sı."""
+    ornek = prompt_kur("{sorgu}", "{metin}", "{etiket}", "{skor}")
+    return hashlib.sha256(ornek.encode("utf-8")).hexdigest()[:12]
+
+def satir_parmak_izi(akis: str, sorgu: str, etiket: str, metin: str, model: str, surum: str) -> str:
+    veri = [akis, sorgu, etiket, metin, model, surum]
+    return hashlib.sha256(json.dumps(veri, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class IyilestirmeGunlugu:
+    def __init__(self, yol: str):
+        self.yol = yol
+        self.kayitlar: dict[str, dict] = {}
+        self._mu = threading.Lock()
+        os.makedirs(os.path.dirname(yol) or ".", exist_ok=True)
+        bozuk = 0
+        if os.path.exists(yol):
+            with open(yol, encoding="utf-8") as f:
+                for satir in f:
+                    try:
+                        kayit = json.loads(satir)
+                        self.kayitlar[kayit["parmak_izi"]] = kayit["satir"]
+                    except (ValueError, KeyError, TypeError):
+                        bozuk += 1  # çökme anında yarım kalmış son satır
+        if bozuk:
+            print(f"⚠️  {yol}: {bozuk} okunamayan günlük satırı atlandı.")
+        self._f = open(yol, "a", encoding="utf-8")
+        if self._f.tell() and not self._son_bayt_satir_sonu():
+            self._f.write("\n")  # yarım satırın devamına yazılmasın
+
+    def _son_bayt_satir_sonu(self) -> bool:
+        with open(self.yol, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def __len__(self) -> int:
+        return len(self.kayitlar)
+
+    def __contains__(self, parmak_izi: str) -> bool:
+        return parmak_izi in self.kayitlar
+
+    def get(self, parmak_izi: str) -> dict | None:
+        return self.kayitlar.get(parmak_izi)
+
+    def ekle(self, parmak_izi: str, satir: dict):
+        kayit = json.dumps({"parmak_izi": parmak_izi, "satir": satir, "zaman": time.time()}, ensure_ascii=False)
+        with self._mu:
+            self._f.write(kayit + "\n")
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self.kayitlar[parmak_izi] = satir
+
+    def buda(self, tutulacak: set[str]) -> int:
+        """Günlüğü yalnızca `tutulacak` parmak izleriyle yeniden yazar; atılan kayıt sayısını döner."""
+        with self._mu:
+            atilan = [pi for pi in self.kayitlar if pi not in tutulacak]
+            if not atilan:
+                return 0
+            for pi in atilan:
+                del self.kayitlar[pi]
+            self._f.close()
+            with open(self.yol + ".tmp", "w", encoding="utf-8") as f:
+                for pi, satir in self.kayitlar.items():
+                    f.write(json.dumps({"parmak_izi": pi, "satir": satir, "zaman": time.time()}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self.yol + ".tmp", self.yol)
+            self._f = open(self.yol, "a", encoding="utf-8")
+            return len(atilan)
+
+    def kapat(self):
+        with self._mu:
+            self._f.close()
+
+def _durumlu(satir: dict) -> dict:
+    # Durum kolonundan önce yazılmış günlük kayıtları başarılı satırlardır
+    return {**satir, "Durum": satir.get("Durum", "ok"), "Hata": satir.get("Hata", "")}
+
+def gunluklu_iyilestir(akis: str, cikti_csv: str, isler: list[tuple], eski_skor: Callable,
+                       iyilestir: Callable, metin_kolonlari: Callable[..., dict], model: str, surum: str,
+                       esz_zamanli: int, etiket: str = "") -> list[dict]:
+    """Günlükte olmayan satırları eş zamanlı iyileştirir; tüm çıktı satırlarını girdi sırasıyla döner.
+
+    isler: [(no, sorgu, html etiketi, metin, skor)]
+    eski_skor(sorgu, metin, skor) -> float; iyilestir(sorgu, metin, etiket, eski, label) -> (aday, yeni)
+    metin_kolonlari(sorgu, etiket, metin, aday) -> akışa özgü metin kolonları (skor/durum kolonları eklenir)
+    """
+    gunluk = IyilestirmeGunlugu(gunluk_yolu(cikti_csv))
+    toplam = len(isler)
+    eskiler: dict[int, float] = {}
+    hatalar: dict[int, str] = {}
+
+    def _pi(sorgu, tag, metin) -> str:
+        return satir_parmak_izi(akis, sorgu, tag, metin, model, surum)
+
+    # güncel girdinin satırları: CLI ile yeniden kurulumun sırası, günlükte kalacak kayıtlar
+    sira = [_pi(*j[1:4]) for j in isler]
+    with open(sira_yolu(gunluk.yol) + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(sira, f)
+    os.replace(sira_yolu(gunluk.yol) + ".tmp", sira_yolu(gunluk.yol))
+    atilan = gunluk.buda(set(sira))
+    if atilan:
+        print(f"🧹 {atilan} eski günlük kaydı (başka girdi/model/prompt sürümü) budandı ({gunluk.yol})", flush=True)
+
+    def _satir(sorgu, tag, metin, aday, eski, yeni, hata: str = "") -> dict:
+        # iyileşmeyen satır da tutulur, değişim 0'a kırpılır; hatalı satırın yeni skoru/değişimi boştur
+        if hata:
+            yeni = degisim = None
+        else:
+            degisim = round(float((yeni - eski) / max(eski, 1e-8) * 100.0 if yeni > eski else 0.0), 2)
+            yeni = round(float(yeni), 6)
+        return {
+            **metin_kolonlari(sorgu, tag, metin, aday),
+            "Eski Skor": None if eski is None else round(float(eski), 6),
+            "Yeni Skor": yeni,
+            "Yüzde Değişim": degisim,
+            "Durum": "hata" if hata else "ok",
+            "Hata": hata,
+        }
+
+    def _isle(no, sorgu, tag, metin, skor) -> dict:
+        t0 = time.time()
+        try:
+            eski = eskiler[no] = eski_skor(sorgu, metin, skor)
+            print(f"\n[{time.strftime('%H:%M:%S')}] → Row {no}/{toplam} | tag='{tag}' | old={eski:.4f}", flush=True)
+            aday, yeni = iyilestir(sorgu, metin, tag, eski, f"#{no} ")
+            satir = _satir(sorgu, tag, metin, aday, eski, yeni)
+            # yalnızca gerçekten biten satır günlüğe girer; hata veren satır yeniden başlatmada tekrar denenir
+            gunluk.ekle(_pi(sorgu, tag, metin), satir)
+        except Exception as e:
+            hatalar[no] = f"{type(e).__name__}: {e}"
+            raise
+        msg = f"✅ kept (Δ=+{satir['Yüzde Değişim']:.2f}%)" if yeni > eski else "✅ kept (no improvement; Δ=0.00%)"
+        print(f"   #{no} {msg} | ⏱ row time: {time.time() - t0:.2f} s", flush=True)
+        return satir
+
+    bekleyen = [j for j in isler if _pi(*j[1:4]) not in gunluk]
+    if len(bekleyen) < toplam:
+        print(f"♻️  {toplam - len(bekleyen)}/{toplam} rows already in journal → skipped ({gunluk.yol})", flush=True)
+    try:
+        if bekleyen:
+            satirlari_isle(bekleyen, _isle, esz_zamanli, etiket)
+    finally:
+        gunluk.kapat()
+
+    satirlar = []
+    for no, sorgu, tag, metin, _ in isler:
+        satir = gunluk.get(_pi(sorgu, tag, metin))
+        if satir is None:
+            satir = _satir(sorgu, tag, metin, metin, eskiler.get(no), None, hatalar.get(no, "işlenmedi"))
+        satirlar.append(_durumlu(satir))
+    return satirlar
+
+def csv_yeniden_olustur(cikti_csv: str, yol: str | None = None) -> int:
+    """Son çalıştırmanın girdisindeki, günlükte biten satırları girdi sırasıyla CSV'ye yazar."""
+    yol = yol or gunluk_yolu(cikti_csv)
+    for y in (yol, sira_yolu(yol)):
+        if not os.path.exists(y):
+            raise FileNotFoundError(y)
+    with open(sira_yolu(yol), encoding="utf-8") as f:
+        sira = json.load(f)
+    g = IyilestirmeGunlugu(yol)
+    g.kapat()
+    satirlar = [_durumlu(g.kayitlar[pi]) for pi in sira if pi in g.kayitlar]
+    if len(satirlar) < len(sira):
+        print(f"⚠️  {len(sira) - len(satirlar)}/{len(sira)} satır günlükte yok (bitmemiş ya da hatalı) → yazılmadı.")
+    pd.DataFrame(satirlar).to_csv(cikti_csv, index=False, encoding="utf-8")
+    return len(satirlar)
+
+def main():
+    ap = argparse.ArgumentParser(description="İyileştirme günlüğünden çıktı CSV'sini yeniden kur")
+    ap.add_argument("cikti_csv", help="ör. data/output/icerik_niyet_iyilestirme.csv")
+    ap.add_argument("--gunluk", help="Günlük dosyası (varsayılan: <cache_dir>/iyilestirme/<ad>.jsonl)")
+    args = ap.parse_args()
+    n = csv_yeniden_olustur(args.cikti_csv, args.gunluk)
+    print(f"💾 {n} satır günlükten yazıldı → {args.cikti_csv}")
+
+if __name__ == "__main__":
+    main()
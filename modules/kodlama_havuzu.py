@@ -0,0 +1,124 @@
+# modules/kodlama_havuzu.py — çok süreçli embedding (encode) havuzu
+#
+# Her işçi süreç kendi model kopyasını yükler ve az sayıda torch thread'i ile
+# çalışır; kısa cümlelerden oluşan büyük parça kümeleri parçalara (chunk)
+# bölünüp işçilere dağıtılır. Sonuçlar giriş sırasıyla, aynı anda en fazla
+# max_inflight parça bellekte olacak şekilde akıtılır.
+#
+# EncodePool.encode(), SentenceTransformer.encode ile aynı imzayı taşır; bu
+# yüzden cached_encode / ContentIndex / rakip_analiz tarafından model yerine
+# doğrudan kullanılabilir. config.ENCODE_WORKERS > 1 ise config.get_encoder()
+# havuzu döndürür.
+#
+# Not: işçiler "spawn" ile başlar (torch ile fork güvenli değil); ana script'in
+# üst seviye kodu `if __name__ == "__main__":` altında olmalıdır.
+from __future__ import annotations
+
+import atexit
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from typing import Iterator
+
+import numpy as np
+
+try:
+    from config import EMBED_BACKEND as _BACKEND
+    from config import MODEL_NAME as _MODEL_NAME
+except Exception:
+    _MODEL_NAME, _BACKEND = "emrecan/bert-base-turkish-cased-mean-nli-stsb-tr", "torch"
+
+# ---------- işçi tarafı ----------
+_W_MODEL = None
+_W_HATA: str | None = None
+
+def _worker_init(model_name: str, backend: str, threads: int):
+    global _W_MODEL
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    try:
+        from modules.onnx_model import load_embedding_model
+        _W_MODEL = load_embedding_model(model_name, backend)
+    except Exception as e:  # initializer'da hata havuzu sonsuz yeniden başlatmaya sokar; ilk işte bildir
+        global _W_HATA
+        _W_HATA = f"{type(e).__name__}: {e}"
+
+def _worker_encode(texts: list[str], batch_size: int) -> np.ndarray:
+    if _W_MODEL is None:
+        raise RuntimeError(f"İşçide model yüklenemedi: {_W_HATA}")
+    return np.asarray(_W_MODEL.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                      show_progress_bar=False), dtype=np.float32)
+
+# ---------- ana süreç tarafı ----------
+class EncodePool:
+    def __init__(self, workers: int | None = None, model_name: str = _MODEL_NAME, backend: str = _BACKEND,
+                 chunk_size: int = 256, max_inflight: int | None = None, threads_per_worker: int | None = None):
+        cpu = os.cpu_count() or 1
+        self.workers = max(1, workers or cpu)
+        self.chunk_size = chunk_size
+        self.max_inflight = max_inflight or 2 * self.workers
+        threads = threads_per_worker or max(1, cpu // self.workers)
+        ctx = mp.get_context("spawn")
+        t0 = time.time()
+        self._pool = ctx.Pool(self.workers, initializer=_worker_init, initargs=(model_name, backend, threads))
+        print(f"🧵 Encode havuzu: {self.workers} işçi × {threads} thread ({model_name}, {backend}) "
+              f"başlatıldı ({time.time() - t0:.1f} s)")
+
+    def encode_stream(self, sentences, batch_size: int = 32, chunk_size: int | None = None) -> Iterator[np.ndarray]:
+        """Parça parça, giriş sırasıyla vektör matrisleri üretir; bellekte en fazla max_inflight parça."""
+        chunk_size = chunk_size or self.chunk_size
+        texts = list(sentences)
+        chunks = (texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size))
+        inflight = deque()
+        for ch in chunks:
+            inflight.append(self._pool.apply_async(_worker_encode, (ch, batch_size)))
+            if len(inflight) >= self.max_inflight:
+                yield inflight.popleft().get()
+        while inflight:
+            yield inflight.popleft().get()
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True, convert_to_tensor: bool = False,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False, **_):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        parts = list(self.encode_stream(texts, batch_size=batch_size))
+        vecs = np.concatenate(parts) if parts else np.zeros((0, 0), np.float32)
+        if normalize_embeddings and len(vecs):
+            vecs = vecs / np.clip(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12, None)
+        out = vecs[0] if single else vecs
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(np.ascontiguousarray(out))
+        return out
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_acik_havuzlar: list[EncodePool] = []
+
+def havuz_olustur(**kw) -> EncodePool:
+    p = EncodePool(**kw)
+    _acik_havuzlar.append(p)
+    return p
+
+@atexit.register
+def _kapat():
+    for p in _acik_havuzlar:
+        try:
+            p.close()
+        except Exception:
+            pass
@@ -1,24 +1,45 @@
-import pandas as pd
+import threading
 
 from config import input_dir
 
-# Excel dosyasını oku
-df = pd.read_excel(f"{input_dir}/1hafta.xlsx")
-month3 = pd.read_excel(f"{input_dir}/3ay.xlsx")
+_sorgular = None
+_lock = threading.Lock()
 
-# Boş olan sorguları ayıkla
-df = df.dropna(subset=["En çok yapılan sorgular"])
+def _yukle() -> list:
+    import pandas as pd
 
-# Tıklamalara göre en çok 5 sorgu
-ilk5_tiklama = df.sort_values(by="Tıklamalar", ascending=False).head(5)
+    # Excel dosyasını oku
+    df = pd.read_excel(f"{input_dir}/1hafta.xlsx")
 
-# Gösterimlere göre en çok 5 sorgu
-ilk5_gosterim = df.sort_values(by="Gösterimler", ascending=False).head(5)
+    # Boş olan sorguları ayıkla
+    df = df.dropna(subset=["En çok yapılan sorgular"])
 
-# İkisini birleştir ve tekrar edenleri çıkar
-birlesik_sorgular = pd.concat([ilk5_tiklama, ilk5_gosterim]).drop_duplicates(subset=["En çok yapılan sorgular"])
+    # Tıklamalara göre en çok 5 sorgu
+    ilk5_tiklama = df.sort_values(by="Tıklamalar", ascending=False).head(5)
 
-# Nihai sorgu listesi
-sorgular = birlesik_sorgular["En çok yapılan sorgular"].tolist()
+    # Gösterimlere göre en çok 5 sorgu
+    ilk5_gosterim = df.sort_values(by="Gösterimler", ascending=False).head(5)
 
-print("Öncelikli sorgular:", sorgular)
+    # İkisini birleştir ve tekrar edenleri çıkar
+    birlesik_sorgular = pd.concat([ilk5_tiklama, ilk5_gosterim]).drop_duplicates(subset=["En çok yapılan sorgular"])
+
+    # Nihai sorgu listesi
+    sorgular = birlesik_sorgular["En çok yapılan sorgular"].tolist()
+
+    print("Öncelikli sorgular:", sorgular)
+    return sorgular
+
+def get_sorgular() -> list:
+    """Sorgu listesini ilk kullanımda Excel'den okur (thread-safe, bir kez)."""
+    global _sorgular
+    if _sorgular is None:
+        with _lock:
+            if _sorgular is None:
+                _sorgular = _yukle()
+    return _sorgular
+
+def __getattr__(name):
+    # Eski kullanım: `from modules.kullanici_sorgusu import sorgular`
+    if name == "sorgular":
+        return get_sorgular()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,127 @@
+# modules/llm_onbellek.py — Ollama yanıtları için kalıcı (SQLite) önbellek
+#
+# Anahtar: sha256(model, mesajlar (tam prompt), seçenekler) — seçeneklere yeniden deneme
+# sırası gibi çağrıyı ayıran her şey girer; aynı girdilerle yeniden çalıştırma LLM'e gitmez.
+#   <cache_dir>/llm.sqlite   yanitlar(anahtar, model, yanit, olusturma)
+# Ayarlar (config / ortam):
+#   LLM_CACHE_TTL     kayıt ömrü (sn); 0 = süresiz
+#   LLM_CACHE_BYPASS  1 ise önbellek okunmaz (her çağrı LLM'e gider), yeni yanıtlar yine yazılır
+# Süreç boyunca isabet/ıska sayılır: get_llm_cache().ozet()
+#   python -m modules.llm_onbellek            # kayıt sayısı / boyut
+#   python -m modules.llm_onbellek --temizle  # süresi dolanları (ya da --hepsi ile tümünü) sil
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+try:
+    from config import LLM_CACHE_BYPASS, LLM_CACHE_TTL, cache_dir
+except Exception:
+    cache_dir = os.path.join("data", "cache")
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "0"))
+    LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(cache_dir, "llm.sqlite"))
+
+def llm_anahtari(model: str, mesajlar: list[dict], secenekler: dict | None = None) -> str:
+    veri = {"model": model, "mesajlar": mesajlar, "secenekler": secenekler or {}}
+    return hashlib.sha256(json.dumps(veri, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+class LLMCache:
+    def __init__(self, yol: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL, bypass: bool = LLM_CACHE_BYPASS):
+        self.yol = yol
+        self.ttl = ttl
+        self.bypass = bypass
+        self.sayac = {"hit": 0, "miss": 0}
+        self._mu = threading.Lock()
+        self._yerel = threading.local()  # sqlite bağlantısı iş parçacığı başına
+        os.makedirs(os.path.dirname(yol) or ".", exist_ok=True)
+        self._db().execute(
+            "CREATE TABLE IF NOT EXISTS yanitlar ("
+            "anahtar TEXT PRIMARY KEY, model TEXT NOT NULL, yanit TEXT NOT NULL, olusturma REAL NOT NULL)")
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._yerel, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.yol, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._yerel.db = db
+        return db
+
+    def _say(self, tur: str):
+        with self._mu:
+            self.sayac[tur] += 1
+
+    def get(self, anahtar: str) -> str | None:
+        satir = self._db().execute("SELECT yanit, olusturma FROM yanitlar WHERE anahtar = ?", (anahtar,)).fetchone()
+        if satir is None or (self.ttl > 0 and time.time() - satir[1] > self.ttl):
+            return None
+        return satir[0]
+
+    def put(self, anahtar: str, model: str, yanit: str):
+        self._db().execute("INSERT OR REPLACE INTO yanitlar VALUES (?, ?, ?, ?)", (anahtar, model, yanit, time.time()))
+
+    def cagir(self, model: str, mesajlar: list[dict], cagri: Callable[[], str], secenekler: dict | None = None,
+              gecerli: Callable[[str], bool] | None = None) -> str:
+        """Önbellekte varsa kayıtlı yanıt, yoksa cagri() — boş/geçersiz yanıtlar saklanmaz."""
+        anahtar = llm_anahtari(model, mesajlar, secenekler)
+        if not self.bypass:
+            yanit = self.get(anahtar)
+            if yanit is not None:
+                self._say("hit")
+                return yanit
+        self._say("miss")
+        yanit = cagri()
+        if isinstance(yanit, str) and yanit.strip() and (gecerli is None or gecerli(yanit)):
+            self.put(anahtar, model, yanit)
+        return yanit
+
+    def ozet(self) -> str:
+        h, m = self.sayac["hit"], self.sayac["miss"]
+        return f"LLM önbelleği: {h} isabet, {m} LLM çağrısı ({h / max(h + m, 1):.0%} isabet)"
+
+    def temizle(self, hepsi: bool = False) -> int:
+        if hepsi:
+            return self._db().execute("DELETE FROM yanitlar").rowcount
+        if self.ttl <= 0:
+            return 0
+        return self._db().execute("DELETE FROM yanitlar WHERE olusturma < ?", (time.time() - self.ttl,)).rowcount
+
+_cache: LLMCache | None = None
+_cache_mu = threading.Lock()
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        with _cache_mu:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
+
+def llm_onbellekli(model: str, mesajlar: list[dict], cagri: Callable[[], str], secenekler: dict | None = None,
+                   gecerli: Callable[[str], bool] | None = None) -> str:
+    return get_llm_cache().cagir(model, mesajlar, cagri, secenekler, gecerli)
+
+def main():
+    ap = argparse.ArgumentParser(description="LLM yanıt önbelleği")
+    ap.add_argument("--temizle", action="store_true", help="Süresi dolan kayıtları sil (LLM_CACHE_TTL)")
+    ap.add_argument("--hepsi", action="store_true", help="--temizle ile: tüm kayıtları sil")
+    args = ap.parse_args()
+    c = get_llm_cache()
+    if args.temizle:
+        print(f"🧹 {c.temizle(hepsi=args.hepsi)} kayıt silindi.")
+    n, = c._db().execute("SELECT COUNT(*) FROM yanitlar").fetchone()
+    boyut = os.path.getsize(c.yol) / 1024 / 1024 if os.path.exists(c.yol) else 0
+    print(f"📦 {c.yol}: {n} yanıt, {boyut:.1f} MB")
+    for model, say in c._db().execute("SELECT model, COUNT(*) FROM yanitlar GROUP BY model"):
+        print(f"  {model}: {say}")
+
+if __name__ == "__main__":
+    main()
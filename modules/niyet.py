@@ -2,14 +2,15 @@
 import pandas as pd
 
 from config import output_dir
+from modules.tablo_io import tablo_oku, tam_tablo_yolu
 
 IN_CSV  = f"{output_dir}/html_icerik_niyet_uyumu.csv"
 TOP_K   = 10
 OUT_CSV = f"{output_dir}/icerik_niyet_top{TOP_K}.csv"
 
 def sort_intent_similarity(dedup_within_intent: bool = True):
-    # 1) Skor formatını bozmamak için string olarak yükle
-    df = pd.read_csv(IN_CSV, encoding="utf-8-sig", dtype=str)
+    # 1) Skor formatını bozmamak için string olarak yükle (Parquet ise skor sayısal gelir)
+    df = tablo_oku(tam_tablo_yolu(IN_CSV), dtype=str)
 
     # 2) Gerekli kolonlar
     need = {"Kullanıcı Niyeti", "Benzerlik Skoru", "Web İçeriği"}
@@ -19,7 +20,7 @@ def sort_intent_similarity(dedup_within_intent: bool = True):
 
     # 3) Sıralama için sayısal kopya; çıkışta ham skoru yazacağız
     df["_score_raw"] = df["Benzerlik Skoru"]
-    num = (df["_score_raw"]
+    num = (df["_score_raw"].astype(str)
              .str.replace(",", ".", regex=False)
              .str.replace("%", "", regex=False)
              .str.strip())
@@ -0,0 +1,204 @@
+# modules/niyet_cozucu.py — benzer sorgular için LLM'siz niyet (en yakın etiketli sorgu)
+#
+# "reklam ver", "reklam vermek", "reklam verme" LLM'den neredeyse aynı niyeti alır.
+# niyetleri_coz(sorgular):
+#   1. Etiketli sorgular: sorgu_niyet_tema.csv + niyet önbelleği (<cache_dir>/niyet_etiketleri.json)
+#   2. Aynı sorgu etiketliyse niyeti aynen alınır
+#   3. Değilse sorgu kodlanır; kosinüs ≥ NIYET_ESIK olan en yakın etiketli (ya da bu partide
+#      LLM'e gidecek) sorgunun niyeti kullanılır. Etiketli sorguların vektörleri kalıcı bir vektör
+#      indeksinde (<cache_dir>/niyet_etiket_indeksi.npz, tür: VECTOR_INDEX) tutulur; her çalıştırmada
+#      yalnızca indekste olmayan etiketli sorgular eklenir, her bilinmeyen sorgu için top-1 aranır
+#   4. Kalan gerçekten yeni sorgular intent_classifier.niyetleri_belirle ile eş zamanlı sorulur
+#   5. Yeni niyetler kanonikleştirilir: mevcut bir niyete kosinüs ≥ NIYET_KANONIK_ESIK ise o
+#      niyet yazılır; partideki birbirine yakın niyetler de en sık geçen ifadeye indirgenir —
+#      tam_niyet_uyum_tablosu daha az farklı niyet kolonu skorlar
+# Yeni etiketler (parti içi birleştirmeden sonraki haliyle) önbelleğe yazılır; dönen ve önbellekteki
+# niyet aynıdır. Kaç LLM çağrısının kurtarıldığı raporlanır.
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+from modules.icerik_indeksi import kodla
+from modules.vektor_deposu import normalize_text
+from modules.vektor_indeksi import vektor_indeksi_olustur, vektor_indeksi_yukle
+
+try:
+    from config import VECTOR_INDEX, cache_dir, embed_cache_key, output_dir
+except Exception:
+    cache_dir = os.path.join("data", "cache")
+    output_dir = os.path.join("data", "output")
+    VECTOR_INDEX = os.getenv("VECTOR_INDEX", "exact")
+
+    def embed_cache_key() -> str:
+        return "emrecan/bert-base-turkish-cased-mean-nli-stsb-tr"
+
+NIYET_ESIK = float(os.getenv("NIYET_ESIK", "0.92"))                  # sorgu ↔ etiketli sorgu
+NIYET_KANONIK_ESIK = float(os.getenv("NIYET_KANONIK_ESIK", "0.90"))  # yeni niyet ↔ mevcut niyet
+TEMA_CSV = os.path.join(output_dir, "sorgu_niyet_tema.csv")
+NIYET_ONBELLEK = os.getenv("NIYET_ONBELLEK", os.path.join(cache_dir, "niyet_etiketleri.json"))
+ETIKET_INDEKSI = os.getenv("NIYET_ETIKET_INDEKSI", os.path.join(cache_dir, "niyet_etiket_indeksi"))  # .npz + .json
+
+def temizle_niyet(text: str) -> str:
+    if not text:
+        return ""
+    text = text.lower().strip()
+    text = re.sub(r"[.?!,:;]+$", "", text)
+    text = re.sub(r"\s+", " ", text)
+    text = text.replace('"', '').replace("'", '')
+    return text
+
+def _sorgu_anahtari(sorgu: str) -> str:
+    return normalize_text(sorgu).casefold()
+
+def etiketleri_yukle(tema_csv: str = TEMA_CSV, onbellek: str = NIYET_ONBELLEK) -> dict[str, str]:
+    """{normalize sorgu: niyet} — önbellek CSV'deki aynı sorguyu ezer (daha yenidir)."""
+    etiketler: dict[str, str] = {}
+    if os.path.exists(tema_csv):
+        from modules.tablo_io import tablo_oku
+        df = tablo_oku(tema_csv)
+        if {"Sorgu", "Kısa Niyet Teması"} <= set(df.columns):
+            for s, n in zip(df["Sorgu"], df["Kısa Niyet Teması"]):
+                if isinstance(s, str) and isinstance(n, str) and temizle_niyet(n):
+                    etiketler[_sorgu_anahtari(s)] = temizle_niyet(n)
+    try:
+        with open(onbellek, encoding="utf-8") as f:
+            etiketler.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    return etiketler
+
+def _onbellege_yaz(yeni: dict[str, str], onbellek: str = NIYET_ONBELLEK):
+    try:
+        with open(onbellek, encoding="utf-8") as f:
+            mevcut = json.load(f)
+    except (OSError, ValueError):
+        mevcut = {}
+    mevcut.update(yeni)
+    os.makedirs(os.path.dirname(onbellek) or ".", exist_ok=True)
+    with open(onbellek + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(mevcut, f, ensure_ascii=False, indent=0)
+    os.replace(onbellek + ".tmp", onbellek)
+
+def etiket_indeksi(etiketli: list[str], yol: str | None = ETIKET_INDEKSI):
+    """(vektör indeksi, id → etiketli sorgu) — diskteki indekse yalnızca eksik sorgular kodlanıp eklenir.
+
+    İndeks başka model/tür için kurulduysa ya da artık etiketli olmayan bir sorgu içeriyorsa baştan kurulur.
+    yol=None: diske yazılmaz (yalnızca bu çağrı için).
+    """
+    ix, anahtarlar = None, []
+    if yol:
+        try:
+            with open(yol + ".json", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["model"] == embed_cache_key() and meta["tur"] == VECTOR_INDEX:
+                ix, anahtarlar = vektor_indeksi_yukle(yol), list(meta["anahtarlar"])
+        except Exception:
+            ix, anahtarlar = None, []  # yok, bozuk ya da yarım yazılmış
+    if ix is not None and (len(ix) != len(anahtarlar) or not set(anahtarlar) <= set(etiketli)):
+        ix, anahtarlar = None, []
+    var = set(anahtarlar)
+    eksik = [k for k in etiketli if k not in var]
+    if eksik:
+        vecs = kodla(eksik)
+        if ix is None:
+            ix = vektor_indeksi_olustur(VECTOR_INDEX, vecs.shape[1])
+        ix.add(vecs, ids=np.arange(len(anahtarlar), len(anahtarlar) + len(eksik)))
+        anahtarlar += eksik
+        if yol:
+            os.makedirs(os.path.dirname(yol) or ".", exist_ok=True)
+            ix.save(yol)
+            with open(yol + ".json.tmp", "w", encoding="utf-8") as f:
+                json.dump({"model": embed_cache_key(), "tur": VECTOR_INDEX, "anahtarlar": anahtarlar}, f,
+                          ensure_ascii=False)
+            os.replace(yol + ".json.tmp", yol + ".json")
+    return ix, anahtarlar
+
+def _kanonik(niyetler: list[str], mevcut: list[str], esik: float) -> dict[str, str]:
+    """Yeni niyet → kanonik niyet; mevcutlara (ve önce gelen yenilere) yeterince yakınsa onlara bağlanır."""
+    yeni = [n for n in dict.fromkeys(niyetler) if n and n not in mevcut]
+    if not yeni:
+        return {}
+    havuz = list(dict.fromkeys(mevcut))
+    vecs = kodla(havuz + yeni)
+    havuz_vecs = list(vecs[:len(havuz)])
+    esleme = {}
+    for n, v in zip(yeni, vecs[len(havuz):]):
+        if havuz_vecs:
+            skor = np.asarray(havuz_vecs) @ v
+            j = int(np.argmax(skor))
+            if skor[j] >= esik:
+                esleme[n] = havuz[j]
+                continue
+        havuz.append(n)
+        havuz_vecs.append(v)
+    return esleme
+
+def niyetleri_coz(sorgular, esik: float = NIYET_ESIK, kanonik_esik: float = NIYET_KANONIK_ESIK,
+                  llm=None, etiketler: dict[str, str] | None = None, kaydet: bool = True) -> list[str]:
+    """Sorguların (temizlenmiş, kanonik) niyetleri, girdi sırasıyla; alınamayanlar "".
+
+    llm(sorgular) -> niyet listesi; verilmezse intent_classifier.niyetleri_belirle.
+    """
+    if llm is None:
+        from modules.intent_classifier import niyetleri_belirle as llm
+    sorgular = list(sorgular)
+    # indeks yalnızca varsayılan etiket kaynakları için diskte tutulur
+    indeks_yolu = ETIKET_INDEKSI if etiketler is None and kaydet else None
+    etiketler = etiketleri_yukle() if etiketler is None else etiketler
+    anahtarlar = [_sorgu_anahtari(s) for s in sorgular]
+    bilinmeyen = [k for k in dict.fromkeys(anahtarlar) if k not in etiketler]
+
+    # en yakın etiketli sorgu ya da bu partide LLM'e gidecek temsilci
+    bagli: dict[str, str] = {}   # bilinmeyen sorgu -> niyetini alacağı sorgu
+    temsilciler: list[str] = []
+    if bilinmeyen:
+        b_vecs = kodla(bilinmeyen)
+        skor = np.zeros((len(bilinmeyen), 0), np.float32)
+        if etiketler:
+            ix, etiketli = etiket_indeksi(list(etiketler), indeks_yolu)
+            skor, idler = ix.search(b_vecs, k=1)
+        t_vecs = []
+        for i, k in enumerate(bilinmeyen):
+            if skor.shape[1] and idler[i, 0] >= 0 and skor[i, 0] >= esik:
+                bagli[k] = etiketli[int(idler[i, 0])]
+                continue
+            if t_vecs:
+                t_skor = np.asarray(t_vecs) @ b_vecs[i]
+                j = int(np.argmax(t_skor))
+                if t_skor[j] >= esik:
+                    bagli[k] = temsilciler[j]
+                    continue
+            temsilciler.append(k)
+            t_vecs.append(b_vecs[i])
+
+    yeni: dict[str, str] = {}
+    if temsilciler:
+        ilk_metin = {k: s for s, k in reversed(list(zip(sorgular, anahtarlar)))}
+        cevaplar = llm([ilk_metin[k] for k in temsilciler])
+        ham = {k: temizle_niyet(n or "") for k, n in zip(temsilciler, cevaplar)}
+        esleme = _kanonik(list(ham.values()), list(etiketler.values()), kanonik_esik)
+        yeni = {k: esleme.get(n, n) for k, n in ham.items() if n}
+        etiketler.update(yeni)
+    for k, kaynak in bagli.items():
+        if etiketler.get(kaynak):
+            etiketler[k] = yeni[k] = etiketler[kaynak]
+    # bu partideki yakın niyetler tek ifadeye: en sık geçen ifade kanonik olur; önbelleğe de bu yazılır
+    sayim = Counter(etiketler[k] for k in anahtarlar if etiketler.get(k))
+    esleme = _kanonik(sorted(sayim, key=lambda n: (-sayim[n], n)), [], kanonik_esik)
+    for k in dict.fromkeys(anahtarlar):
+        if etiketler.get(k) in esleme:
+            etiketler[k] = yeni[k] = esleme[etiketler[k]]
+    if kaydet and yeni:
+        _onbellege_yaz(yeni)
+
+    sonuc = [etiketler.get(k, "") for k in anahtarlar]
+    n_tekil = len(dict.fromkeys(anahtarlar))
+    print(f"🧭 {n_tekil} tekil sorgu: {n_tekil - len(bilinmeyen)} etiketliydi, {len(bagli)} en yakın sorgudan, "
+          f"{len(temsilciler)} LLM'e gitti → {len(bagli)} LLM çağrısı kurtarıldı; "
+          f"{len({n for n in sonuc if n})} farklı niyet.")
+    return sonuc
@@ -1,14 +1,15 @@
 # modules/niyet_iylestir.py — verbose + clamp non-improvements to 0% change
 from __future__ import annotations
 import os, json, re, time
+import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer, util
 
 # ============== CONFIG (edit here) ==============
 MODE = "niyet"                     # "niyet" | "sorgu" | "both"
 MIN_IMPROVE = 0.0003               # ~0.03% absolute relative improvement
 MAX_ATTEMPTS = 3                   # try up to N; if not improved, add anyway with 0% change
 ONLY_IMPROVED = False              # do NOT skip non-improved rows
+PARALLEL = None                    # rows in flight at once; None = config.IYILESTIRME_PARALLEL, 1 = sequential
 OLLAMA_MODEL = "gemma3:4b"
 # ===============================================
 
@@ -24,12 +25,23 @@ SORGU_IN_CSV  = os.path.join(_OUT, "icerik_sorgu_top10.csv")
 NIYET_OUT_CSV = os.path.join(_OUT, "icerik_niyet_iyilestirme.csv")
 SORGU_OUT_CSV = os.path.join(_OUT, "icerik_sorgu_iyilestirme.csv")
 
-# ---- model ----
+# ---- model (lazy: yalnızca embedding deposunda olmayan metin gelirse yüklenir) ----
 try:
-    from config import model as _cfg_model  # instance or callable
-    st_model = _cfg_model() if callable(_cfg_model) else _cfg_model
+    from config import get_model as st_model
 except Exception:
-    st_model = SentenceTransformer("emrecan/bert-base-turkish-cased-mean-nli-stsb-tr")
+    _st = None
+    def st_model():
+        global _st
+        if _st is None:
+            from sentence_transformers import SentenceTransformer
+            _st = SentenceTransformer("emrecan/bert-base-turkish-cased-mean-nli-stsb-tr")
+        return _st
+
+from modules.iyilestirme_gunlugu import gunluklu_iyilestir, prompt_surumu
+from modules.llm_onbellek import llm_onbellekli
+from modules.satir_havuzu import IYILESTIRME_PARALLEL
+from modules.tablo_io import tablo_oku
+from modules.vektor_deposu import cached_encode
 
 from modules.prompt.niyet_prompt import generate_niyet_prompt as _gen_niyet_prompt
 from modules.prompt.sorgu_prompt import generate_sorgu_prompt as _gen_sorgu_prompt
@@ -46,14 +58,12 @@ def fmt_sec(s: float) -> str:
 def _read_csv_robust(path: str) -> pd.DataFrame:
     t0 = time.time()
     print(f"[{now()}] ⬇️  Reading CSV: {path}", flush=True)
-    for enc in (None, "utf-8", "utf-8-sig", "latin-1"):
-        try:
-            df = pd.read_csv(path, encoding=enc) if enc else pd.read_csv(path)
-            print(f"[{now()}] ✅ CSV loaded ({len(df)} rows) in {fmt_sec(time.time()-t0)}", flush=True)
-            return df
-        except Exception:
-            continue
-    raise RuntimeError(f"CSV okunamadı: {path}")
+    try:
+        df = tablo_oku(path)  # CSV ya da yanındaki Parquet
+    except Exception:
+        raise RuntimeError(f"CSV okunamadı: {path}")
+    print(f"[{now()}] ✅ CSV loaded ({len(df)} rows) in {fmt_sec(time.time()-t0)}", flush=True)
+    return df
 
 def _pick_col(df: pd.DataFrame, names):
     low = {c.lower(): c for c in df.columns}
@@ -75,24 +85,40 @@ def _norm_score(x) -> float:
 
 def _similarity(a_text: str, b_text: str) -> float:
     if not a_text or not b_text: return 0.0
-    a = st_model.encode(a_text, convert_to_tensor=True, normalize_embeddings=True)
-    b = st_model.encode(b_text, convert_to_tensor=True, normalize_embeddings=True)
-    return float(util.cos_sim(a, b).item())
-
-def _run_llm(prompt: str) -> str:
-    from ollama import chat
-    t0 = time.time()
-    print(f"[{now()}] 🔁 LLM call → {OLLAMA_MODEL} (chars: {len(prompt)})", flush=True)
-    resp = chat(model=OLLAMA_MODEL, messages=[{"role": "user", "content": prompt}])
-    out = resp.get("message", {}).get("content", str(resp))
-    print(f"[{now()}] ✅ LLM done in {fmt_sec(time.time()-t0)}", flush=True)
-    return out
+    a = cached_encode(st_model, a_text, normalize_embeddings=True)
+    b = cached_encode(st_model, b_text, normalize_embeddings=True)
+    return float(np.dot(a, b))
+
+def _run_llm(prompt: str, attempt: int = 1, field: str = "Geliştirilmiş İçerik") -> str:
+    messages = [{"role": "user", "content": prompt}]
+
+    def _call() -> str:
+        from ollama import chat
+        t0 = time.time()
+        print(f"[{now()}] 🔁 LLM call → {OLLAMA_MODEL} (chars: {len(prompt)})", flush=True)
+        resp = chat(model=OLLAMA_MODEL, messages=messages)
+        out = resp.get("message", {}).get("content", str(resp))
+        print(f"[{now()}] ✅ LLM done in {fmt_sec(time.time()-t0)}", flush=True)
+        return out
+
+    # attempt anahtara girer: aynı prompt'un yeniden denemesi önbellekten aynı yanıtı almasın;
+    # yalnızca ayrıştırılabilen ve adayı dolu yanıt saklanır — bozuk yanıt yeniden çalıştırmada tekrar sorulur
+    return llm_onbellekli(OLLAMA_MODEL, messages, _call, {"attempt": attempt},
+                          gecerli=lambda out: bool(_candidate(out, field)))
 
 def _parse_llm_json(text: str) -> dict:
     m = re.search(r"\{.*\}", text, flags=re.S)
     if not m: raise ValueError("LLM yanıtında JSON bulunamadı.")
     return json.loads(m.group(0))
 
+def _candidate(text: str, field: str) -> str:
+    """Yanıttaki dolu aday metin; JSON bozuksa ya da alan boşsa ""."""
+    try:
+        cand = _parse_llm_json(text).get(field)
+    except (ValueError, AttributeError):
+        return ""
+    return cand if isinstance(cand, str) and cand.strip() else ""
+
 # ---- prompt builders ----
 NIYET_SYS = (
     "Sen bir SEO ve içerik geliştirme uzmanısın. "
@@ -135,38 +161,46 @@ def _build_sorgu_prompt(query, current, tag, old):
            .replace("Geliştirilmiş İçerik", "Geliştirilmiş Metin")
 
 # ---- core improve ----
-def _try_improve(mode, query_text, current_text, html_tag, old_score, min_improve=MIN_IMPROVE, max_attempts=MAX_ATTEMPTS):
+def _try_improve(mode, query_text, current_text, html_tag, old_score, min_improve=MIN_IMPROVE, max_attempts=MAX_ATTEMPTS,
+                 label=""):
     best_text = current_text
     best_score = old_score if old_score > 0 else _similarity(query_text, current_text)
+    any_cand = False
 
     for attempt in range(1, max_attempts+1):
-        print(f"    [{now()}] attempt {attempt}/{max_attempts} | baseline={best_score:.4f}", flush=True)
+        print(f"    {label}[{now()}] attempt {attempt}/{max_attempts} | baseline={best_score:.4f}", flush=True)
         prompt = _build_niyet_prompt(query_text, best_text, html_tag, best_score) if mode == "niyet" \
                  else _build_sorgu_prompt(query_text, best_text, html_tag, best_score)
-        data = _parse_llm_json(_run_llm(prompt))
+        field = "Geliştirilmiş İçerik" if mode == "niyet" else "Geliştirilmiş Metin"
+        data = _parse_llm_json(_run_llm(prompt, attempt, field))
 
-        cand = (data.get("Geliştirilmiş İçerik") if mode == "niyet"
-                else data.get("Geliştirilmiş Metin"))
+        cand = data.get(field)
         if not isinstance(cand, str) or not cand.strip():
-            print("    ↪️  LLM returned empty candidate; keeping current text", flush=True)
+            print(f"    {label}↪️  LLM returned empty candidate; keeping current text", flush=True)
             cand = best_text
+        else:
+            any_cand = True
 
         new_score = _similarity(query_text, cand)
-        print(f"    [{now()}] scored new={new_score:.4f} (delta={(new_score-best_score):+.4f})", flush=True)
+        print(f"    {label}[{now()}] scored new={new_score:.4f} (delta={(new_score-best_score):+.4f})", flush=True)
 
         if new_score >= best_score * (1.0 + min_improve):
-            print(f"    🎯 improved ≥ {min_improve*100:.3f}% — accepting", flush=True)
+            print(f"    {label}🎯 improved ≥ {min_improve*100:.3f}% — accepting", flush=True)
             return cand, new_score
 
         if new_score > best_score:
-            print("    ⬆️  slight improvement; updating baseline and retrying", flush=True)
+            print(f"    {label}⬆️  slight improvement; updating baseline and retrying", flush=True)
             best_text, best_score = cand, new_score
 
-    print("⚖️  no sufficient improvement; returning best so far", flush=True)
+    if not any_cand:
+        # hiçbir denemede aday gelmedi: satır bitmiş sayılmaz, günlüğe girmez, yeniden başlatmada tekrar denenir
+        raise ValueError(f"LLM {max_attempts} denemede boş aday döndürdü.")
+    print(f"{label}⚖️  no sufficient improvement; returning best so far", flush=True)
     return best_text, best_score
 
 # ============== FLOWS ==============
-def run_niyet_flow(min_improve=MIN_IMPROVE, max_attempts=MAX_ATTEMPTS, only_improved=ONLY_IMPROVED) -> str:
+def run_niyet_flow(min_improve=MIN_IMPROVE, max_attempts=MAX_ATTEMPTS, only_improved=ONLY_IMPROVED,
+                   parallel=None) -> str:
     t_flow = time.time()
     df = _read_csv_robust(NIYET_IN_CSV)
 
@@ -177,48 +211,34 @@ def run_niyet_flow(min_improve=MIN_IMPROVE, max_attempts=MAX_ATTEMPTS, only_impr
     for need, name in [(c_intent,"Kullanıcı Niyeti"), (c_html,"HTML Kaynağı"), (c_text,"Web İçeriği")]:
         if not need: raise KeyError(f"Eksik kolon: {name}")
 
-    total = len(df)
-    kept = improved = 0
-    rows = []
-
-    print(f"[{now()}] 🚀 NIYET flow start | rows={total} | MIN_IMPROVE={min_improve} | MAX_ATTEMPTS={max_attempts}", flush=True)
-
-    for idx, r in df.iterrows():
-        r_t0 = time.time()
-        intent = str(r[c_intent] or "")
-        tag    = str(r[c_html] or "")
-        cur    = str(r[c_text] or "")
-        old    = _norm_score(r[c_score]) if c_score else _similarity(intent, cur)
-
-        print(f"\n[{now()}] → Row {idx + 1}/{total} | tag='{tag}' | old={old:.4f}", flush=True)
-        cand, new = _try_improve("niyet", intent, cur, tag, old, min_improve, max_attempts)
-
-        # always keep (ONLY_IMPROVED=False); clamp change% to 0 if not improved
-        improved_flag = new > old
-        improved += 1 if improved_flag else 0
-        kept += 1
-        change_pct = ((new - old) / max(old, 1e-8) * 100.0) if improved_flag else 0.0
-
-        rows.append({
-            "Kullanıcı Niyeti": intent,
-            "Mevcut İçerik": cur,
-            "Geliştirilmiş İçerik": cand,
-            "HTML Bölümü": tag,
-            "Eski Skor": round(float(old), 6),
-            "Yeni Skor": round(float(new), 6),
-            "Yüzde Değişim": round(float(change_pct), 2),
-        })
-        msg = "✅ kept (Δ=+{:.2f}%)".format(change_pct) if improved_flag else "✅ kept (no improvement; Δ=0.00%)"
-        print(f"   {msg}", flush=True)
-        print(f"   ⏱ row time: {fmt_sec(time.time()-r_t0)}", flush=True)
+    parallel = parallel or PARALLEL or IYILESTIRME_PARALLEL
+    print(f"[{now()}] 🚀 NIYET flow start | rows={len(df)} | MIN_IMPROVE={min_improve} | MAX_ATTEMPTS={max_attempts} | PARALLEL={parallel}", flush=True)
+
+    def _old(intent, cur, score):
+        return _norm_score(score) if c_score else _similarity(intent, cur)
+
+    def _improve(intent, cur, tag, old, label):
+        return _try_improve("niyet", intent, cur, tag, old, min_improve, max_attempts, label=label)
+
+    def _text_cols(intent, tag, cur, cand) -> dict:
+        return {"Kullanıcı Niyeti": intent, "Mevcut İçerik": cur, "Geliştirilmiş İçerik": cand, "HTML Bölümü": tag}
+
+    jobs = [(no, str(r[c_intent] or ""), str(r[c_html] or ""), str(r[c_text] or ""), r[c_score] if c_score else None)
+            for no, (_, r) in enumerate(df.iterrows(), 1)]
+    # biten satırlar günlüğe yazılır (fsync), yeniden başlatmada atlanır; çıktı girdi sırasıyla kurulur
+    rows = gunluklu_iyilestir("niyet", NIYET_OUT_CSV, jobs, _old, _improve, _text_cols, OLLAMA_MODEL,
+                              prompt_surumu(_build_niyet_prompt), parallel, etiket="NIYET: ")
+    kept = sum(r["Durum"] == "ok" for r in rows)
+    improved = sum(r["Durum"] == "ok" and r["Yeni Skor"] > r["Eski Skor"] for r in rows)
 
     out_df = pd.DataFrame(rows)
     out_df.to_csv(NIYET_OUT_CSV, index=False, encoding="utf-8")
-    print(f"\n[{now()}] 💾 NIYET saved → {NIYET_OUT_CSV} (rows kept={kept}, improved={improved})", flush=True)
+    print(f"\n[{now()}] 💾 NIYET saved → {NIYET_OUT_CSV} (rows kept={kept}, improved={improved}, failed={len(rows) - kept})", flush=True)
     print(f"[{now()}] 🏁 NIYET flow finished in {fmt_sec(time.time()-t_flow)}\n", flush=True)
     return NIYET_OUT_CSV
 
-def run_sorgu_flow(min_improve=MIN_IMPROVE, max_attempts=MAX_ATTEMPTS, only_improved=ONLY_IMPROVED) -> str:
+def run_sorgu_flow(min_improve=MIN_IMPROVE, max_attempts=MAX_ATTEMPTS, only_improved=ONLY_IMPROVED,
+                   parallel=None) -> str:
     t_flow = time.time()
     df = _read_csv_robust(SORGU_IN_CSV)
 
@@ -229,50 +249,36 @@ def run_sorgu_flow(min_improve=MIN_IMPROVE, max_attempts=MAX_ATTEMPTS, only_impr
     for need, name in [(c_query,"Kullanıcı Sorgusu"), (c_html,"HTML Kaynağı"), (c_text,"Web İçeriği")]:
         if not need: raise KeyError(f"Eksik kolon: {name}")
 
-    total = len(df)
-    kept = improved = 0
-    rows = []
-
-    print(f"[{now()}] 🚀 SORGU flow start | rows={total} | MIN_IMPROVE={min_improve} | MAX_ATTEMPTS={max_attempts}", flush=True)
-
-    for idx, r in df.iterrows():
-        r_t0 = time.time()
-        q   = str(r[c_query] or "")
-        tag = str(r[c_html] or "")
-        cur = str(r[c_text] or "")
-        old = _norm_score(r[c_score]) if c_score else _similarity(q, cur)
-
-        print(f"\n[{now()}] → Row {idx + 1}/{total} | tag='{tag}' | old={old:.4f}", flush=True)
-        cand, new = _try_improve("sorgu", q, cur, tag, old, min_improve, max_attempts)
-
-        improved_flag = new > old
-        improved += 1 if improved_flag else 0
-        kept += 1
-        change_pct = ((new - old) / max(old, 1e-8) * 100.0) if improved_flag else 0.0
-
-        rows.append({
-            "HTML Bölümü": tag,
-            "Kullanıcı Sorgusu": q,
-            "Eski Metin": cur,
-            "Geliştirilmiş Metin": cand,
-            "Eski Skor": round(float(old), 6),
-            "Yeni Skor": round(float(new), 6),
-            "Yüzde Değişim": round(float(change_pct), 2),
-        })
-        msg = "✅ kept (Δ=+{:.2f}%)".format(change_pct) if improved_flag else "✅ kept (no improvement; Δ=0.00%)"
-        print(f"   {msg}", flush=True)
-        print(f"   ⏱ row time: {fmt_sec(time.time()-r_t0)}", flush=True)
+    parallel = parallel or PARALLEL or IYILESTIRME_PARALLEL
+    print(f"[{now()}] 🚀 SORGU flow start | rows={len(df)} | MIN_IMPROVE={min_improve} | MAX_ATTEMPTS={max_attempts} | PARALLEL={parallel}", flush=True)
+
+    def _old(q, cur, score):
+        return _norm_score(score) if c_score else _similarity(q, cur)
+
+    def _improve(q, cur, tag, old, label):
+        return _try_improve("sorgu", q, cur, tag, old, min_improve, max_attempts, label=label)
+
+    def _text_cols(q, tag, cur, cand) -> dict:
+        return {"HTML Bölümü": tag, "Kullanıcı Sorgusu": q, "Eski Metin": cur, "Geliştirilmiş Metin": cand}
+
+    jobs = [(no, str(r[c_query] or ""), str(r[c_html] or ""), str(r[c_text] or ""), r[c_score] if c_score else None)
+            for no, (_, r) in enumerate(df.iterrows(), 1)]
+    # biten satırlar günlüğe yazılır (fsync), yeniden başlatmada atlanır; çıktı girdi sırasıyla kurulur
+    rows = gunluklu_iyilestir("sorgu", SORGU_OUT_CSV, jobs, _old, _improve, _text_cols, OLLAMA_MODEL,
+                              prompt_surumu(_build_sorgu_prompt), parallel, etiket="SORGU: ")
+    kept = sum(r["Durum"] == "ok" for r in rows)
+    improved = sum(r["Durum"] == "ok" and r["Yeni Skor"] > r["Eski Skor"] for r in rows)
 
     out_df = pd.DataFrame(rows)
     out_df.to_csv(SORGU_OUT_CSV, index=False, encoding="utf-8")
-    print(f"\n[{now()}] 💾 SORGU saved → {SORGU_OUT_CSV} (rows kept={kept}, improved={improved})", flush=True)
+    print(f"\n[{now()}] 💾 SORGU saved → {SORGU_OUT_CSV} (rows kept={kept}, improved={improved}, failed={len(rows) - kept})", flush=True)
     print(f"[{now()}] 🏁 SORGU flow finished in {fmt_sec(time.time()-t_flow)}\n", flush=True)
     return SORGU_OUT_CSV
 
 def main():
     t_all = time.time()
     print(f"[{now()}] ⚙️  START niyet_iylestir.py", flush=True)
-    print(f"    MODE={MODE} | MIN_IMPROVE={MIN_IMPROVE} | MAX_ATTEMPTS={MAX_ATTEMPTS} | ONLY_IMPROVED={ONLY_IMPROVED}", flush=True)
+    print(f"    MODE={MODE} | MIN_IMPROVE={MIN_IMPROVE} | MAX_ATTEMPTS={MAX_ATTEMPTS} | ONLY_IMPROVED={ONLY_IMPROVED} | PARALLEL={PARALLEL or IYILESTIRME_PARALLEL}", flush=True)
     print(f"    INPUTS: NIYET_IN={NIYET_IN_CSV} | SORGU_IN={SORGU_IN_CSV}", flush=True)
     print(f"    OUTPUTS: NIYET_OUT={NIYET_OUT_CSV} | SORGU_OUT={SORGU_OUT_CSV}", flush=True)
 
@@ -0,0 +1,73 @@
+# modules/onnx_model.py — embedding modeli için ONNX Runtime + dinamik int8 backend
+#
+# Ortaya çıkan nesne yine bir SentenceTransformer'dır (backend="onnx"); encode()
+# arayüzü aynı kaldığı için anlamsal_eslestirme, iyilestir akışları ve
+# rakip_analiz değişmeden çalışır. Dışa aktarma yalnızca ilk kullanımda yapılır,
+# sonrasında data/cache/onnx/<model>/ altından yüklenir.
+#
+# Gereksinim: pip install "sentence-transformers>=3.2" "optimum[onnxruntime]"
+from __future__ import annotations
+
+import glob
+import os
+import platform
+import re
+
+try:
+    from config import cache_dir as _CACHE
+except Exception:
+    _CACHE = os.path.join("data", "cache")
+
+ONNX_DIR = os.path.join(_CACHE, "onnx")
+BACKENDS = ("torch", "onnx-int8")
+
+def cpu_quant_config() -> str:
+    """Bu CPU için en uygun dinamik int8 profili: avx512_vnni > avx512 > avx2; ARM → arm64."""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    flags = ""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            flags = f.read()
+    except OSError:
+        pass
+    if "avx512_vnni" in flags or "avx512vnni" in flags:
+        return "avx512_vnni"
+    if "avx512f" in flags:
+        return "avx512"
+    return "avx2"
+
+def _model_dir(model_name: str) -> str:
+    return os.path.join(ONNX_DIR, re.sub(r"[^\w.-]+", "_", model_name).strip("_"))
+
+def _quantized_file(save_dir: str, quant: str) -> str | None:
+    found = sorted(glob.glob(os.path.join(save_dir, "onnx", f"model_*{quant}.onnx")))
+    return os.path.relpath(found[0], save_dir) if found else None
+
+def load_onnx_int8(model_name: str, quant: str | None = None):
+    from sentence_transformers import SentenceTransformer
+
+    quant = quant or os.getenv("ONNX_QUANT") or cpu_quant_config()
+    save_dir = _model_dir(model_name)
+    file_name = _quantized_file(save_dir, quant)
+
+    if file_name is None:
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        print(f"📦 ONNX dışa aktarılıyor ve int8'e çevriliyor ({quant}): {model_name}")
+        onnx_model = SentenceTransformer(model_name, backend="onnx", device="cpu")
+        onnx_model.save_pretrained(save_dir)
+        export_dynamic_quantized_onnx_model(onnx_model, quant, save_dir)
+        file_name = _quantized_file(save_dir, quant)
+        if file_name is None:
+            raise RuntimeError(f"Kuantize ONNX dosyası oluşturulamadı: {save_dir}/onnx")
+
+    return SentenceTransformer(save_dir, backend="onnx", device="cpu", model_kwargs={"file_name": file_name})
+
+def load_embedding_model(model_name: str, backend: str = "torch"):
+    """config.EMBED_BACKEND'e göre encode() arayüzlü model döndürür."""
+    if backend == "onnx-int8":
+        return load_onnx_int8(model_name)
+    if backend != "torch":
+        raise ValueError(f"Bilinmeyen embedding backend: {backend!r} (seçenekler: {BACKENDS})")
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
@@ -0,0 +1,78 @@
+# modules/onnx_parite.py — torch ve onnx-int8 backend'lerinin Top-10 sıralama paritesi
+#
+# Kullanım (proje kökünden):
+#   python -m modules.onnx_parite
+#   python -m modules.onnx_parite --csv data/output/html_icerik_sorgu_uyumu.csv --min-overlap 0.9
+#
+# html_icerik_sorgu_uyumu tablosundaki tekil içerik ve sorgular her iki backend ile
+# (embedding deposu atlanarak) yeniden kodlanır; sort_query_similarity ile aynı
+# kuralla (sorgu içinde içerik tekil, skora göre azalan, ilk K) Top-K listeleri
+# çıkarılır ve karşılaştırılır. Ayrıca her backend'in encode hızı raporlanır.
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from config import MODEL_NAME, output_dir
+from modules.onnx_model import load_embedding_model
+from modules.sorgu import TOP_K, _pick_column
+from modules.tablo_io import tablo_oku, tam_tablo_yolu
+
+DEFAULT_CSV = f"{output_dir}/html_icerik_sorgu_uyumu.csv"
+
+def _veri(path: str) -> tuple[list[str], list[str]]:
+    df = tablo_oku(tam_tablo_yolu(path), dtype=str)
+    col_sorgu = _pick_column(df, ["Sorgu", "query", "kullanıcı sorgusu"])
+    col_icerik = _pick_column(df, ["Web İçeriği", "icerik", "içerik", "content"])
+    if not (col_sorgu and col_icerik):
+        raise KeyError(f"Sorgu/içerik kolonu bulunamadı: {list(df.columns)}")
+    icerikler = df[col_icerik].dropna().astype(str).drop_duplicates().tolist()
+    sorgular = df[col_sorgu].dropna().astype(str).drop_duplicates().tolist()
+    return icerikler, sorgular
+
+def _top_k(model, icerikler, sorgular, k):
+    t0 = time.perf_counter()
+    P = model.encode(icerikler, batch_size=64, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False)
+    sure = time.perf_counter() - t0
+    Q = model.encode(sorgular, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False)
+    S = P @ Q.T
+    sira = np.argsort(-S, axis=0, kind="stable")[:k]
+    return sira, S, len(icerikler) / max(sure, 1e-9)
+
+def main():
+    ap = argparse.ArgumentParser(description="torch ↔ onnx-int8 Top-K sıralama paritesi")
+    ap.add_argument("--csv", default=DEFAULT_CSV, help=f"Tam içerik × sorgu tablosu (vars: {DEFAULT_CSV})")
+    ap.add_argument("--k", type=int, default=TOP_K)
+    ap.add_argument("--min-overlap", type=float, default=0.9, help="Kabul için ortalama Top-K örtüşme eşiği")
+    args = ap.parse_args()
+
+    icerikler, sorgular = _veri(args.csv)
+    print(f"🔬 Parite: {len(icerikler)} içerik × {len(sorgular)} sorgu | K={args.k}")
+
+    ref_sira, ref_S, ref_hiz = _top_k(load_embedding_model(MODEL_NAME, "torch"), icerikler, sorgular, args.k)
+    q_sira, q_S, q_hiz = _top_k(load_embedding_model(MODEL_NAME, "onnx-int8"), icerikler, sorgular, args.k)
+
+    overlaps, top1 = [], 0
+    for j, s in enumerate(sorgular):
+        a, b = ref_sira[:, j].tolist(), q_sira[:, j].tolist()
+        ov = len(set(a) & set(b)) / max(len(a), 1)
+        overlaps.append(ov)
+        top1 += a[:1] == b[:1]
+        flag = "✅" if ov >= args.min_overlap else "⚠️ "
+        print(f"  {flag} {s[:40]:<40} overlap@{args.k}={ov:.2f} top1={'=' if a[:1] == b[:1] else '≠'}")
+
+    ort = float(np.mean(overlaps)) if overlaps else 1.0
+    print(f"\n📊 ortalama overlap@{args.k}={ort:.3f} | min={min(overlaps, default=1.0):.2f} "
+          f"| top1 uyumu={top1}/{len(sorgular)} | max |Δskor|={float(np.abs(ref_S - q_S).max()):.4f}")
+    print(f"⚡ encode hızı: torch={ref_hiz:.0f} cümle/sn | onnx-int8={q_hiz:.0f} cümle/sn (x{q_hiz / max(ref_hiz, 1e-9):.2f})")
+
+    if ort < args.min_overlap:
+        print(f"❌ Parite eşiği ({args.min_overlap}) sağlanmadı.")
+        sys.exit(1)
+    print("✅ Parite sağlandı.")
+
+if __name__ == "__main__":
+    main()
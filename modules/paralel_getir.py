@@ -0,0 +1,192 @@
+# modules/paralel_getir.py — URL listesini eş zamanlı, host başına nazik biçimde getirme
+#
+# getir_hepsi(urls, fetch) asenkron bir aşamadır:
+#   * global eş zamanlılık sınırı (esz_zamanli)
+#   * host başına eş zamanlılık (host_limit) ve aynı hosta ardışık istekler arası bekleme (host_bekleme)
+#   * URL başına (url_timeout) ve toplam (toplam_timeout) süre sınırı
+# URL süresi fetch gerçekten çalışmaya başlayınca işler: executor kuyruğunda (süresi dolmuş
+# ama thread'de süren bir işin arkasında) ya da tarayıcı havuzu kuyruğunda beklenen süre
+# sayılmaz — işi başka bir kuyruğa devreden kod aktif_saat() ile saati durdurup başlatır.
+# Sonuçlar giriş sırasıyla döner; zaman aşımına uğrayan/hata veren URL'ler
+# durum bilgisiyle yer alır, diğerlerinin sonuçları korunur.
+#
+# fetch(url) senkron (thread'de çalıştırılır) ya da async olabilir. Yerel HTTP sunucusuyla
+# sıra / host sınırı / zaman aşımı testleri: tests/test_paralel_getir.py; elle:
+#   python -m http.server 8000 -d data/fixtures/dom &
+#   python -m modules.paralel_getir http://127.0.0.1:8000/ornek_com_bos.html http://127.0.0.1:8000/ornek_com_fiyatlar.html
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+ESZ_ZAMANLI = int(os.getenv("FETCH_CONCURRENCY", "4"))
+HOST_LIMIT = int(os.getenv("FETCH_PER_HOST", "1"))
+HOST_BEKLEME = float(os.getenv("FETCH_HOST_DELAY", "1.0"))      # sn
+URL_TIMEOUT = float(os.getenv("FETCH_URL_TIMEOUT", "30"))       # sn
+TOPLAM_TIMEOUT = float(os.getenv("FETCH_TOTAL_TIMEOUT", "120"))  # sn
+
+@dataclass
+class GetirSonucu:
+    url: str
+    icerik: Any = None
+    durum: str = "bekliyor"  # "ok" | "zaman_asimi" | "toplam_zaman_asimi" | "hata"
+    hata: str | None = None
+    sure_ms: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.durum == "ok"
+
+class UrlSaati:
+    """Bir URL'nin süre saati; None iken (başlamadı / kuyrukta) süre işlemez."""
+
+    def __init__(self):
+        self.t0: float | None = None
+
+    def baslat(self):
+        self.t0 = time.monotonic()
+
+    def durdur(self):
+        self.t0 = None
+
+_yerel = threading.local()
+
+def aktif_saat() -> UrlSaati | None:
+    """Çağıran thread bir getir_hepsi fetch'i yürütüyorsa o URL'nin saati.
+
+    İşi başka bir kuyruğa devreden kod (ör. tarayıcı havuzu) devrederken durdur(),
+    iş gerçekten başlayınca baslat() çağırır; kuyrukta beklenen süre url_timeout'a sayılmaz.
+    """
+    return getattr(_yerel, "saat", None)
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+class _HostKapisi:
+    """Host başına semafor + ardışık başlangıçlar arası en az `bekleme` saniye."""
+
+    def __init__(self, limit: int, bekleme: float):
+        self.sem = asyncio.Semaphore(max(1, limit))
+        self.bekleme = bekleme
+        self._kilit = asyncio.Lock()
+        self._son = float("-inf")
+
+    async def __aenter__(self):
+        await self.sem.acquire()
+        async with self._kilit:
+            kalan = self._son + self.bekleme - time.monotonic()
+            if kalan > 0:
+                await asyncio.sleep(kalan)
+            self._son = time.monotonic()
+
+    async def __aexit__(self, *exc):
+        self.sem.release()
+
+async def getir_hepsi(urls: list[str], fetch: Callable[[str], Any], esz_zamanli: int = ESZ_ZAMANLI,
+                      host_limit: int = HOST_LIMIT, host_bekleme: float = HOST_BEKLEME,
+                      url_timeout: float = URL_TIMEOUT, toplam_timeout: float = TOPLAM_TIMEOUT) -> list[GetirSonucu]:
+    sonuclar = [GetirSonucu(u) for u in urls]
+    genel = asyncio.Semaphore(max(1, esz_zamanli))
+    kapilar: dict[str, _HostKapisi] = defaultdict(lambda: _HostKapisi(host_limit, host_bekleme))
+    asenkron = inspect.iscoroutinefunction(fetch)
+    # senkron fetch'ler için ayrı executor: süresi dolan iş thread'de sürse de beklenmeden dönülür
+    ex = None if asenkron else ThreadPoolExecutor(max(1, esz_zamanli), thread_name_prefix="getir")
+    loop = asyncio.get_running_loop()
+
+    def _thread_te(saat: UrlSaati, url: str):
+        _yerel.saat = saat
+        saat.baslat()  # executor kuyruğunda geçen süre sayılmaz
+        try:
+            return fetch(url)
+        finally:
+            _yerel.saat = None
+
+    async def _bekle(is_, saat: UrlSaati):
+        """saat işlediği sürece url_timeout; saat durmuşken (kuyrukta) yalnızca toplam süre bağlar."""
+        is_ = asyncio.ensure_future(is_)
+        while True:
+            t0 = saat.t0
+            kalan = 0.05 if t0 is None else t0 + url_timeout - time.monotonic()
+            if kalan <= 0:
+                is_.cancel()
+                raise asyncio.TimeoutError
+            done, _ = await asyncio.wait({is_}, timeout=kalan)
+            if done:
+                return is_.result()
+
+    async def _bir(i: int):
+        s = sonuclar[i]
+        async with kapilar[_host(s.url)], genel:
+            t0 = time.perf_counter()
+            try:
+                if asenkron:
+                    s.icerik = await asyncio.wait_for(fetch(s.url), timeout=url_timeout)
+                else:
+                    saat = UrlSaati()
+                    s.icerik = await _bekle(loop.run_in_executor(ex, _thread_te, saat, s.url), saat)
+                s.durum = "ok"
+            except asyncio.TimeoutError:
+                s.durum, s.hata = "zaman_asimi", f"{url_timeout:.0f} sn içinde tamamlanmadı"
+            except Exception as e:
+                s.durum, s.hata = "hata", f"{type(e).__name__}: {e}"
+            finally:
+                s.sure_ms = int((time.perf_counter() - t0) * 1000)
+
+    gorevler = [asyncio.create_task(_bir(i)) for i in range(len(urls))]
+    try:
+        if gorevler:
+            _, bekleyen = await asyncio.wait(gorevler, timeout=toplam_timeout)
+            for g in bekleyen:
+                g.cancel()
+            await asyncio.gather(*bekleyen, return_exceptions=True)
+    finally:
+        if ex is not None:
+            ex.shutdown(wait=False, cancel_futures=True)
+    for s in sonuclar:
+        if s.durum == "bekliyor":
+            s.durum, s.hata = "toplam_zaman_asimi", f"toplam süre ({toplam_timeout:.0f} sn) doldu"
+    return sonuclar
+
+def getir_hepsi_sync(urls: list[str], fetch: Callable[[str], Any], **kw) -> list[GetirSonucu]:
+    """Senkron kod için; çalışan bir event loop içindeyse ayrı thread'de yürütür."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(getir_hepsi(urls, fetch, **kw))
+    with ThreadPoolExecutor(1) as ex:
+        return ex.submit(asyncio.run, getir_hepsi(urls, fetch, **kw)).result()
+
+def _http_get(url: str) -> str:
+    from urllib.request import Request, urlopen
+    with urlopen(Request(url, headers={"User-Agent": "Mozilla/5.0"}), timeout=URL_TIMEOUT) as r:
+        return r.read().decode(r.headers.get_content_charset() or "utf-8", "replace")
+
+def main():
+    ap = argparse.ArgumentParser(description="Eş zamanlı, host başına nazik URL getirme (düz HTTP)")
+    ap.add_argument("urls", nargs="+")
+    ap.add_argument("--esz-zamanli", type=int, default=ESZ_ZAMANLI)
+    ap.add_argument("--host-limit", type=int, default=HOST_LIMIT)
+    ap.add_argument("--host-bekleme", type=float, default=HOST_BEKLEME)
+    ap.add_argument("--url-timeout", type=float, default=URL_TIMEOUT)
+    ap.add_argument("--toplam-timeout", type=float, default=TOPLAM_TIMEOUT)
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    sonuclar = getir_hepsi_sync(args.urls, _http_get, esz_zamanli=args.esz_zamanli, host_limit=args.host_limit,
+                                host_bekleme=args.host_bekleme, url_timeout=args.url_timeout,
+                                toplam_timeout=args.toplam_timeout)
+    for s in sonuclar:
+        print(f"{'✅' if s.ok else '⚠️ '} {s.url} → {s.durum} ({s.sure_ms} ms"
+              f"{', ' + str(len(s.icerik)) + ' karakter' if s.ok and s.icerik else ''}){' ' + s.hata if s.hata else ''}")
+    print(f"⏱️ toplam {time.perf_counter() - t0:.2f} sn")
+
+if __name__ == "__main__":
+    main()
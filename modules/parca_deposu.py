@@ -0,0 +1,104 @@
+# modules/parca_deposu.py — cümle parçalarını tekilleştiren, kaynaklarını saklayan depo
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from modules.vektor_deposu import text_key
+
+EK_KOLONLAR = (("url", "URL"), ("xpath", "XPath"))
+
+
+class FragmentStore:
+    """Aynı cümle h1, p, div_texts, lists… altında tekrar ederse bir kez saklanır.
+
+    metinler[i]  -> i. tekil parçanın ilk görülen hali
+    kaynaklar[i] -> o parçanın tüm HTML kaynakları (provenance), görülme sırasıyla
+    oluslar      -> (tekil id, kaynak) çiftleri; ham parça sırasını korur
+    """
+
+    def __init__(self):
+        self.metinler: list[str] = []
+        self.kaynaklar: list[list[dict]] = []
+        self.oluslar: list[tuple[int, dict]] = []
+        self._ids: dict[str, int] = {}
+
+    @classmethod
+    def from_pairs(cls, parcalar) -> "FragmentStore":
+        depo = cls()
+        for html, metin in parcalar:
+            depo.ekle(html, metin)
+        return depo
+
+    def ekle(self, html: str, metin: str, **ek) -> int | None:
+        metin = (metin or "").strip()
+        if not metin:
+            return None
+        kaynak = {"html": html, **ek}
+        key = text_key(metin)
+        i = self._ids.get(key)
+        if i is None:
+            i = self._ids[key] = len(self.metinler)
+            self.metinler.append(metin)
+            self.kaynaklar.append([])
+        self.kaynaklar[i].append(kaynak)
+        self.oluslar.append((i, kaynak))
+        return i
+
+    def bul(self, metin: str) -> int | None:
+        """Metnin (normalize edilmiş hali) tekil parça id'si; yoksa None."""
+        return self._ids.get(text_key(metin))
+
+    def anahtarlar(self) -> list[str]:
+        """Tekil parçaların içerik anahtarları (vektor_deposu.text_key), id sırasıyla."""
+        return list(self._ids)
+
+    def __len__(self) -> int:
+        return len(self.metinler)
+
+    def ozet(self) -> str:
+        n, u = len(self.oluslar), len(self.metinler)
+        return f"{n} parça → {u} tekil (x{n / max(u, 1):.1f} tekrar)"
+
+    def _satirlar(self, kaynaklari_ac: bool):
+        """Tablo satırları: (tekil id dizisi, satır başına kaynak listesi)."""
+        if kaynaklari_ac:
+            return np.fromiter((i for i, _ in self.oluslar), dtype=np.int64), [[k] for _, k in self.oluslar]
+        return np.arange(len(self.metinler)), self.kaynaklar
+
+    def tablo(self, skorlar: np.ndarray, hedefler: list, hedef_kolon: str,
+              kaynaklari_ac: bool = False) -> pd.DataFrame:
+        """Tekil parça × hedef skor matrisinden uyum tablosu.
+
+        kaynaklari_ac=False: her tekil cümle bir kez, birincil kaynak 'HTML Kaynağı',
+        hepsi 'Tüm Kaynaklar' kolonunda. True: eski çıktıdaki gibi her HTML kaynağı ayrı satır.
+        """
+        idx, kaynak_listesi = self._satirlar(kaynaklari_ac)
+        m = len(hedefler)
+        metinler = np.array(self.metinler, dtype=object)
+        html = np.array([ks[0]["html"] for ks in kaynak_listesi], dtype=object)
+
+        data = {
+            "HTML Kaynağı": np.repeat(html, m),
+            "Web İçeriği": np.repeat(metinler[idx], m),
+            hedef_kolon: np.tile(np.array(hedefler, dtype=object), len(idx)),
+            "Benzerlik Skoru": np.round(np.asarray(skorlar)[idx].astype(np.float64).ravel(), 4),
+        }
+        if not kaynaklari_ac:
+            tum = np.array(["|".join(dict.fromkeys(k["html"] for k in ks)) for ks in kaynak_listesi], dtype=object)
+            data["Tüm Kaynaklar"] = np.repeat(tum, m)
+        for anahtar, kolon in self.ek_kolonlar():
+            data[kolon] = np.repeat(np.array([ks[0].get(anahtar, "") for ks in kaynak_listesi], dtype=object), m)
+        return pd.DataFrame(data)
+
+    def ek_kolonlar(self) -> list[tuple[str, str]]:
+        """Kaynaklarda bulunan ek bilgiler ve tablo kolonları: sayfa URL'si (çok sayfalı
+        tarama), XPath (yaprak parçalama)."""
+        if not self.oluslar:
+            return []
+        ilk = self.oluslar[0][1]
+        return [(a, k) for a, k in EK_KOLONLAR if a in ilk]
+
+    def ek_degerleri(self, anahtar: str) -> np.ndarray:
+        """Tekil parça başına ilk kaynağın ek bilgisi (ör. ilk görüldüğü sayfanın URL'si)."""
+        return np.array([ks[0].get(anahtar, "") for ks in self.kaynaklar], dtype=object)
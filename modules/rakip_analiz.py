@@ -10,10 +10,23 @@ import sys
 import unicodedata
 from pathlib import Path
 
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pandas as pd
 from lxml import html as lxml_html
-from playwright.sync_api import sync_playwright
-from sentence_transformers import SentenceTransformer, util
+
+from modules.dom_cikarim import yaprak_bloklar
+from modules.html_onbellek import OnbellekYok, onbellekli
+from modules.http_getir import getir as http_getir
+from modules.paralel_getir import getir_hepsi_sync
+from modules.sayfa_bekleme import hazir_bekle, kaydir
+from modules.tablo_io import TAM_TABLO_IPUCU, tablo_oku, tablo_yolu
+from modules.tarayici_havuzu import get_browser_pool
+from modules.vektor_deposu import cached_encode
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 # ------------------- Konfig / yollar -------------------
 try:
@@ -37,12 +50,33 @@ DEFAULT_EXCEL = os.path.join(input_dir, "sonuclar.xlsx")
 # ------------------- Semantik model -------------------
 ST_MODEL_NAME = os.getenv("ST_MODEL_NAME", "emrecan/bert-base-turkish-cased-mean-nli-stsb-tr")
 _model: SentenceTransformer | None = None
+_encode_pool = None  # --encode-workers > 1 ise çok süreçli EncodePool
+try:
+    from config import EMBED_BACKEND as _EMBED_BACKEND
+    from config import MODEL_NAME as _CFG_MODEL_NAME
+    from config import embed_cache_key as _embed_cache_key
+    from config import get_model as _cfg_get_model
+except Exception:
+    _EMBED_BACKEND, _CFG_MODEL_NAME, _cfg_get_model = "torch", None, None
+    def _embed_cache_key(name): return name
+
 def model() -> SentenceTransformer:
     global _model
     if _model is None:
-        _model = SentenceTransformer(ST_MODEL_NAME)
+        if _cfg_get_model and ST_MODEL_NAME == _CFG_MODEL_NAME:
+            _model = _cfg_get_model()  # pipeline ile aynı örnek ve backend
+        else:
+            from modules.onnx_model import load_embedding_model
+            _model = load_embedding_model(ST_MODEL_NAME, _EMBED_BACKEND)
     return _model
 
+def encoder():
+    return _encode_pool if _encode_pool is not None else model()
+
+def embed(texts):
+    """model().encode yerine: kalıcı embedding deposundan okur, yalnızca yeni metinleri kodlar."""
+    return cached_encode(encoder, texts, model_name=_embed_cache_key(ST_MODEL_NAME), normalize_embeddings=True)
+
 # (opsiyonel) stealth
 try:
     from playwright_stealth import stealth_sync  # type: ignore
@@ -99,23 +133,19 @@ def drop_near_duplicates_texts(rows: pd.DataFrame, text_col="icerik", sim_thresh
     if rows.empty or text_col not in rows.columns:
         return rows
     keep_idx, embs = [], []
-    for i, t in enumerate(rows[text_col].astype(str).tolist()):
-        e = model().encode(t, normalize_embeddings=True)
-        if all(float(util.cos_sim(e, ee)) < sim_thresh for ee in embs):
+    all_embs = embed(rows[text_col].astype(str).tolist())
+    for i, e in enumerate(all_embs):
+        if all(float(np.dot(e, ee)) < sim_thresh for ee in embs):
             keep_idx.append(i); embs.append(e)
     return rows.iloc[keep_idx].copy()
 
 # ------------------- CSV/Excel I/O -------------------
 def read_csv_robust(path: str) -> pd.DataFrame:
+    # Parquet'i doğrudan, CSV'yi önce hızlı C motoruyla okur; ayraç tahmini en son denenir
     try:
-        return pd.read_csv(path, sep=None, engine="python")
+        return tablo_oku(path)
     except Exception:
-        for enc in ("utf-8-sig", "utf-8", "latin-1"):
-            try:
-                return pd.read_csv(path, encoding=enc)
-            except Exception:
-                continue
-    raise RuntimeError(f"CSV okunamadı: {path}")
+        raise RuntimeError(f"CSV okunamadı: {path}")
 
 def read_excel_robust(path: str) -> pd.DataFrame:
     try:
@@ -136,8 +166,13 @@ def pick(df: pd.DataFrame, cands):
 
 def load_many(pattern: str) -> pd.DataFrame:
     files = sorted(glob.glob(pattern, recursive=True))
+    # x.csv ile yanındaki x.parquet birlikte varsa Parquet okunur (tekrar yüklenmez)
+    files = list(dict.fromkeys(tablo_yolu(f) for f in files))
+    if not files and pattern.endswith(".csv"):
+        files = sorted(glob.glob(pattern[:-4] + ".parquet", recursive=True))
     if not files:
-        raise SystemExit(f"Dosya bulunamadı: {pattern}")
+        ipucu = f" — {TAM_TABLO_IPUCU}" if "_uyumu" in pattern else ""
+        raise SystemExit(f"Dosya bulunamadı: {pattern}{ipucu}")
     dfs = []
     for f in files:
         df = read_csv_robust(f)
@@ -183,9 +218,9 @@ def filter_for_query(df: pd.DataFrame, query_text: str) -> pd.DataFrame:
         if text_col in out.columns:
             texts = out[text_col].astype(str).fillna("").tolist()
             if texts:
-                q_emb = model().encode(query_text, normalize_embeddings=True)
-                i_emb = model().encode(texts, normalize_embeddings=True)
-                out["_score"] = list(util.cos_sim(q_emb, i_emb).cpu().numpy().flatten())
+                q_emb = embed(query_text)
+                i_emb = embed(texts)
+                out["_score"] = list(i_emb @ q_emb)
                 out = out.sort_values(by="_score", ascending=False)
 
     # Kolon sırası
@@ -261,60 +296,61 @@ NOISE_PATTERNS = [
     r"\b(aydınlatma metni|kvkk|çerez aydınlatma)\b",
 ]
 
-def _auto_scroll(page, step=1200, pause_ms=250, max_passes=8):
-    last_height = page.evaluate("() => document.body.scrollHeight")
-    for _ in range(max_passes):
-        page.evaluate(f"() => window.scrollBy(0, {step})")
-        page.wait_for_timeout(pause_ms)
-        new_height = page.evaluate("() => document.body.scrollHeight")
-        if new_height == last_height:
-            break
-        last_height = new_height
-
 def _try_click_cookies(page):
     for sel in COMMON_COOKIE_SELECTORS:
         try:
             el = page.locator(sel)
             if el.count() > 0 and el.first.is_visible():
                 el.first.click(timeout=1500)
-                page.wait_for_timeout(400)
+                hazir_bekle(page, quiet_ms=150, max_ms=1500)
                 return True
         except Exception:
             continue
     return False
 
-def fetch_html_rendered(url: str, timeout_ms=25000, retries=2) -> str:
+def _render_page(page, url: str, timeout_ms: int, bekleme: dict | None = None) -> tuple[str, dict]:
+    stealth_sync(page)
+    resp = page.goto(url, timeout=timeout_ms, wait_until="domcontentloaded")
+    hazir_ms = hazir_bekle(page)
+    _try_click_cookies(page)
+    k = kaydir(page, step=1400)
+    if bekleme is not None:
+        bekleme.update(hazir_ms=hazir_ms, kaydirma_ms=k["ms"], kaydirma_adim=k["adim"], toplam_ms=hazir_ms + k["ms"])
+    h = resp.headers if resp else {}
+    # ETag/Last-Modified önbelleğin koşullu doğrulaması için saklanır
+    return page.content(), {"final_url": page.url, "etag": h.get("etag"), "last_modified": h.get("last-modified")}
+
+def fetch_html_rendered(url: str, timeout_ms=25000, retries=2, bekleme: dict | None = None) -> str:
+    """Sayfayı paylaşılan tarayıcı havuzunda render eder (html_onbellek üzerinden);
+    bekleme verilirse ölçülen süreler ve önbellek kaynağı yazılır."""
     user_agents = [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
         "Mozilla/5.0 (Linux; Android 13; Pixel 7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Mobile Safari/537.36",
     ]
-    for attempt in range(min(retries, len(user_agents))):
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])
-                context = browser.new_context(
+    pool = get_browser_pool()  # sıcak tarayıcı; her deneme yeni izole context
+
+    def _getir() -> tuple[str, dict]:
+        for attempt in range(min(retries, len(user_agents))):
+            try:
+                content, meta = pool.run(
+                    lambda page: _render_page(page, url, timeout_ms, bekleme),
                     user_agent=user_agents[attempt],
-                    extra_http_headers={"Accept-Language": HEADERS["Accept-Language"]}
+                    extra_http_headers={"Accept-Language": HEADERS["Accept-Language"]},
                 )
-                page = context.new_page()
-                stealth_sync(page)
-                page.goto(url, timeout=timeout_ms, wait_until="domcontentloaded")
-                page.wait_for_timeout(1200)
-                _try_click_cookies(page)
-                _auto_scroll(page, step=1400, pause_ms=300, max_passes=10)
-                for sel in ["main", "[role=main]", "article", ".content", "#content"]:
-                    try:
-                        page.wait_for_selector(sel, timeout=2000); break
-                    except Exception:
-                        continue
-                page.wait_for_timeout(600)
-                content = page.content()
-                context.close(); browser.close()
                 if content and content.strip():
-                    return content
-        except Exception:
-            continue
-    return ""
+                    return content, meta
+            except Exception:
+                continue
+        return "", {}
+
+    try:
+        content, meta = onbellekli(url, "render:rakip", _getir)
+    except OnbellekYok as e:
+        print(f"[WARN] {e}")
+        return ""
+    if bekleme is not None:
+        bekleme["kaynak"] = meta["kaynak"]
+    return content
 
 def _split_block_to_sentences(block_text: str):
     return [s.strip() for s in _SENT_SPLIT.split(block_text or "") if _norm(s)]
@@ -335,13 +371,13 @@ def sentence_mode_snippets(query: str, tree, top_k=3, threshold=0.50, context_ra
         nodes = tree.xpath(xp)
         if nodes: main = nodes[0]; break
 
-    blocks = []
-    for node in main.xpath("|".join([
-        ".//p",".//li",".//section",".//article",".//blockquote",".//dd",".//dt",
-        ".//div[not(.//p) and string-length(normalize-space())>0]"
-    ])):
-        txt = _strip_noise_lines(_norm(node.text_content()))
-        if len(txt) >= 20: blocks.append(txt)
+    # Yaprak bloklar (dom_cikarim): iç içe section/div metni tekrar tekrar bölünmez
+    blocks, block_xpath = [], {}
+    for b in yaprak_bloklar(main):
+        txt = _strip_noise_lines(_norm(b["metin"]))
+        if len(txt) >= 20:
+            blocks.append(txt)
+            block_xpath.setdefault(txt, b["xpath"])
 
     blocks = _dedup_exact_keep_order(blocks)
 
@@ -354,9 +390,9 @@ def sentence_mode_snippets(query: str, tree, top_k=3, threshold=0.50, context_ra
     if not all_sentences: return []
 
     sent_texts = [s for s,_,_ in all_sentences]
-    q_emb = model().encode(query, normalize_embeddings=True)
-    i_emb = model().encode(sent_texts, normalize_embeddings=True)
-    sem = util.cos_sim(q_emb, i_emb).cpu().numpy().flatten()
+    q_emb = embed(query)
+    i_emb = embed(sent_texts)
+    sem = i_emb @ q_emb
 
     scored = []
     for (s, bi, si), sc in zip(all_sentences, sem):
@@ -379,16 +415,16 @@ def sentence_mode_snippets(query: str, tree, top_k=3, threshold=0.50, context_ra
         sents = block_sents[bi]
         start, end = max(0, si-context_radius), min(len(sents), si+context_radius+1)
         merged = " ".join(sents[start:end]).strip()
-        snippets.append({"text": merged, "score": item["score"]})
+        snippets.append({"text": merged, "score": item["score"], "xpath": block_xpath.get(blocks[bi])})
         if len(snippets) >= top_k: break
     return snippets[:top_k]
 
 def _score_items(query: str, items: list[str], top_k=10, threshold=0.50, pos_boost=0.0):
     items = _dedup_exact_keep_order([_norm(x) for x in items if _norm(x)])
     if not items: return []
-    q_emb = model().encode(query, normalize_embeddings=True)
-    i_emb = model().encode(items, normalize_embeddings=True)
-    sem = util.cos_sim(q_emb, i_emb).cpu().numpy().flatten()
+    q_emb = embed(query)
+    i_emb = embed(items)
+    sem = i_emb @ q_emb
     results = []
     for txt, s in zip(items, sem):
         ov = _overlap_ratio(query, txt)
@@ -434,16 +470,37 @@ def parse_meta_and_snippets(html, base_url, query, max_snippets=3):
 def _is_all_empty(obj: dict) -> bool:
     return not (obj.get("title") or obj.get("description") or obj.get("h1") or obj.get("eslesen_snippetler"))
 
-def analyze_competitor_sites(url_list, query, max_snippets=3):
+def _fetch_with_wait(url: str) -> tuple[str, dict]:
+    """Önce düz HTTP; statik HTML yetersizse tarayıcı havuzunda render. Kullanılan yol bekleme'ye yazılır."""
+    bekleme = {}
+    s = http_getir(url, render=lambda u: fetch_html_rendered(u, bekleme=bekleme))
+    bekleme.update(yol=s.yol, neden=s.neden)
+    bekleme.setdefault("kaynak", s.kaynak)
+    return s.html, bekleme
+
+def analyze_competitor_sites(url_list, query, max_snippets=3, fetch=None, **getir_kw):
+    """Rakip sayfalarını eş zamanlı getirir (host başına sınır/bekleme, URL ve toplam süre sınırı),
+    ardından get_competitors_above sırasıyla ayrıştırır. Zaman aşımına uğrayanlar not ile döner.
+
+    fetch(url) -> html (ya da (html, bekleme) çifti); verilmezse tarayıcı havuzu kullanılır.
+    getir_kw: paralel_getir.getir_hepsi limitleri (esz_zamanli, host_limit, host_bekleme, url_timeout, toplam_timeout).
+    """
+    sonuclar = getir_hepsi_sync(list(url_list), fetch or _fetch_with_wait, **getir_kw)
     results = []
-    for url in url_list:
-        html = fetch_html_rendered(url)
+    for s in sonuclar:
+        url = s.url
+        html, bekleme = s.icerik if isinstance(s.icerik, tuple) else (s.icerik, {})
         if not html:
+            neden = s.hata if not s.ok else "bot engeli / yönlendirme / hata"
             results.append({"title": None, "description": None, "h1": None,
                             "eslesen_snippetler": [], "url": url,
-                            "not": "HTML boş veya erişilemedi (bot engeli / yönlendirme / hata)."})
+                            "not": f"HTML boş veya erişilemedi ({neden}).",
+                            "getirme": {"durum": s.durum, "sure_ms": s.sure_ms}})
             continue
         rec = parse_meta_and_snippets(html, url, query, max_snippets=max_snippets)
+        rec["bekleme_ms"] = bekleme.get("toplam_ms")
+        rec["getirme"] = {"durum": s.durum, "sure_ms": s.sure_ms, "yol": bekleme.get("yol"), "neden": bekleme.get("neden"),
+                         "kaynak": bekleme.get("kaynak")}
         if _is_all_empty(rec):
             rec["not"] = "Sayfa yüklendi ama title/description/h1/snippet bulunamadı."
         results.append(rec)
@@ -464,10 +521,7 @@ def build_uyumlu_kayitlar(df: pd.DataFrame, query_text: str, topk: int | None =
         raw_score = r.get(skor_col, None)
         s = _score_to_float(raw_score)
         if not (s == s):  # NaN ise yeniden hesapla
-            s = float(util.cos_sim(
-                model().encode(query_text, normalize_embeddings=True),
-                model().encode(icerik, normalize_embeddings=True)
-            ).item())
+            s = float(np.dot(embed(query_text), embed(icerik)))
         out.append({
             "html_bolumu": html_bolumu if html_bolumu else None,
             "icerik": icerik,
@@ -484,7 +538,7 @@ def build_uyumlu_kayitlar(df: pd.DataFrame, query_text: str, topk: int | None =
 
 # ------------------- MAIN -------------------
 def main():
-    global SEM_THRESHOLD
+    global SEM_THRESHOLD, _encode_pool
 
     ap = argparse.ArgumentParser(description="Rakip Analiz — sorgu-merkezli (interactive query, no 'uyum_durumu')")
     ap.add_argument("--glob",
@@ -495,9 +549,19 @@ def main():
     ap.add_argument("--threshold", type=float, default=0.50, help="Snippet/meta eşiği (0-1). Vars: 0.50")
     ap.add_argument("--max-snippets", type=int, default=3, help="Rakip sayfadan alınacak maksimum snippet")
     ap.add_argument("--topk", type=int, default=10, help="JSON'a eklenecek uyumlu_kayit sayısı (vars: 10)")
+    ap.add_argument("--concurrency", type=int, default=None, help="Eş zamanlı rakip getirme sayısı")
+    ap.add_argument("--per-host", type=int, default=None, help="Aynı hosta eş zamanlı istek sınırı")
+    ap.add_argument("--host-delay", type=float, default=None, help="Aynı hosta ardışık istekler arası bekleme (sn)")
+    ap.add_argument("--url-timeout", type=float, default=None, help="URL başına süre sınırı (sn)")
+    ap.add_argument("--total-timeout", type=float, default=None, help="Tüm rakipler için toplam süre sınırı (sn)")
+    ap.add_argument("--encode-workers", type=int, default=0,
+                    help="Embedding için işçi süreç sayısı (>1: çok süreçli havuz; vars: tek süreç)")
     args = ap.parse_args()
 
     SEM_THRESHOLD = float(args.threshold)
+    if args.encode_workers > 1:
+        from modules.kodlama_havuzu import havuz_olustur
+        _encode_pool = havuz_olustur(workers=args.encode_workers, model_name=ST_MODEL_NAME, backend=_EMBED_BACKEND)
 
     # 1) CSV'yi yükle
     df_all = load_many(args.glob)
@@ -524,7 +588,11 @@ def main():
     comp_list, our_rank = get_competitors_above(selected, args.excel)
 
     # 5) Rakip sayfalarında snippet+meta
-    rakip_kullanimlar = analyze_competitor_sites(comp_list, selected, max_snippets=args.max_snippets) if comp_list else []
+    getir_kw = {k: v for k, v in {"esz_zamanli": args.concurrency, "host_limit": args.per_host,
+                                  "host_bekleme": args.host_delay, "url_timeout": args.url_timeout,
+                                  "toplam_timeout": args.total_timeout}.items() if v is not None}
+    rakip_kullanimlar = analyze_competitor_sites(comp_list, selected, max_snippets=args.max_snippets,
+                                                 **getir_kw) if comp_list else []
 
     # 6) JSON
     uyumlu_kayitlar = build_uyumlu_kayitlar(result_df, selected, topk=args.topk)
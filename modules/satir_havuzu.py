@@ -0,0 +1,59 @@
+# modules/satir_havuzu.py — iyileştirme akışları için sıralı çıktılı iş parçacığı havuzu
+#
+# satirlari_isle(isler, fn, esz_zamanli):
+#   - en fazla esz_zamanli satır aynı anda işlenir (her satır MAX_ATTEMPTS'e kadar LLM çağrısı yapar)
+#   - sonuçlar girdi sırasıyla döner; biten satır hemen ilerleme satırı basar:
+#       [12/80] ✓ satır 7 | 3.4 s | 0.41 satır/sn | kalan ~2m 45.1s
+#   - hata veren satırın sonucu None'dır; hata mesajı basılır, diğer satırlar sürer
+# esz_zamanli=1 eski sıralı akışla aynıdır. Sunucu tarafında OLLAMA_NUM_PARALLEL aynı sayıya
+# ayarlanmalı; fazlası sunucuda kuyrukta bekler.
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+try:
+    from config import IYILESTIRME_PARALLEL
+except Exception:
+    IYILESTIRME_PARALLEL = int(os.getenv("IYILESTIRME_PARALLEL", os.getenv("OLLAMA_PARALLEL", "4")))
+
+def _sure(s: float) -> str:
+    if s < 1: return f"{s*1000:.0f} ms"
+    m, r = divmod(s, 60)
+    return f"{int(m)}m {r:.1f}s" if m >= 1 else f"{s:.2f} s"
+
+def satirlari_isle(isler: list, fn: Callable, esz_zamanli: int = IYILESTIRME_PARALLEL,
+                   etiket: str = "") -> list:
+    """[fn(*is) for is in isler] — eş zamanlı; sonuçlar girdi sırasıyla, hatalı satır için None."""
+    isler = list(isler)
+    toplam = len(isler)
+    esz_zamanli = max(1, min(esz_zamanli, toplam or 1))
+    sonuclar: list = [None] * toplam
+    bitti = hatali = 0
+    t0 = time.time()
+
+    def _calistir(i: int):
+        t = time.time()
+        return fn(*isler[i]), time.time() - t
+
+    print(f"⚙️  {etiket}{toplam} satır, {esz_zamanli} eş zamanlı işleniyor...", flush=True)
+    with ThreadPoolExecutor(max_workers=esz_zamanli, thread_name_prefix="satir") as ex:
+        gelecekler = {ex.submit(_calistir, i): i for i in range(toplam)}
+        for f in as_completed(gelecekler):
+            i = gelecekler[f]
+            bitti += 1
+            hiz = bitti / max(time.time() - t0, 1e-9)
+            kalan = (toplam - bitti) / hiz
+            try:
+                sonuclar[i], sure = f.result()
+                durum = f"✓ satır {i + 1} | {_sure(sure)}"
+            except Exception as e:
+                hatali += 1
+                durum = f"⚠️  satır {i + 1} başarısız ({type(e).__name__}: {e})"
+            print(f"[{bitti}/{toplam}] {durum} | {hiz:.2f} satır/sn | kalan ~{_sure(kalan)}", flush=True)
+    gecen = time.time() - t0
+    print(f"✅ {etiket}{toplam} satır {_sure(gecen)}'de işlendi "
+          f"({toplam / max(gecen, 1e-9):.2f} satır/sn, {esz_zamanli} eş zamanlı, {hatali} hata).", flush=True)
+    return sonuclar
@@ -0,0 +1,104 @@
+# modules/sayfa_bekleme.py — sabit bekleme yerine hazır olma tespiti (Playwright + Selenium)
+#
+# Sayfa "hazır" sayılır: document.readyState === "complete" ve son quiet_ms boyunca
+# ne DOM değişikliği (MutationObserver) ne de yeni ağ kaynağı (Resource Timing)
+# görülmediğinde. Kaydırma, belge yüksekliği ve metin uzunluğu büyümeyi
+# bıraktığında durur. Her iki kontrol de tarayıcı içinde tek çağrıda çalışır
+# (Selenium'da ek WebDriver gidiş-dönüşü yok) ve gerçekten beklenen süreyi
+# milisaniye olarak döndürür; statik sayfalar yaklaşık quiet_ms içinde döner.
+#
+#   bekleme = sayfayi_hazirla(page)          # Playwright page ya da Selenium driver
+#   bekleme -> {"hazir_ms": 212, "kaydirma_ms": 180, "kaydirma_adim": 1, "toplam_ms": 392}
+from __future__ import annotations
+
+import time
+
+QUIET_MS = 300         # bu kadar sessizlik = hazır
+MAX_MS = 10000         # en kötü durumda hazır bekleme üst sınırı
+SCROLL_STEP = 1400
+SCROLL_QUIET_MS = 200  # her kaydırmadan sonra tembel yükleme için sessizlik penceresi
+SCROLL_MAX_PASSES = 10
+SCROLL_MAX_MS = 8000
+
+_HAZIR_FN = r"""
+(quietMs, maxMs) => new Promise(resolve => {
+  const t0 = performance.now();
+  let last = t0;
+  let nRes = performance.getEntriesByType("resource").length;
+  const mo = new MutationObserver(() => { last = performance.now(); });
+  mo.observe(document, {subtree: true, childList: true, characterData: true});
+  const tick = () => {
+    const now = performance.now();
+    const n = performance.getEntriesByType("resource").length;
+    if (n !== nRes) { nRes = n; last = now; }
+    if ((document.readyState === "complete" && now - last >= quietMs) || now - t0 >= maxMs) {
+      mo.disconnect();
+      resolve(Math.round(now - t0));
+    } else {
+      setTimeout(tick, 50);
+    }
+  };
+  tick();
+})
+"""
+
+_KAYDIR_FN = r"""
+async (step, quietMs, maxPasses, maxMs) => {
+  const hazir = """ + _HAZIR_FN.strip() + r""";
+  const t0 = performance.now();
+  const olc = () => [document.documentElement.scrollHeight, (document.body ? document.body.textContent.length : 0)];
+  let [h, t] = olc();
+  let adim = 0;
+  if (h <= window.innerHeight) return {ms: 0, adim: 0};
+  while (adim < maxPasses && performance.now() - t0 < maxMs) {
+    window.scrollBy(0, step);
+    adim++;
+    await hazir(quietMs, Math.max(0, maxMs - (performance.now() - t0)));
+    const [h2, t2] = olc();
+    if (h2 <= h && t2 <= t) break;  // büyüme durdu: tembel yüklenecek içerik kalmadı
+    h = h2; t = t2;
+  }
+  return {ms: Math.round(performance.now() - t0), adim: adim};
+}
+"""
+
+def _playwright_mi(hedef) -> bool:
+    return hasattr(hedef, "evaluate")
+
+def _calistir(hedef, fn: str, *args, timeout_ms: int):
+    """fn (async JS fonksiyon ifadesi) tarayıcıda çalıştırılır, sonucu döner."""
+    if _playwright_mi(hedef):
+        return hedef.evaluate(f"(a) => ({fn})(...a)", list(args))
+    hedef.set_script_timeout(timeout_ms / 1000 + 5)
+    return hedef.execute_async_script(
+        f"const done = arguments[arguments.length - 1];"
+        f"Promise.resolve(({fn})(...Array.from(arguments).slice(0, -1))).then(done, () => done(null));",
+        *args,
+    )
+
+def hazir_bekle(hedef, quiet_ms: int = QUIET_MS, max_ms: int = MAX_MS) -> int:
+    """DOM ve ağ sessizleşene kadar bekler; beklenen ms'yi döndürür."""
+    t0 = time.perf_counter()
+    try:
+        sonuc = _calistir(hedef, _HAZIR_FN, quiet_ms, max_ms, timeout_ms=max_ms)
+        return int(sonuc) if sonuc is not None else int((time.perf_counter() - t0) * 1000)
+    except Exception:
+        # gezinme sırasında bağlam yok olabilir: ölçülen süre kadar beklenmiş say
+        return int((time.perf_counter() - t0) * 1000)
+
+def kaydir(hedef, step: int = SCROLL_STEP, quiet_ms: int = SCROLL_QUIET_MS,
+           max_passes: int = SCROLL_MAX_PASSES, max_ms: int = SCROLL_MAX_MS) -> dict:
+    """Yükseklik/metin uzunluğu büyüdükçe kaydırır; {"ms", "adim"} döndürür."""
+    t0 = time.perf_counter()
+    try:
+        sonuc = _calistir(hedef, _KAYDIR_FN, step, quiet_ms, max_passes, max_ms, timeout_ms=max_ms)
+    except Exception:
+        sonuc = None
+    return sonuc or {"ms": int((time.perf_counter() - t0) * 1000), "adim": 0}
+
+def sayfayi_hazirla(hedef, kaydirma: bool = True, **kw) -> dict:
+    """Hazır bekleme + (isteğe bağlı) tembel yükleme kaydırması; ölçülen süreleri döndürür."""
+    hazir_ms = hazir_bekle(hedef, kw.get("quiet_ms", QUIET_MS), kw.get("max_ms", MAX_MS))
+    k = kaydir(hedef, step=kw.get("step", SCROLL_STEP)) if kaydirma else {"ms": 0, "adim": 0}
+    return {"hazir_ms": hazir_ms, "kaydirma_ms": k["ms"], "kaydirma_adim": k["adim"],
+            "toplam_ms": hazir_ms + k["ms"]}
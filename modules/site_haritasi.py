@@ -0,0 +1,316 @@
+# modules/site_haritasi.py — sitemap.xml ile sayfa keşfi ve lastmod'a göre artımlı tarama
+#
+# Büyük sitelerde link izleyerek keşif yavaş ve eksik kalır. Bu modül:
+#   * robots.txt "Sitemap:" satırlarını (yoksa /sitemap.xml) okur, sitemap index'leri
+#     özyinelemeli izler; .gz dosyaları ve gzip Content-Encoding desteklenir
+#   * XML'i lxml.iterparse ile akış halinde ayrıştırır (50 MB'lık sitemap belleğe alınmaz)
+#     ve (url, lastmod) çiftlerini üretir
+#   * son çalıştırmada görülen lastmod'ları durum dosyasında tutar
+#     (<cache_dir>/sitemap_durum.json); yalnızca lastmod'u daha yeni (ya da ilk kez
+#     görülen) sayfalar getirilir, değişmeyenlerin içeriği <cache_dir>/sayfalar/'dan okunur
+# Çıktı site_tarayici.tara ile aynıdır: {kanonik url: içerik sözlüğü} → ContentIndex.from_pages.
+#
+#   python -m modules.site_haritasi https://www.reklamvermek.com --max-sayfa 500
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Iterator
+from urllib.parse import urlparse
+
+from modules.paralel_getir import getir_hepsi_sync
+from modules.site_tarayici import _HTML_DISI, RobotsKurallari, _ayni_site, kanonik_url
+
+try:
+    from config import CRAWL_CONCURRENCY, CRAWL_DELAY, cache_dir
+except Exception:
+    cache_dir = os.path.join("data", "cache")
+    CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+    CRAWL_DELAY = float(os.getenv("CRAWL_DELAY", "0.25"))
+
+SITEMAP_STATE = os.getenv("SITEMAP_STATE", os.path.join(cache_dir, "sitemap_durum.json"))
+SAYFA_DIR = os.getenv("SITEMAP_PAGE_DIR", os.path.join(cache_dir, "sayfalar"))
+SITEMAP_TIMEOUT = float(os.getenv("SITEMAP_TIMEOUT", "30"))
+PARTI = 50  # akıştan her seferinde getirilen URL sayısı
+
+# ---------- sitemap okuma ----------
+def _ac(url: str, timeout: float = SITEMAP_TIMEOUT):
+    """Sitemap yanıtını akış olarak açar; .gz gövdeyi (Content-Encoding dışında) açar."""
+    from modules.http_getir import get_session
+    r = get_session().get(url, stream=True, timeout=timeout,
+                          headers={"Accept": "application/xml,text/xml,application/x-gzip,*/*;q=0.8"})
+    if r.status_code >= 400:
+        r.close()
+        raise OSError(f"HTTP {r.status_code}")
+    r.raw.decode_content = True  # gzip/deflate Content-Encoding'i urllib3 çözer
+    akis = _OnEkliAkis(r.raw.read(2), r.raw)
+    if akis.bas == b"\x1f\x8b":
+        akis = gzip.GzipFile(fileobj=akis)
+    return r, akis
+
+class _OnEkliAkis(io.RawIOBase):
+    """Baştan okunmuş birkaç baytı akışın önüne geri koyar (gzip imzası kontrolü için)."""
+
+    def __init__(self, bas: bytes, akis):
+        self.bas, self._kalan, self._akis = bas, bas, akis
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, n: int = -1) -> bytes:
+        if self._kalan:
+            parca, self._kalan = self._kalan, b""
+            return parca if n is None or n < 0 or n >= len(parca) else self._geri(parca, n)
+        return self._akis.read(n if n is not None and n >= 0 else None) or b""
+
+    def _geri(self, parca: bytes, n: int) -> bytes:
+        self._kalan = parca[n:]
+        return parca[:n]
+
+    def readinto(self, b) -> int:
+        veri = self.read(len(b))
+        b[:len(veri)] = veri
+        return len(veri)
+
+def _yerel(tag) -> str:
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+def _ayristir(akis) -> Iterator[tuple[str, str, str | None]]:
+    """("url" | "sitemap", loc, lastmod) — elemanlar işlendikçe bellekten atılır."""
+    from lxml import etree
+    for _, el in etree.iterparse(akis, events=("end",), tag=("{*}url", "{*}sitemap"),
+                                 resolve_entities=False, no_network=True, huge_tree=True, recover=True):
+        loc = lastmod = None
+        for c in el:
+            ad = _yerel(c.tag)
+            if ad == "loc":
+                loc = (c.text or "").strip()
+            elif ad == "lastmod":
+                lastmod = (c.text or "").strip() or None
+        if loc:
+            yield _yerel(el.tag), loc, lastmod
+        el.clear()
+        while el.getprevious() is not None:
+            del el.getparent()[0]
+
+def site_haritasi_urlleri(sitemapler: list[str]) -> Iterator[tuple[str, str | None]]:
+    """Sitemap/sitemap index listesinden (sayfa url, lastmod) akışı."""
+    kuyruk, gorulen = list(sitemapler), set()
+    while kuyruk:
+        sm = kuyruk.pop(0)
+        if sm in gorulen:
+            continue
+        gorulen.add(sm)
+        try:
+            r, akis = _ac(sm)
+        except Exception as e:
+            logging.warning(f"Sitemap okunamadı: {sm} ({e})")
+            continue
+        n = 0
+        try:
+            for tur, loc, lastmod in _ayristir(akis):
+                if tur == "sitemap":
+                    kuyruk.append(loc)
+                else:
+                    n += 1
+                    yield loc, lastmod
+        except Exception as e:
+            logging.warning(f"Sitemap ayrıştırılamadı: {sm} ({e})")
+        finally:
+            r.close()
+        logging.info(f"Sitemap {sm}: {n} URL.")
+
+def sitemap_adresleri(site: str, kurallar: RobotsKurallari | None = None) -> list[str]:
+    """robots.txt'te bildirilen sitemap'ler; yoksa <kök>/sitemap.xml."""
+    p = urlparse(site)
+    kok = f"{p.scheme}://{p.netloc}"
+    bulunan = (kurallar or RobotsKurallari()).site_haritalari(kok)
+    return bulunan or [f"{kok}/sitemap.xml"]
+
+# ---------- lastmod durumu ----------
+def _zaman(lastmod: str | None) -> datetime | None:
+    """W3C datetime (2024-05-01, 2024-05-01T10:00Z, ...+03:00) → UTC."""
+    if not lastmod:
+        return None
+    try:
+        t = datetime.fromisoformat(lastmod.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return t.replace(tzinfo=timezone.utc) if t.tzinfo is None else t.astimezone(timezone.utc)
+
+def daha_yeni_mi(yeni: str | None, eski: str | None) -> bool:
+    """Sitemap'teki lastmod son görülenden yeni mi? Bilinmiyorsa değişmemiş sayılır."""
+    if not yeni:
+        return False
+    if not eski:
+        return True
+    a, b = _zaman(yeni), _zaman(eski)
+    if a is None or b is None:
+        return yeni != eski
+    return a > b
+
+class SiteHaritasiDurumu:
+    """url -> {"lastmod", "alindi"} ve sayfa içerikleri (gzip'li JSON) — çalıştırmalar arası."""
+
+    def __init__(self, yol: str = SITEMAP_STATE, sayfa_dir: str = SAYFA_DIR):
+        self.yol = yol
+        self.sayfa_dir = sayfa_dir
+        try:
+            with open(yol, encoding="utf-8") as f:
+                self.sayfalar: dict[str, dict] = json.load(f).get("sayfalar", {})
+        except (OSError, ValueError):
+            self.sayfalar = {}
+
+    def _icerik_yolu(self, url: str) -> str:
+        return os.path.join(self.sayfa_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json.gz")
+
+    def getirilmeli_mi(self, url: str, lastmod: str | None) -> bool:
+        kayit = self.sayfalar.get(url)
+        if kayit is None or not os.path.exists(self._icerik_yolu(url)):
+            return True
+        return daha_yeni_mi(lastmod, kayit.get("lastmod"))
+
+    def icerik(self, url: str) -> dict | None:
+        try:
+            with gzip.open(self._icerik_yolu(url), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError, EOFError):
+            return None
+
+    def guncelle(self, url: str, lastmod: str | None, icerik: dict):
+        os.makedirs(self.sayfa_dir, exist_ok=True)
+        yol = self._icerik_yolu(url)
+        with gzip.open(yol + ".tmp", "wt", encoding="utf-8") as f:
+            json.dump(icerik, f, ensure_ascii=False)
+        os.replace(yol + ".tmp", yol)
+        self.sayfalar[url] = {"lastmod": lastmod, "alindi": time.time()}
+
+    def kaydet(self):
+        os.makedirs(os.path.dirname(self.yol) or ".", exist_ok=True)
+        with open(self.yol + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"sayfalar": self.sayfalar}, f, ensure_ascii=False)
+        os.replace(self.yol + ".tmp", self.yol)
+
+# ---------- tarama ----------
+def tara_site_haritasi(site: str, max_sayfa: int | None = None, esz_zamanli: int = CRAWL_CONCURRENCY,
+                       gecikme: float = CRAWL_DELAY, robots: bool = True, getir=None,
+                       durum: SiteHaritasiDurumu | None = None, tumu: bool = False,
+                       url_timeout: float = 60, toplam_timeout: float = 3600) -> dict[str, dict]:
+    """Sitemap'teki sayfalar için {kanonik url: içerik}; yalnızca değişenler ağdan getirilir.
+
+    İlk sayfa başlangıç adresidir (sitemap'te olmasa da getirilir). Sitemap yoksa ya da
+    taranabilir URL içermiyorsa {} döner; çağıran link taramasına düşebilir.
+
+    getir(url) -> içerik sözlüğü; verilmezse get_structured_web_content_selenium.
+    tumu=True: lastmod'a bakmadan hepsini yeniden getir (durum yine güncellenir).
+    """
+    if getir is None:
+        from modules.webScraping import get_structured_web_content_selenium as getir
+    kok = kanonik_url(site)
+    if kok is None:
+        raise ValueError(f"Geçersiz site URL'si: {site}")
+    kurallar = RobotsKurallari() if robots else None
+    if kurallar is not None:
+        gecikme = max(gecikme, kurallar.gecikme(kok))
+    durum = durum or SiteHaritasiDurumu()
+
+    sayfalar: dict[str, dict] = {}
+    sayac = {"degisen": 0, "degismeyen": 0, "hata": 0, "atlanan": 0}
+    gorulen: set[str] = set()
+    parti: list[tuple[str, str | None]] = []
+    t0 = time.time()
+
+    def _isle(parti):
+        sonuclar = getir_hepsi_sync([u for u, _ in parti], getir, esz_zamanli=esz_zamanli,
+                                    host_limit=esz_zamanli, host_bekleme=gecikme, url_timeout=url_timeout,
+                                    toplam_timeout=max(1.0, toplam_timeout - (time.time() - t0)))
+        for (u, lastmod), s in zip(parti, sonuclar):
+            if s.ok and isinstance(s.icerik, dict):
+                sayfalar[u] = s.icerik
+                durum.guncelle(u, lastmod, s.icerik)
+                sayac["degisen"] += 1
+                continue
+            sayac["hata"] += 1
+            logging.warning(f"Sayfa alınamadı ({s.durum}): {u} {s.hata or ''}")
+            eski = durum.icerik(u)  # önceki sürüm varsa onunla devam; durum güncellenmez
+            if eski is not None:
+                sayfalar[u] = eski
+        durum.kaydet()  # kesintide o ana kadar getirilenler kaybolmasın
+
+    sitemap_var = False
+    for loc, lastmod in site_haritasi_urlleri(sitemap_adresleri(kok, kurallar)):
+        sitemap_var = True
+        # başlangıç sayfası sitemap'te henüz görülmediyse ona bir yer ayrılır
+        if max_sayfa and len(sayfalar) + len(parti) >= max_sayfa - (kok not in gorulen):
+            break
+        u = kanonik_url(loc)
+        if not u or u in gorulen:
+            continue
+        gorulen.add(u)
+        if (not _ayni_site(u, kok) or _HTML_DISI.search(urlparse(u).path)
+                or (kurallar is not None and not kurallar.izinli(u))):
+            sayac["atlanan"] += 1
+            continue
+        if not tumu and not durum.getirilmeli_mi(u, lastmod):
+            eski = durum.icerik(u)
+            if eski is not None:
+                sayfalar[u] = eski
+                sayac["degismeyen"] += 1
+                continue
+        parti.append((u, lastmod))
+        if len(parti) >= PARTI:
+            print(f"🗺️  {len(parti)} değişen sayfa getiriliyor ({len(gorulen)} URL görüldü)...")
+            _isle(parti)
+            parti = []
+    if not sitemap_var or (gorulen and len(gorulen) == sayac["atlanan"]):
+        print("⚠️  Sitemap'te taranabilir sayfa bulunamadı.")
+        return {}
+    # başlangıç sayfası her zaman ilk sayfadır (title/meta ondan gelir); sitemap'te yoksa
+    # lastmod'u da yoktur, her çalıştırmada yeniden getirilir
+    if kok not in gorulen and (kurallar is None or kurallar.izinli(kok)):
+        gorulen.add(kok)
+        parti.append((kok, None))
+    if parti:
+        print(f"🗺️  {len(parti)} değişen sayfa getiriliyor ({len(gorulen)} URL görüldü)...")
+        _isle(parti)
+    else:
+        durum.kaydet()
+    if kok in sayfalar:
+        sayfalar = {kok: sayfalar.pop(kok), **sayfalar}
+    print(f"✅ Sitemap: {len(sayfalar)} sayfa — {sayac['degisen']} getirildi, {sayac['degismeyen']} değişmemiş, "
+          f"{sayac['hata']} hata, {sayac['atlanan']} atlandı ({time.time() - t0:.1f} sn).")
+    return sayfalar
+
+def main():
+    ap = argparse.ArgumentParser(description="Sitemap ile sayfa keşfi (lastmod'a göre artımlı)")
+    ap.add_argument("url")
+    ap.add_argument("--max-sayfa", type=int, default=None)
+    ap.add_argument("--esz-zamanli", type=int, default=CRAWL_CONCURRENCY)
+    ap.add_argument("--gecikme", type=float, default=CRAWL_DELAY)
+    ap.add_argument("--robots-yok", action="store_true", help="robots.txt kurallarını yok say")
+    ap.add_argument("--tumu", action="store_true", help="lastmod'a bakmadan hepsini yeniden getir")
+    ap.add_argument("--listele", action="store_true", help="Yalnızca sitemap URL'lerini yaz, getirme")
+    ap.add_argument("--json", default=None, help="Sayfa içeriklerini bu JSON dosyasına yaz")
+    args = ap.parse_args()
+    if args.listele:
+        for i, (u, lastmod) in enumerate(site_haritasi_urlleri(sitemap_adresleri(args.url))):
+            if args.max_sayfa and i >= args.max_sayfa:
+                break
+            print(f"{u}\t{lastmod or ''}")
+        return
+    sayfalar = tara_site_haritasi(args.url, args.max_sayfa, args.esz_zamanli, args.gecikme,
+                                  robots=not args.robots_yok, tumu=args.tumu)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sayfalar, f, ensure_ascii=False, indent=2)
+        print(f"✅ {args.json} yazıldı.")
+
+if __name__ == "__main__":
+    main()
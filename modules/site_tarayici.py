@@ -0,0 +1,172 @@
+# modules/site_tarayici.py — iç linkleri izleyen çok sayfalı site tarayıcı
+#
+# get_structured_web_content_selenium her sayfa için links.internal'ı zaten
+# topluyor; tara() bunu bir URL sınırı (frontier) olarak kullanır:
+#   * URL kanonikleştirme (şema/host küçük harf, varsayılan port, #fragment,
+#     utm_*/gclid/fbclid gibi izleme parametreleri, sıralı sorgu) ve tekilleştirme
+#   * derinlik (max_derinlik) ve sayfa (max_sayfa) sınırı, yalnızca başlangıç hostu
+#   * her derinlik seviyesi paralel_getir ile eş zamanlı getirilir (host başına bekleme)
+#   * robots.txt (Disallow + Crawl-delay) kuralları
+# Çıktı: {url: içerik sözlüğü} — mevcut yapıda, keşif sırasıyla. ContentIndex.from_pages
+# ile bütün site tek indeks olur; her parça sayfa URL'sini taşır (tablolarda "URL" kolonu).
+#
+#   python -m modules.site_tarayici https://www.reklamvermek.com --max-sayfa 30 --max-derinlik 2
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+
+from modules.paralel_getir import getir_hepsi_sync
+
+try:
+    from config import CRAWL_CONCURRENCY, CRAWL_DELAY, CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES
+except Exception:
+    CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "1"))
+    CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "2"))
+    CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+    CRAWL_DELAY = float(os.getenv("CRAWL_DELAY", "0.25"))
+
+USER_AGENT = "Mozilla/5.0"  # robots.txt eşleşmesi için ("*" kuralları)
+_IZLEME = re.compile(r"^(utm_\w+|gclid|fbclid|yclid|msclkid|mc_cid|mc_eid|_ga|ref)$", re.I)
+_HTML_DISI = re.compile(
+    r"\.(pdf|jpe?g|png|gif|webp|svg|ico|css|js|json|xml|zip|rar|gz|mp4|mp3|avi|mov|docx?|xlsx?|pptx?)$", re.I)
+
+def kanonik_url(url: str, taban: str | None = None) -> str | None:
+    """Karşılaştırılabilir tek biçim; http(s) dışı şemalar için None."""
+    if taban:
+        url = urljoin(taban, url)
+    p = urlparse(url.strip())
+    scheme = p.scheme.lower()
+    if scheme not in ("http", "https") or not p.hostname:
+        return None
+    host = p.hostname.lower()
+    if p.port and not ((scheme == "http" and p.port == 80) or (scheme == "https" and p.port == 443)):
+        host = f"{host}:{p.port}"
+    path = re.sub(r"/{2,}", "/", p.path or "/")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(p.query, keep_blank_values=True) if not _IZLEME.match(k)))
+    return urlunparse((scheme, host, path, "", query, ""))
+
+def _ayni_site(a: str, b: str) -> bool:
+    ha, hb = urlparse(a).hostname or "", urlparse(b).hostname or ""
+    return ha.removeprefix("www.") == hb.removeprefix("www.")
+
+# ---------- robots.txt ----------
+class RobotsKurallari:
+    def __init__(self):
+        self._kurallar: dict[str, RobotFileParser | None] = {}
+        self._mu = threading.Lock()
+
+    def _yukle(self, kok: str) -> RobotFileParser | None:
+        from modules.http_getir import http_get
+        try:
+            metin, meta = http_get(f"{kok}/robots.txt")
+        except Exception:
+            return None
+        if meta.get("status", 500) >= 400:
+            return None  # robots.txt yok/erişilemedi: kısıt yok
+        rp = RobotFileParser()
+        rp.parse(metin.splitlines())
+        return rp
+
+    def _rp(self, url: str) -> RobotFileParser | None:
+        p = urlparse(url)
+        kok = f"{p.scheme}://{p.netloc}"
+        with self._mu:
+            if kok not in self._kurallar:
+                self._kurallar[kok] = self._yukle(kok)
+            return self._kurallar[kok]
+
+    def izinli(self, url: str) -> bool:
+        rp = self._rp(url)
+        return rp is None or rp.can_fetch(USER_AGENT, url)
+
+    def gecikme(self, url: str) -> float:
+        rp = self._rp(url)
+        d = rp.crawl_delay(USER_AGENT) if rp is not None else None
+        return float(d) if d else 0.0
+
+    def site_haritalari(self, url: str) -> list[str]:
+        """robots.txt'teki "Sitemap:" satırları."""
+        rp = self._rp(url)
+        return list((rp.site_maps() if rp is not None else None) or [])
+
+# ---------- tarama ----------
+def _linkler(icerik: dict) -> list[str]:
+    return [l.get("url") for l in (icerik.get("links") or {}).get("internal", []) if l.get("url")]
+
+def tara(baslangic: str, max_sayfa: int = CRAWL_MAX_PAGES, max_derinlik: int = CRAWL_MAX_DEPTH,
+         esz_zamanli: int = CRAWL_CONCURRENCY, gecikme: float = CRAWL_DELAY, robots: bool = True,
+         getir=None, url_timeout: float = 60, toplam_timeout: float = 1800) -> dict[str, dict]:
+    """Başlangıç sayfasından iç linkleri izleyerek {kanonik url: içerik} döndürür.
+
+    getir(url) -> içerik sözlüğü; verilmezse get_structured_web_content_selenium.
+    """
+    if getir is None:
+        from modules.webScraping import get_structured_web_content_selenium as getir
+    kok = kanonik_url(baslangic)
+    if kok is None:
+        raise ValueError(f"Geçersiz başlangıç URL'si: {baslangic}")
+    kurallar = RobotsKurallari() if robots else None
+    if kurallar is not None:
+        gecikme = max(gecikme, kurallar.gecikme(kok))
+
+    sayfalar: dict[str, dict] = {}
+    gorulen = {kok}
+    seviye = [kok]
+    t0 = time.time()
+    for derinlik in range(max_derinlik + 1):
+        if kurallar is not None:
+            izinli = [u for u in seviye if kurallar.izinli(u)]
+            if len(izinli) < len(seviye):
+                logging.info(f"robots.txt ile engellenen {len(seviye) - len(izinli)} URL atlandı.")
+            seviye = izinli
+        seviye = seviye[:max(0, max_sayfa - len(sayfalar))]
+        if not seviye:
+            break
+        print(f"🕸️  Derinlik {derinlik}: {len(seviye)} sayfa getiriliyor...")
+        sonuclar = getir_hepsi_sync(seviye, getir, esz_zamanli=esz_zamanli, host_limit=esz_zamanli,
+                                    host_bekleme=gecikme, url_timeout=url_timeout,
+                                    toplam_timeout=max(1.0, toplam_timeout - (time.time() - t0)))
+        sonraki = []
+        for s in sonuclar:
+            if not s.ok or not isinstance(s.icerik, dict):
+                logging.warning(f"Sayfa alınamadı ({s.durum}): {s.url} {s.hata or ''}")
+                continue
+            sayfalar[s.url] = s.icerik
+            for link in _linkler(s.icerik):
+                u = kanonik_url(link, s.url)
+                if u and u not in gorulen and _ayni_site(u, kok) and not _HTML_DISI.search(urlparse(u).path):
+                    gorulen.add(u)
+                    sonraki.append(u)
+        seviye = sonraki
+    print(f"✅ {len(sayfalar)} sayfa tarandı ({len(gorulen)} URL görüldü, {time.time() - t0:.1f} sn).")
+    return sayfalar
+
+def main():
+    ap = argparse.ArgumentParser(description="İç linkleri izleyen site tarayıcı")
+    ap.add_argument("url")
+    ap.add_argument("--max-sayfa", type=int, default=max(CRAWL_MAX_PAGES, 20))
+    ap.add_argument("--max-derinlik", type=int, default=CRAWL_MAX_DEPTH)
+    ap.add_argument("--esz-zamanli", type=int, default=CRAWL_CONCURRENCY)
+    ap.add_argument("--gecikme", type=float, default=CRAWL_DELAY)
+    ap.add_argument("--robots-yok", action="store_true", help="robots.txt kurallarını yok say")
+    ap.add_argument("--json", default=None, help="Sayfa içeriklerini bu JSON dosyasına yaz")
+    args = ap.parse_args()
+    sayfalar = tara(args.url, args.max_sayfa, args.max_derinlik, args.esz_zamanli, args.gecikme,
+                    robots=not args.robots_yok)
+    for u, c in sayfalar.items():
+        print(f"  {u} — {c.get('title') or ''}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sayfalar, f, ensure_ascii=False, indent=2)
+        print(f"✅ {args.json} yazıldı.")
+
+if __name__ == "__main__":
+    main()
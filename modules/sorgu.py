@@ -6,6 +6,7 @@ import unicodedata
 import pandas as pd
 
 from config import output_dir
+from modules.tablo_io import tablo_oku, tablo_yolu, tam_tablo_yolu
 
 TOP_K   = 10
 IN_CSV  = f"{output_dir}/html_icerik_sorgu_uyumu.csv"
@@ -49,18 +50,17 @@ def _pick_column(df: pd.DataFrame, candidates) -> str | None:
 
 # ---------- Ana Fonksiyon ----------
 def sort_query_similarity():
-    if not os.path.exists(IN_CSV):
+    in_csv = tablo_yolu(IN_CSV)
+    if not os.path.exists(in_csv):
         # bazı koşullarda dosya repo kökünde olabilir
-        alt = os.path.join("/mnt/data", os.path.basename(IN_CSV))
+        alt = tablo_yolu(os.path.join("/mnt/data", os.path.basename(IN_CSV)))
         if os.path.exists(alt):
             in_csv = alt
         else:
-            raise FileNotFoundError(f"Bulunamadı: {IN_CSV}")
-    else:
-        in_csv = IN_CSV
+            tam_tablo_yolu(IN_CSV)  # yol yok: write_full_tables ipucuyla FileNotFoundError
 
-    # Skor formatını korumak için string oku
-    df_raw = pd.read_csv(in_csv, encoding="utf-8-sig", dtype=str)
+    # Skor formatını korumak için string oku (Parquet ise skor zaten sayısal)
+    df_raw = tablo_oku(in_csv, dtype=str)
 
     # Kolon isimlerini yakala (hem Türkçe hem varyantlara dayanıklı)
     col_sorgu  = _pick_column(df_raw, ["Sorgu", "query", "kullanıcı sorgusu", "kullanici sorgusu", "kullanici_sorgusu", "kullanıcı_sorgusu"])
@@ -0,0 +1,116 @@
+# modules/tablo_io.py — uyum tabloları için CSV / Parquet okuma-yazma
+#
+# Parquet çıktısında tekrar eden metin kolonları (sorgu, niyet, html kaynağı,
+# içerik) sözlük kodlu (category), skor kolonları float32 yazılır. Okuyucular
+# dosyanın biçimini içeriğinden (PAR1 imzası) anlar; "x.csv" istendiğinde yanında
+# daha yeni (ya da tek) "x.parquet" varsa onu okur — TABLE_FORMAT csv'ye dönünce önceki
+# çalıştırmadan kalan eski parquet taze CSV'yi gölgelemez. CSV her zaman dışa aktarım olarak alınabilir:
+#   python -m modules.tablo_io data/output/html_icerik_sorgu_uyumu.parquet
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+try:
+    from config import table_format as TABLE_FORMAT
+except Exception:
+    TABLE_FORMAT = os.getenv("TABLE_FORMAT", "csv")
+
+TAM_TABLO_IPUCU = ("tam uyum tablosu (html_icerik_*_uyumu) yalnızca write_full_tables açıkken yazılır "
+                   "— WRITE_FULL_TABLES=1 ile main.py'yi yeniden çalıştırın.")
+SKOR_KOLONLARI = ("Benzerlik Skoru", "Eski Skor", "Yeni Skor", "Yüzde Değişim")
+KATEGORI_MAX_ORAN = 0.5  # tekil/satır oranı bunun altındaysa kolon sözlük kodlanır
+
+def _parquet_mu(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == b"PAR1"
+    except OSError:
+        return False
+
+def parquet_yolu(path: str) -> str:
+    return os.path.splitext(path)[0] + ".parquet"
+
+def tablo_yolu(path: str) -> str:
+    """Okunacak gerçek dosya: csv istendiğinde csv ile yanındaki .parquet'ten daha yeni olanı."""
+    pq = parquet_yolu(path)
+    if not path.endswith(".csv") or not os.path.exists(pq):
+        return path
+    if not os.path.exists(path) or os.path.getmtime(pq) >= os.path.getmtime(path):
+        return pq
+    return path
+
+def tablo_var_mi(path: str) -> bool:
+    return os.path.exists(tablo_yolu(path))
+
+def tam_tablo_yolu(path: str) -> str:
+    """Tam içerik × sorgu/niyet tablosunun okunacak yolu; yoksa nasıl üretileceğini söyleyen hata."""
+    yol = tablo_yolu(path)
+    if not os.path.exists(yol):
+        raise FileNotFoundError(f"Bulunamadı: {path} — {TAM_TABLO_IPUCU}")
+    return yol
+
+def _kolonlu_df(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    n = max(len(out), 1)
+    for c in out.columns:
+        if c in SKOR_KOLONLARI:
+            out[c] = pd.to_numeric(out[c], errors="coerce").astype("float32")
+        elif out[c].dtype == object and out[c].nunique(dropna=False) / n <= KATEGORI_MAX_ORAN:
+            out[c] = out[c].astype("category")
+    return out
+
+def tablo_yaz(df: pd.DataFrame, path: str, fmt: str | None = None, csv_export: bool = False) -> str:
+    """df'i seçilen biçimde yazar, yazılan dosyanın yolunu döndürür."""
+    fmt = (fmt or TABLE_FORMAT).lower()
+    if fmt == "parquet":
+        pq = parquet_yolu(path)
+        _kolonlu_df(df).to_parquet(pq, index=False, compression="zstd")
+        if csv_export:
+            df.to_csv(os.path.splitext(path)[0] + ".csv", index=False, encoding="utf-8-sig")
+        return pq
+    if fmt != "csv":
+        raise ValueError(f"Bilinmeyen tablo biçimi: {fmt!r} (csv | parquet)")
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+def tablo_oku(path: str, dtype=None, kategorileri_koru: bool = False) -> pd.DataFrame:
+    """Parquet'i doğrudan, CSV'yi hızlı C motoruyla okur; gerekirse kodlama/ayraç tahminine düşer.
+
+    dtype=str yalnızca CSV için anlamlıdır (skor metnini korur); Parquet skorları float32 gelir.
+    """
+    path = tablo_yolu(path)
+    if _parquet_mu(path):
+        df = pd.read_parquet(path)
+        if not kategorileri_koru:
+            for c in df.columns:
+                if isinstance(df[c].dtype, pd.CategoricalDtype):
+                    df[c] = df[c].astype(object)
+        return df
+
+    for enc in ("utf-8-sig", "utf-8", "latin-1"):
+        try:
+            df = pd.read_csv(path, encoding=enc, dtype=dtype)
+        except UnicodeDecodeError:
+            continue
+        except pd.errors.ParserError:
+            break
+        # tek kolon ve başlıkta ; / tab varsa ayraç virgül değil → tahmine düş
+        if len(df.columns) == 1 and any(ch in str(df.columns[0]) for ch in ";\t"):
+            break
+        return df
+    # son çare: ayraç tahmini (yavaş python motoru)
+    return pd.read_csv(path, sep=None, engine="python", dtype=dtype)
+
+def csv_disa_aktar(path: str, csv_path: str | None = None) -> str:
+    csv_path = csv_path or os.path.splitext(path)[0] + ".csv"
+    tablo_oku(path).to_csv(csv_path, index=False, encoding="utf-8-sig")
+    return csv_path
+
+if __name__ == "__main__":
+    for p in sys.argv[1:]:
+        t0 = time.time()
+        print(f"✅ {csv_disa_aktar(p)} yazıldı ({time.time() - t0:.2f} s)")
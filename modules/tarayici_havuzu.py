@@ -0,0 +1,177 @@
+# modules/tarayici_havuzu.py — sıcak tutulan headless Chromium havuzu (Playwright)
+#
+# Her slot kendi thread'inde bir Playwright + Chromium süreci tutar (sync API
+# thread'e bağlıdır). İşler `fn(page)` çağrılabilirleridir; her iş için yeni,
+# izole bir context/page açılır ve iş bitince kapatılır. Tarayıcı N sayfada bir
+# (max_pages) ya da çöktüğünde yeniden başlatılır.
+#
+#   html = get_browser_pool().run(lambda page: (page.goto(url), page.content())[1])
+#
+# submit() concurrent.futures.Future döndürür; asyncio tarafında
+# `await asyncio.wrap_future(pool.submit(...))` ile beklenebilir.
+# Boyut / geri dönüşüm: config.BROWSER_POOL_SIZE, config.BROWSER_MAX_PAGES.
+# paralel_getir'in URL süresi, iş havuz kuyruğunda beklerken durur, slot işi alınca başlar
+# (ESZ_ZAMANLI > havuz boyutu iken sağlıklı URL'ler kuyrukta zaman aşımına düşmesin).
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from modules.paralel_getir import aktif_saat
+
+try:
+    from config import BROWSER_MAX_PAGES, BROWSER_POOL_SIZE
+except Exception:
+    BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+    BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+
+LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled", "--disable-gpu", "--no-sandbox"]
+
+class BrowserPool:
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_pages: int = BROWSER_MAX_PAGES,
+                 headless: bool = True, args: list[str] | None = None):
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.headless = headless
+        self.args = list(LAUNCH_ARGS if args is None else args)
+        self._jobs: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._mu = threading.Lock()
+        self._closed = False
+        self.stats = {"launches": 0, "pages": 0, "recycles": 0, "crashes": 0, "launch_s": 0.0}
+
+    # ---- dış API ----
+    def submit(self, fn: Callable[[Any], Any], **context_kw) -> Future:
+        """fn(page) işini kuyruğa koyar; context_kw browser.new_context'e gider (user_agent vb.)."""
+        if self._closed:
+            raise RuntimeError("Tarayıcı havuzu kapatıldı.")
+        self._baslat()
+        fut: Future = Future()
+        # paralel_getir içinden çağrıldıysa URL süresi slot boşalana kadar işlemez
+        saat = aktif_saat()
+        if saat is not None:
+            saat.durdur()
+        self._jobs.put((fut, fn, context_kw, saat))
+        return fut
+
+    def run(self, fn: Callable[[Any], Any], timeout: float | None = None, **context_kw):
+        return self.submit(fn, **context_kw).result(timeout)
+
+    def close(self):
+        with self._mu:
+            if self._closed:
+                return
+            self._closed = True
+            for _ in self._threads:
+                self._jobs.put(None)
+        for t in self._threads:
+            t.join(timeout=30)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- slot thread'leri ----
+    def _baslat(self):
+        if self._threads:
+            return
+        with self._mu:
+            if not self._threads:
+                self._threads = [threading.Thread(target=self._slot, name=f"tarayici-{i}", daemon=True)
+                                 for i in range(self.size)]
+                for t in self._threads:
+                    t.start()
+
+    def _launch(self, pw):
+        t0 = time.time()
+        browser = pw.chromium.launch(headless=self.headless, args=self.args)
+        with self._mu:
+            self.stats["launches"] += 1
+            self.stats["launch_s"] += time.time() - t0
+        return browser
+
+    def _slot(self):
+        try:
+            from playwright.sync_api import sync_playwright
+            pw = sync_playwright().start()
+        except Exception as e:  # Playwright yok/bozuk: bekleyen işler takılı kalmasın
+            logging.error(f"Playwright başlatılamadı: {e}")
+            while (job := self._jobs.get()) is not None:
+                if job[0].set_running_or_notify_cancel():
+                    job[0].set_exception(e)
+            return
+        browser, sayfa = None, 0
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                fut, fn, context_kw, saat = job
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                if saat is not None:
+                    saat.baslat()
+                try:
+                    if browser is not None and sayfa >= self.max_pages:
+                        self._kapat(browser)
+                        browser = None
+                        with self._mu:
+                            self.stats["recycles"] += 1
+                    if browser is None or not browser.is_connected():
+                        browser, sayfa = self._launch(pw), 0
+                    context = browser.new_context(**context_kw)
+                    try:
+                        page = context.new_page()
+                        sonuc = fn(page)
+                    finally:
+                        try:
+                            context.close()
+                        except Exception:
+                            pass
+                    sayfa += 1
+                    with self._mu:
+                        self.stats["pages"] += 1
+                    fut.set_result(sonuc)
+                except Exception as e:
+                    fut.set_exception(e)
+                    if browser is not None and not browser.is_connected():
+                        logging.warning(f"Tarayıcı çöktü, yeniden başlatılacak: {e}")
+                        browser = None
+                        with self._mu:
+                            self.stats["crashes"] += 1
+        finally:
+            if browser is not None:
+                self._kapat(browser)
+            pw.stop()
+
+    @staticmethod
+    def _kapat(browser):
+        try:
+            browser.close()
+        except Exception:
+            pass
+
+_pool: BrowserPool | None = None
+_pool_mu = threading.Lock()
+
+def get_browser_pool() -> BrowserPool:
+    """Süreç genelinde paylaşılan havuz (webScraping ve rakip_analiz aynı örneği kullanır)."""
+    global _pool
+    if _pool is None:
+        with _pool_mu:
+            if _pool is None:
+                _pool = BrowserPool()
+    return _pool
+
+@atexit.register
+def _havuzu_kapat():
+    if _pool is not None:
+        _pool.close()
@@ -0,0 +1,304 @@
+# modules/vektor_deposu.py — içerik adresli, diskte kalıcı embedding deposu
+#
+# Anahtar: (model adı, normalize edilmiş metnin sha1'i)
+# Her model için bir klasör:
+#   vectors.f32  -> satır satır float32 vektörler (memory-mapped okunur)
+#   index.json   -> {"dim": d, "n": satır sayısı, "rows": {hash: [satır, son_kullanım]}}
+#   index.log    -> index.json'dan sonra eklenen satırlar, satır başına [hash, satır, zaman];
+#                   put_many yalnızca buna ekler, kapanışta (flush/atexit) index.json'a sıkıştırılır
+#   .lock        -> okuyucular paylaşımlı, yazıcılar özel kilit alır
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+try:
+    import fcntl  # POSIX
+except ImportError:  # Windows: süreçler arası kilit yok, süreç içi kilit yeterli
+    fcntl = None
+
+try:
+    from config import cache_dir as _CACHE
+except Exception:
+    _CACHE = os.path.join("data", "cache")
+
+try:
+    from config import embed_cache_key as _embed_cache_key
+    _DEFAULT_MODEL_NAME = _embed_cache_key()
+except Exception:
+    _DEFAULT_MODEL_NAME = "emrecan/bert-base-turkish-cased-mean-nli-stsb-tr"
+
+CACHE_DIR = os.getenv("EMBED_CACHE_DIR", os.path.join(_CACHE, "embeddings"))
+MAX_BYTES = int(float(os.getenv("EMBED_CACHE_MAX_MB", "512")) * 1024 * 1024)
+EVICT_TO = 0.8          # tahliyede limitin bu oranına kadar in
+DISABLED = os.getenv("EMBED_CACHE_OFF", "") == "1"
+
+# ---------- Yardımcılar ----------
+def normalize_text(s: str) -> str:
+    s = unicodedata.normalize("NFKC", s if isinstance(s, str) else str(s or ""))
+    return re.sub(r"\s+", " ", s).strip()
+
+def text_key(s: str) -> str:
+    return hashlib.sha1(normalize_text(s).encode("utf-8")).hexdigest()
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "model"
+
+class _FileLock:
+    def __init__(self, path: str, shared: bool):
+        self.path, self.shared, self.fh = path, shared, None
+
+    def __enter__(self):
+        self.fh = open(self.path, "a+")
+        if fcntl:
+            fcntl.flock(self.fh, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.fh, fcntl.LOCK_UN)
+        self.fh.close()
+
+# ---------- Depo ----------
+class EmbeddingStore:
+    def __init__(self, model_name: str, root: str = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.model_name = model_name
+        self.dir = os.path.join(root, _slug(model_name))
+        os.makedirs(self.dir, exist_ok=True)
+        self.vec_path = os.path.join(self.dir, "vectors.f32")
+        self.idx_path = os.path.join(self.dir, "index.json")
+        self.log_path = os.path.join(self.dir, "index.log")
+        self.lock_path = os.path.join(self.dir, ".lock")
+        self.max_bytes = max_bytes
+
+        self._mu = threading.Lock()
+        self._rows: dict[str, list] = {}
+        self._dim: int | None = None
+        self._n = 0
+        self._mm: np.memmap | None = None
+        self._idx_stamp = None
+        self._log_pos = 0
+        self._touched: dict[str, float] = {}
+        self.hits = self.misses = 0
+
+    # --- index / memmap ---
+    def _stamp(self):
+        try:
+            st = os.stat(self.idx_path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            return None
+
+    def _reload(self, force=False):
+        stamp = self._stamp()
+        n_once = self._n
+        if force or stamp != self._idx_stamp:
+            self._idx_stamp, self._log_pos, self._mm = stamp, 0, None
+            if stamp is None:
+                self._rows, self._dim, self._n = {}, None, 0
+            else:
+                with open(self.idx_path, encoding="utf-8") as f:
+                    idx = json.load(f)
+                self._rows, self._dim, self._n = idx.get("rows", {}), idx.get("dim"), int(idx.get("n", 0))
+        self._read_log()
+        if self._n and self._dim and (self._mm is None or self._n != n_once):
+            self._mm = np.memmap(self.vec_path, dtype=np.float32, mode="r", shape=(self._n, self._dim))
+
+    def _read_log(self):
+        """index.log'un son okunan konumdan sonraki tam satırları (yarım kalan son satır atlanır)."""
+        try:
+            with open(self.log_path, "rb") as f:
+                f.seek(self._log_pos)
+                veri = f.read()
+        except FileNotFoundError:
+            return
+        son = veri.rfind(b"\n") + 1
+        for satir in veri[:son].splitlines():
+            try:
+                k, row, ts, dim = json.loads(satir)
+            except ValueError:
+                continue
+            self._rows[k] = [row, ts]
+            self._n = max(self._n, row + 1)
+            self._dim = self._dim or dim
+        self._log_pos += son
+
+    def _append_log(self, entries: list):
+        with open(self.log_path, "ab") as f:
+            if self._log_pos < f.tell():  # bozuk yarım satırın devamına yazma
+                f.write(b"\n")
+            for k, row, ts in entries:
+                f.write(json.dumps([k, row, ts, self._dim]).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            self._log_pos = f.tell()
+
+    def _merge_touched(self):
+        # bu oturumda okunan anahtarların son kullanım zamanı satırlara işlenir
+        for k, ts in self._touched.items():
+            if k in self._rows:
+                self._rows[k][1] = max(self._rows[k][1], ts)
+        self._touched.clear()
+
+    def _write_index(self):
+        """index.json'u yeniden yazar (sıkıştırma) ve index.log'u boşaltır."""
+        self._merge_touched()
+        tmp = self.idx_path + f".tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dim": self._dim, "n": self._n, "rows": self._rows}, f)
+        os.replace(tmp, self.idx_path)
+        if os.path.exists(self.log_path):
+            os.truncate(self.log_path, 0)
+        self._reload(force=True)
+
+    def _evict(self):
+        if not self._dim or self._n * self._dim * 4 <= self.max_bytes:
+            return
+        keep_n = int(self.max_bytes * EVICT_TO) // (self._dim * 4)
+        # en son kullanılanlar kalır (henüz yazılmamış okuma zamanları dahil)
+        self._merge_touched()
+        ordered = sorted(self._rows.items(), key=lambda kv: (kv[1][1], kv[1][0]), reverse=True)[:keep_n]
+        src = self._mm
+        tmp = self.vec_path + f".tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            for k, (row, _) in ordered:
+                f.write(np.asarray(src[row], dtype=np.float32).tobytes())
+        new_rows = {k: [i, ts] for i, (k, (_, ts)) in enumerate(ordered)}
+        self._mm = None
+        os.replace(tmp, self.vec_path)
+        print(f"🧹 Embedding deposu tahliye: {self._n} → {len(new_rows)} vektör ({self.model_name})")
+        self._rows, self._n = new_rows, len(new_rows)
+        self._write_index()  # satır numaraları değişti: log geçersiz, hemen sıkıştır
+
+    # --- public ---
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found = {}
+        with self._mu, _FileLock(self.lock_path, shared=True):
+            self._reload()
+            now_ts = time.time()
+            for k in keys:
+                r = self._rows.get(k)
+                if r is not None and self._mm is not None:
+                    found[k] = np.array(self._mm[r[0]], dtype=np.float32)
+                    self._touched[k] = now_ts
+        return found
+
+    def put_many(self, items: dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._mu, _FileLock(self.lock_path, shared=False):
+            self._reload()
+            now_ts = time.time()
+            new = [(k, v) for k, v in items.items() if k not in self._rows]
+            if new:
+                if self._dim is None:
+                    self._dim = int(np.asarray(new[0][1]).shape[-1])
+                # yarım kalmış bir yazımdan artan baytları at (index'e girmemiş satırlar)
+                if os.path.exists(self.vec_path):
+                    os.truncate(self.vec_path, self._n * self._dim * 4)
+                entries = []
+                with open(self.vec_path, "ab") as f:
+                    for k, v in new:
+                        f.write(np.asarray(v, dtype=np.float32).reshape(self._dim).tobytes())
+                        self._rows[k] = [self._n, now_ts]
+                        entries.append((k, self._n, now_ts))
+                        self._n += 1
+                    f.flush()
+                    os.fsync(f.fileno())
+                # vektörler diske indikten sonra index'e yalnızca ekleme: maliyet parça boyutuyla büyür
+                self._append_log(entries)
+                self._mm = np.memmap(self.vec_path, dtype=np.float32, mode="r", shape=(self._n, self._dim))
+                self._evict()
+
+    def flush(self):
+        """index.log'u ve son kullanım zamanlarını (tahliye sırası için) index.json'a sıkıştırır."""
+        if not self._touched and not (os.path.exists(self.log_path) and os.path.getsize(self.log_path)):
+            return
+        with self._mu, _FileLock(self.lock_path, shared=False):
+            self._reload()
+            self._write_index()
+
+    def encode(self, encoder, sentences: list[str], batch_size: int = 64) -> np.ndarray:
+        """Depoda olanları okur, yalnızca eksik metinleri encoder ile kodlar."""
+        norm = [normalize_text(s) for s in sentences]
+        keys = [hashlib.sha1(t.encode("utf-8")).hexdigest() for t in norm]
+        found = self.get_many(list(dict.fromkeys(keys)))
+
+        missing = {}
+        for k, t in zip(keys, norm):
+            if k not in found and k not in missing:
+                missing[k] = t
+        self.hits += len(found)  # tekil anahtar başına; aynı parçadaki tekrarlar isabet sayılmaz
+        self.misses += len(missing)
+
+        if missing:
+            if not hasattr(encoder, "encode"):  # tembel sağlayıcı (ör. config.get_model)
+                encoder = encoder()
+            eksik = list(missing)
+            if hasattr(encoder, "encode_stream"):  # çok süreçli havuz: parça geldikçe depoya yaz
+                i = 0
+                for vecs in encoder.encode_stream(list(missing.values()), batch_size=batch_size):
+                    new = {k: np.asarray(v, dtype=np.float32) for k, v in zip(eksik[i:i + len(vecs)], vecs)}
+                    i += len(vecs)
+                    self.put_many(new)
+                    found.update(new)
+            else:
+                vecs = encoder.encode(list(missing.values()), batch_size=batch_size,
+                                      convert_to_numpy=True, show_progress_bar=False)
+                new = {k: np.asarray(v, dtype=np.float32) for k, v in zip(eksik, vecs)}
+                self.put_many(new)
+                found.update(new)
+
+        if not keys:
+            return np.zeros((0, self._dim or 0), dtype=np.float32)
+        return np.stack([found[k] for k in keys])
+
+_stores: dict[str, EmbeddingStore] = {}
+_stores_mu = threading.Lock()
+
+def get_store(model_name: str = _DEFAULT_MODEL_NAME) -> EmbeddingStore:
+    with _stores_mu:
+        if model_name not in _stores:
+            _stores[model_name] = EmbeddingStore(model_name)
+        return _stores[model_name]
+
+@atexit.register
+def _flush_all():
+    for st in list(_stores.values()):
+        try:
+            st.flush()
+        except Exception:
+            pass
+
+def cached_encode(model, sentences, model_name: str | None = None, convert_to_tensor: bool = False,
+                  normalize_embeddings: bool = False, batch_size: int = 64):
+    """model.encode ile aynı dönüş şekli: tek metin → vektör, liste → matris.
+
+    model bir SentenceTransformer ya da onu döndüren sağlayıcı olabilir;
+    sağlayıcı yalnızca depoda olmayan bir metin kodlanacaksa çağrılır.
+    """
+    single = isinstance(sentences, str)
+    texts = [sentences] if single else list(sentences)
+
+    if DISABLED:
+        model = model if hasattr(model, "encode") else model()
+        vecs = model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    else:
+        vecs = get_store(model_name or _DEFAULT_MODEL_NAME).encode(model, texts, batch_size=batch_size)
+    vecs = np.asarray(vecs, dtype=np.float32)
+
+    if normalize_embeddings and len(vecs):
+        vecs = vecs / np.clip(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12, None)
+    out = vecs[0] if single else vecs
+    if convert_to_tensor:
+        import torch
+        return torch.from_numpy(np.ascontiguousarray(out))
+    return out
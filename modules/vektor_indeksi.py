@@ -0,0 +1,331 @@
+# modules/vektor_indeksi.py — içerik parçaları için tak-çıkar vektör indeksi (CPU)
+#
+#   ExactIndex : kaba kuvvet iç çarpım (referans; sort_query_similarity ile aynı Top-K)
+#   IVFIndex   : küresel k-means kümeleri + nprobe küme taraması (saf numpy)
+#   HNSWIndex  : hnswlib grafı (opsiyonel bağımlılık: pip install hnswlib)
+#
+# Hepsi normalize edilmiş vektörlerle çalışır (iç çarpım = kosinüs) ve aynı
+# arayüzü sunar: add(vecs, ids) / search(queries, k) -> (skorlar, id'ler) /
+# save(path) / vektor_indeksi_yukle(path). add() artımlıdır.
+#
+# Geri çağırma ↔ gecikme ölçümü:
+#   python -m modules.vektor_indeksi --bench
+#   python -m modules.vektor_indeksi --bench --sentetik 200000 --k 10
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+TURLER = ("exact", "ivf", "hnsw")
+IVF_YENIDEN_EGIT = 4  # IVF: vektör sayısı eğitimdekinin bu katına ulaşınca kümeler yeniden eğitilir
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    if x.ndim == 1:
+        x = x[None, :]
+    return x / np.clip(np.linalg.norm(x, axis=1, keepdims=True), 1e-12, None)
+
+def _top_k_satir(skor: np.ndarray, k: int):
+    """skor: (m, n) → her satır için en büyük k (azalan) skor ve sütun indeksi."""
+    n = skor.shape[1]
+    kk = min(k, n)
+    if kk == 0:
+        return np.empty((skor.shape[0], 0), np.float32), np.empty((skor.shape[0], 0), np.int64)
+    sec = np.argpartition(-skor, kk - 1, axis=1)[:, :kk]
+    s = np.take_along_axis(skor, sec, axis=1)
+    sira = np.argsort(-s, axis=1, kind="stable")
+    return np.take_along_axis(s, sira, axis=1), np.take_along_axis(sec, sira, axis=1)
+
+
+class ExactIndex:
+    tur = "exact"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._vecs = np.empty((0, dim), np.float32)
+        self._ids = np.empty(0, np.int64)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _yeni_idler(self, n, ids):
+        if ids is not None:
+            return np.asarray(ids, dtype=np.int64)
+        bas = int(self._ids.max()) + 1 if len(self._ids) else 0
+        return np.arange(bas, bas + n, dtype=np.int64)
+
+    def add(self, vecs, ids=None) -> np.ndarray:
+        v = _normalize(vecs)
+        ids = self._yeni_idler(len(v), ids)
+        self._vecs = np.vstack([self._vecs, v])
+        self._ids = np.concatenate([self._ids, ids])
+        return ids
+
+    def search(self, queries, k: int = 10, blok: int = 65536):
+        q = _normalize(queries)
+        best_s = np.empty((len(q), 0), np.float32)
+        best_i = np.empty((len(q), 0), np.int64)
+        for bas in range(0, len(self._vecs), blok):
+            parca_ids = self._ids[bas:bas + blok]
+            aday_s = np.hstack([best_s, q @ self._vecs[bas:bas + blok].T])
+            aday_i = np.hstack([best_i, np.broadcast_to(parca_ids, (len(q), len(parca_ids)))])
+            best_s, sec = _top_k_satir(aday_s, k)
+            best_i = np.take_along_axis(aday_i, sec, axis=1)
+        return best_s, best_i
+
+    def _meta(self):
+        return {"tur": self.tur, "dim": self.dim}
+
+    def save(self, path: str):
+        np.savez(path, meta=json.dumps(self._meta()), vecs=self._vecs, ids=self._ids)
+
+    @classmethod
+    def _from_npz(cls, meta, z):
+        ix = cls(meta["dim"])
+        ix._vecs, ix._ids = z["vecs"], z["ids"]
+        return ix
+
+
+class IVFIndex(ExactIndex):
+    tur = "ivf"
+
+    def __init__(self, dim: int, nlist: int | None = None, nprobe: int = 8, kmeans_iter: int = 12, seed: int = 0):
+        super().__init__(dim)
+        self.nlist, self.nprobe, self.kmeans_iter, self.seed = nlist, nprobe, kmeans_iter, seed
+        self.nlist_istenen = nlist   # None: nlist vektör sayısından (4·√n) hesaplanır
+        self.egitim_n = 0            # son eğitimdeki vektör sayısı
+        self.centroids: np.ndarray | None = None
+        self._assign = np.empty(0, np.int64)
+        self._listeler: list[np.ndarray] | None = None
+
+    def train(self, vecs):
+        v = _normalize(vecs)
+        rng = np.random.default_rng(self.seed)
+        nlist = self.nlist_istenen or max(1, int(4 * np.sqrt(len(v))))
+        nlist = max(1, min(nlist, len(v)))
+        ornek = v[rng.choice(len(v), size=min(len(v), max(nlist * 64, 10000)), replace=False)]
+        c = ornek[rng.choice(len(ornek), size=nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iter):
+            a = np.argmax(ornek @ c.T, axis=1)
+            for j in range(nlist):
+                uyeler = ornek[a == j]
+                if len(uyeler):
+                    c[j] = uyeler.sum(axis=0)
+                else:  # boş kümeyi rastgele bir noktaya taşı
+                    c[j] = ornek[rng.integers(len(ornek))]
+            c = _normalize(c)
+        self.centroids = c
+        self.nlist = nlist
+        self.egitim_n = len(v)
+        if len(self._vecs):
+            self._assign = self._ata(self._vecs)
+            self._listeler = None
+
+    def _ata(self, v):
+        return np.argmax(v @ self.centroids.T, axis=1).astype(np.int64)
+
+    def add(self, vecs, ids=None) -> np.ndarray:
+        v = _normalize(vecs)
+        if self.centroids is None:
+            self.train(np.vstack([self._vecs, v]))
+        ids = super().add(v, ids)
+        if len(self._vecs) >= IVF_YENIDEN_EGIT * max(self.egitim_n, 1):
+            # küçük artımlarla büyüyen indeks ilk partinin birkaç kümesinde kalmasın
+            self.train(self._vecs)
+        else:
+            self._assign = np.concatenate([self._assign, self._ata(v)])
+        self._listeler = None
+        return ids
+
+    def _liste_indeksleri(self):
+        if self._listeler is None:
+            sira = np.argsort(self._assign, kind="stable")
+            sinirlar = np.searchsorted(self._assign[sira], np.arange(self.nlist + 1))
+            self._listeler = [sira[sinirlar[j]:sinirlar[j + 1]] for j in range(self.nlist)]
+        return self._listeler
+
+    def search(self, queries, k: int = 10, nprobe: int | None = None):
+        q = _normalize(queries)
+        if self.centroids is None or not len(self._vecs):
+            return np.empty((len(q), 0), np.float32), np.empty((len(q), 0), np.int64)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        listeler = self._liste_indeksleri()
+        _, problar = _top_k_satir(q @ self.centroids.T, nprobe)
+        out_s = np.full((len(q), k), -np.inf, np.float32)
+        out_i = np.full((len(q), k), -1, np.int64)
+        for qi in range(len(q)):
+            aday = np.concatenate([listeler[j] for j in problar[qi]])
+            if not len(aday):
+                continue
+            s, i = _top_k_satir((self._vecs[aday] @ q[qi])[None, :], k)
+            out_s[qi, :s.shape[1]] = s[0]
+            out_i[qi, :s.shape[1]] = self._ids[aday[i[0]]]
+        return out_s, out_i
+
+    def _meta(self):
+        return {"tur": self.tur, "dim": self.dim, "nlist": self.nlist, "nprobe": self.nprobe,
+                "kmeans_iter": self.kmeans_iter, "seed": self.seed,
+                "nlist_istenen": self.nlist_istenen, "egitim_n": self.egitim_n}
+
+    def save(self, path: str):
+        np.savez(path, meta=json.dumps(self._meta()), vecs=self._vecs, ids=self._ids,
+                 centroids=self.centroids if self.centroids is not None else np.empty((0, self.dim), np.float32),
+                 assign=self._assign)
+
+    @classmethod
+    def _from_npz(cls, meta, z):
+        ix = cls(meta["dim"], meta.get("nlist_istenen"), meta["nprobe"], meta["kmeans_iter"], meta["seed"])
+        ix._vecs, ix._ids, ix._assign = z["vecs"], z["ids"], z["assign"]
+        ix.centroids = z["centroids"] if len(z["centroids"]) else None
+        ix.nlist = meta["nlist"]
+        ix.egitim_n = meta.get("egitim_n", len(ix._vecs))  # eski dosyalar: şimdiki boyutta eğitilmiş say
+        return ix
+
+
+class HNSWIndex:
+    tur = "hnsw"
+
+    def __init__(self, dim: int, M: int = 32, ef_construction: int = 200, ef: int = 64):
+        try:
+            import hnswlib
+        except ImportError:
+            raise ImportError("HNSW indeksi için hnswlib gerekli: pip install hnswlib")
+        self.dim, self.M, self.ef_construction, self.ef = dim, M, ef_construction, ef
+        self._ix = hnswlib.Index(space="ip", dim=dim)
+        self._ix.init_index(max_elements=1024, ef_construction=ef_construction, M=M, allow_replace_deleted=False)
+        self._ix.set_ef(ef)
+        self._sonraki_id = 0
+
+    def __len__(self):
+        return self._ix.get_current_count()
+
+    def add(self, vecs, ids=None) -> np.ndarray:
+        v = _normalize(vecs)
+        if ids is None:
+            ids = np.arange(self._sonraki_id, self._sonraki_id + len(v), dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        gerekli = len(self) + len(v)
+        if gerekli > self._ix.get_max_elements():
+            self._ix.resize_index(max(gerekli, 2 * self._ix.get_max_elements()))
+        self._ix.add_items(v, ids)
+        self._sonraki_id = max(self._sonraki_id, int(ids.max()) + 1 if len(ids) else 0)
+        return ids
+
+    def search(self, queries, k: int = 10, ef: int | None = None):
+        q = _normalize(queries)
+        kk = min(k, len(self))
+        if kk == 0:
+            return np.empty((len(q), 0), np.float32), np.empty((len(q), 0), np.int64)
+        self._ix.set_ef(max(ef or self.ef, kk))
+        labels, dist = self._ix.knn_query(q, k=kk)
+        return (1.0 - dist).astype(np.float32), labels.astype(np.int64)
+
+    def save(self, path: str):
+        self._ix.save_index(path + ".hnsw")
+        np.savez(path, meta=json.dumps({"tur": self.tur, "dim": self.dim, "M": self.M,
+                                        "ef_construction": self.ef_construction, "ef": self.ef,
+                                        "sonraki_id": self._sonraki_id}))
+
+    @classmethod
+    def _from_npz(cls, meta, z, path):
+        import hnswlib
+        ix = cls.__new__(cls)
+        ix.dim, ix.M, ix.ef_construction, ix.ef = meta["dim"], meta["M"], meta["ef_construction"], meta["ef"]
+        ix._ix = hnswlib.Index(space="ip", dim=ix.dim)
+        ix._ix.load_index(path + ".hnsw")
+        ix._ix.set_ef(meta["ef"])
+        ix._sonraki_id = meta["sonraki_id"]
+        return ix
+
+
+def vektor_indeksi_olustur(tur: str, dim: int, **kw):
+    if tur == "exact":
+        return ExactIndex(dim)
+    if tur == "ivf":
+        return IVFIndex(dim, **kw)
+    if tur == "hnsw":
+        return HNSWIndex(dim, **kw)
+    raise ValueError(f"Bilinmeyen indeks türü: {tur!r} (seçenekler: {TURLER})")
+
+def vektor_indeksi_yukle(path: str):
+    npz = path if path.endswith(".npz") else path + ".npz"
+    with np.load(npz, allow_pickle=False) as z:
+        meta = json.loads(str(z["meta"]))
+        if meta["tur"] == "hnsw":
+            return HNSWIndex._from_npz(meta, z, os.path.splitext(npz)[0])
+        cls = {"exact": ExactIndex, "ivf": IVFIndex}[meta["tur"]]
+        return cls._from_npz(meta, z)
+
+
+# ------------------- Geri çağırma ↔ gecikme ölçümü -------------------
+def _bench_verisi(args):
+    if args.sentetik:
+        rng = np.random.default_rng(0)
+        # kümeli sentetik veri: gerçek cümle embedding'lerine daha yakın dağılım
+        merkez = rng.normal(size=(max(16, args.sentetik // 500), args.dim)).astype(np.float32)
+        P = merkez[rng.integers(len(merkez), size=args.sentetik)] + 0.6 * rng.normal(size=(args.sentetik, args.dim)).astype(np.float32)
+        Q = merkez[rng.integers(len(merkez), size=args.sorgu)] + 0.6 * rng.normal(size=(args.sorgu, args.dim)).astype(np.float32)
+        return _normalize(P), _normalize(Q), f"sentetik {args.sentetik}×{args.dim}"
+
+    from config import get_model, output_dir
+    from modules.tablo_io import tablo_oku, tam_tablo_yolu
+    from modules.vektor_deposu import cached_encode
+    df = tablo_oku(tam_tablo_yolu(args.csv or f"{output_dir}/html_icerik_sorgu_uyumu.csv"), dtype=str)
+    icerik = df["Web İçeriği"].dropna().astype(str).drop_duplicates().tolist()
+    sorgular = df["Sorgu"].dropna().astype(str).drop_duplicates().tolist()
+    P = cached_encode(get_model, icerik, normalize_embeddings=True)
+    Q = cached_encode(get_model, sorgular, normalize_embeddings=True)
+    return P, Q, f"{len(icerik)} parça × {len(sorgular)} sorgu"
+
+def _olc(ix, Q, k, ref_i, **search_kw):
+    t0 = time.perf_counter()
+    _, ids = ix.search(Q, k, **search_kw)
+    ms = (time.perf_counter() - t0) * 1000 / max(len(Q), 1)
+    recall = np.mean([len(set(ids[j]) & set(ref_i[j])) / max(len(ref_i[j]), 1) for j in range(len(Q))])
+    return recall, ms
+
+def main():
+    ap = argparse.ArgumentParser(description="Vektör indeksi geri çağırma/gecikme ölçümü (exact Top-K referans)")
+    ap.add_argument("--bench", action="store_true", help="Ölçümü çalıştır")
+    ap.add_argument("--csv", default=None, help="Tam içerik × sorgu tablosu (vars: output_dir/html_icerik_sorgu_uyumu.csv)")
+    ap.add_argument("--sentetik", type=int, default=0, help="Gerçek veri yerine N sentetik vektör")
+    ap.add_argument("--sorgu", type=int, default=1000, help="Sentetik sorgu sayısı")
+    ap.add_argument("--dim", type=int, default=768)
+    ap.add_argument("--k", type=int, default=10)
+    args = ap.parse_args()
+    if not args.bench:
+        ap.print_help()
+        return
+
+    P, Q, etiket = _bench_verisi(args)
+    print(f"📏 Veri: {etiket} | K={args.k}")
+
+    exact = ExactIndex(P.shape[1]); exact.add(P)
+    t0 = time.perf_counter(); _, ref_i = exact.search(Q, args.k)
+    print(f"{'exact':<22} recall=1.000  {((time.perf_counter()-t0)*1000/len(Q)):8.3f} ms/sorgu")
+
+    t0 = time.perf_counter()
+    ivf = IVFIndex(P.shape[1]); ivf.add(P)
+    print(f"   (ivf kurulum {time.perf_counter()-t0:.2f} s, nlist={ivf.nlist})")
+    for nprobe in (1, 4, 8, 16, 32):
+        if nprobe > ivf.nlist:
+            break
+        r, ms = _olc(ivf, Q, args.k, ref_i, nprobe=nprobe)
+        print(f"{'ivf nprobe=' + str(nprobe):<22} recall={r:.3f}  {ms:8.3f} ms/sorgu")
+
+    try:
+        t0 = time.perf_counter()
+        hn = HNSWIndex(P.shape[1]); hn.add(P)
+        print(f"   (hnsw kurulum {time.perf_counter()-t0:.2f} s)")
+        for ef in (16, 32, 64, 128, 256):
+            r, ms = _olc(hn, Q, args.k, ref_i, ef=ef)
+            print(f"{'hnsw ef=' + str(ef):<22} recall={r:.3f}  {ms:8.3f} ms/sorgu")
+    except ImportError as e:
+        print(f"   (hnsw atlandı: {e})")
+
+if __name__ == "__main__":
+    main()
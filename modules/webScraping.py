@@ -1,5 +1,8 @@
+import json
 import logging
+import os
 import time
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
 
 from selenium import webdriver
@@ -8,24 +11,133 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 
+from modules.dom_cikarim import EXTRACT_JS, html_to_content
+from modules.html_onbellek import onbellekli
+from modules.http_getir import getir as http_getir
+from modules.sayfa_bekleme import sayfayi_hazirla
+from modules.tarayici_havuzu import get_browser_pool
+
+try:
+    from config import FETCH_HTTP_FIRST, SCRAPE_ENGINE, SCRAPE_EXTRACT
+except Exception:
+    FETCH_HTTP_FIRST = os.getenv("FETCH_HTTP_FIRST", "1") != "0"
+    SCRAPE_EXTRACT = os.getenv("SCRAPE_EXTRACT", "snapshot")
+    SCRAPE_ENGINE = os.getenv("SCRAPE_ENGINE", "playwright")
+
 # LOGGING AYARI
 logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s",
     level=logging.INFO
 )
 
-def get_structured_web_content_selenium(url: str) -> dict:
-    logging.info(f"URL açılıyor: {url}")
+def get_structured_web_content_selenium(url: str, mode: str | None = None, snapshot_out: dict | None = None,
+                                        engine: str | None = None) -> dict:
+    """Sayfayı açar ve yapılandırılmış içeriği çıkarır.
+
+    mode: "snapshot" (page_source + lxml, tek istek) | "script" (tek execute_script) |
+          "webdriver" (eski yol: eleman başına find_elements/.text). Varsayılan config.SCRAPE_EXTRACT.
+    engine: "playwright" (paylaşılan tarayıcı havuzu) | "selenium". "webdriver" modu her zaman Selenium'dur.
+    snapshot_out verilirse sayfanın HTML'i ve son adresi içine yazılır (fixture üretimi için).
+    Ham ve render edilmiş HTML html_onbellek üzerinden gelir (TTL, koşullu doğrulama, çevrimdışı mod).
+    """
+    mode = (mode or SCRAPE_EXTRACT).lower()
+    engine = "selenium" if mode == "webdriver" else (engine or SCRAPE_ENGINE).lower()
+    if mode not in ("snapshot", "script", "webdriver"):
+        raise ValueError(f"Bilinmeyen çıkarım modu: {mode!r} (snapshot | script | webdriver)")
+    if engine not in ("playwright", "selenium"):
+        raise ValueError(f"Bilinmeyen tarayıcı: {engine!r} (playwright | selenium)")
+    logging.info(f"URL açılıyor: {url} (çıkarım: {mode}, tarayıcı: {engine})")
+
+    if mode == "snapshot" and FETCH_HTTP_FIRST:
+        # Sunucu tarafında üretilen sayfalar için tarayıcıya gerek yok
+        s = http_getir(url)
+        if s.neden == "ok":
+            logging.info(f"Statik HTML yeterli, tarayıcı atlandı ({s.sure_ms} ms, {s.kaynak}).")
+            if snapshot_out is not None:
+                snapshot_out["html"], snapshot_out["base_url"] = s.html, s.final_url
+            result = html_to_content(s.html, url, base_url=s.final_url)
+            result["getirme_yolu"] = "http"
+            logging.info("Tarama tamamlandı.")
+            return result
+        logging.info(f"Statik HTML yetersiz ({s.neden}), tarayıcıyla render ediliyor.")
 
+    def _render() -> tuple[str, dict]:
+        if engine == "playwright":
+            r = get_browser_pool().run(lambda page: _render_playwright(page, url, mode))
+        else:
+            r = _render_selenium(url, mode)
+        html = r.pop("html")
+        if mode == "snapshot":
+            return html, r
+        if snapshot_out is not None:
+            snapshot_out["html"], snapshot_out["base_url"] = html, r.get("final_url")
+        return r.pop("result_json"), r
+
+    # snapshot: render edilmiş HTML saklanır, çıkarım her seferinde yeniden yapılır;
+    # script/webdriver: canlı DOM'dan çıkan sonuç (JSON) saklanır. Fixture üretimi
+    # (snapshot_out + canlı DOM modu) HTML'e ihtiyaç duyduğu için önbelleği atlar.
+    if mode != "snapshot" and snapshot_out is not None:
+        body, meta = _render()
+        meta["kaynak"] = "network"
+    else:
+        body, meta = onbellekli(url, f"render:{engine}" if mode == "snapshot" else f"icerik:{mode}:{engine}", _render)
+    if meta["kaynak"] != "network":
+        logging.info(f"Sayfa önbellekten geldi ({meta['kaynak']}).")
+    if mode == "snapshot":
+        if snapshot_out is not None:
+            snapshot_out["html"], snapshot_out["base_url"] = body, meta.get("final_url")
+        t0 = time.time()
+        result = html_to_content(body, url, title=meta.get("title"), base_url=meta.get("final_url"))
+        logging.info(f"İçerik çıkarımı {time.time() - t0:.2f} sn sürdü.")
+    else:
+        result = json.loads(body)
+    result["bekleme_ms"] = meta.get("bekleme_ms")
+    result["getirme_yolu"] = "render"
+    logging.info("Tarama tamamlandı.")
+    return result
+
+def _render_playwright(page, url: str, mode: str) -> dict:
+    resp = page.goto(url, wait_until="domcontentloaded")
+    bekleme = sayfayi_hazirla(page, kaydirma=False)
+    logging.info(f"Sayfa hazır: {bekleme['toplam_ms']} ms beklendi.")
+    h = resp.headers if resp else {}
+    out = {"html": page.content(), "final_url": page.url, "title": page.title(), "bekleme_ms": bekleme["toplam_ms"],
+           "etag": h.get("etag"), "last_modified": h.get("last-modified")}
+    if mode == "script":
+        out["result_json"] = page.evaluate(
+            "(url) => (function () {" + EXTRACT_JS + "}).apply(null, [url])", url)
+    return out
+
+@lru_cache(maxsize=1)
+def _chromedriver_path() -> str:
+    # ChromeDriverManager().install() her çağrıda sürüm kontrolü yapar; süreç başına bir kez yeter
+    return ChromeDriverManager().install()
+
+def _render_selenium(url: str, mode: str) -> dict:
     options = Options()
     options.add_argument("--headless")  # Arka planda çalıştır
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    driver.get(url)
-    time.sleep(3)
+    driver = webdriver.Chrome(service=Service(_chromedriver_path()), options=options)
+    try:
+        driver.get(url)
+        bekleme = sayfayi_hazirla(driver, kaydirma=False)
+        logging.info(f"Sayfa hazır: {bekleme['toplam_ms']} ms beklendi.")
+        out = {"html": driver.page_source, "final_url": driver.current_url, "title": driver.title,
+               "bekleme_ms": bekleme["toplam_ms"]}
+        t0 = time.time()
+        if mode == "script":
+            out["result_json"] = driver.execute_script(EXTRACT_JS, url)
+        elif mode == "webdriver":
+            out["result_json"] = json.dumps(_extract_webdriver(driver, url), ensure_ascii=False)
+        if mode != "snapshot":
+            logging.info(f"İçerik çıkarımı {time.time() - t0:.2f} sn sürdü.")
+    finally:
+        driver.quit()
+    return out
 
+def _extract_webdriver(driver, url: str) -> dict:
     domain = urlparse(url).netloc
 
     def get_elements_text(by_tag):
@@ -110,9 +222,6 @@ def get_structured_web_content_selenium(url: str) -> dict:
                 result["links"]["external"].append(link_info)
                 external_count += 1
     logging.info(f"{internal_count} iç link, {external_count} dış link bulundu.")
-
-    driver.quit()
-    logging.info("Tarama tamamlandı.")
     return result
 
 # Örnek kullanım:
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# modules.* ve config depo kökünden içe aktarılır (python -m pytest depo kökünden çalıştırılır)
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if KOK not in sys.path:
+    sys.path.insert(0, KOK)
@@ -0,0 +1,70 @@
+# html_to_content ↔ eski çıkarım (webdriver .text / EXTRACT_JS) paritesi, kayıtlı fixture'lar üzerinde.
+# Beklenen JSON'lar: python -m modules.dom_cikarim --kaydet <url> (canlı sayfa, eski webdriver yolu)
+import glob
+import json
+import logging
+import os
+import re
+
+import pytest
+
+from modules.dom_cikarim import EXTRACT_JS, fixture_kontrol, html_to_content, icerik_farki
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fixtures", "dom")
+FIXTURES = sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+
+def _oku(html_yolu):
+    with open(os.path.splitext(html_yolu)[0] + ".json", encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(html_yolu, encoding="utf-8") as f:
+        return f.read(), meta
+
+@pytest.fixture(autouse=True)
+def _sessiz():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+def test_fixtureler_var():
+    assert FIXTURES, f"{FIXTURE_DIR} altında fixture yok"
+
+@pytest.mark.parametrize("html_yolu", FIXTURES, ids=os.path.basename)
+def test_lxml_eski_ciktiyla_ayni(html_yolu):
+    assert fixture_kontrol(html_yolu) == {}
+
+@pytest.mark.parametrize("html_yolu", FIXTURES, ids=os.path.basename)
+def test_title_verilmeden_de_ayni(html_yolu):
+    # canlı akışta title page_source'tan okunur (HTTP-önce yolu title vermez)
+    html, meta = _oku(html_yolu)
+    gelen = html_to_content(html, meta["url"], base_url=meta.get("base_url"))
+    assert gelen["title"] == meta["beklenen"]["title"]
+
+def _tarayicida(html, url):
+    sync_api = pytest.importorskip("playwright.sync_api")
+    try:
+        with sync_api.sync_playwright() as p:
+            tarayici = p.chromium.launch()
+            try:
+                sayfa = tarayici.new_page()
+                sayfa.route("**/*", lambda r: r.fulfill(body=html, content_type="text/html; charset=utf-8")
+                            if r.request.url == url else r.abort())
+                sayfa.goto(url)
+                return json.loads(sayfa.evaluate("(url) => (function () {" + EXTRACT_JS + "}).apply(null, [url])", url))
+            finally:
+                tarayici.close()
+    except sync_api.Error as e:
+        pytest.skip(f"Chromium başlatılamadı: {e}")
+
+def _bosluk(d):
+    # innerText tablo hücrelerini sekmeyle ayırır; webdriver .text boşlukla
+    if isinstance(d, dict):
+        return {k: _bosluk(v) for k, v in d.items()}
+    if isinstance(d, list):
+        return [_bosluk(v) for v in d]
+    return re.sub(r"[ \t]+", " ", d) if isinstance(d, str) else d
+
+@pytest.mark.parametrize("html_yolu", FIXTURES, ids=os.path.basename)
+def test_extract_js_eski_ciktiyla_ayni(html_yolu):
+    html, meta = _oku(html_yolu)
+    gelen = _tarayicida(html, meta["url"])
+    assert icerik_farki(_bosluk(meta["beklenen"]), _bosluk(gelen)) == {}
@@ -0,0 +1,109 @@
+# intent_classifier.niyetleri_belirle — yerel sahte Ollama (/api/chat) sunucusuna client= ile
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ollama = pytest.importorskip("ollama")
+
+from modules import llm_onbellek
+from modules.intent_classifier import niyetleri_belirle
+
+class _SahteOllama(ThreadingHTTPServer):
+    """Her istek `gecikme` sn sürer; "hata" ile başlayan sorgu ilk denemede 503, "asili" hiç yanıtlamaz."""
+    daemon_threads = True
+
+    def __init__(self, gecikme=0.2):
+        super().__init__(("127.0.0.1", 0), _Isleyici)
+        self.gecikme = gecikme
+        self.mu = threading.Lock()
+        self.ucusta = self.tepe = 0
+        self.sayac: dict[str, int] = {}
+
+    @property
+    def host(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+class _Isleyici(BaseHTTPRequestHandler):
+    def do_POST(self):
+        sv = self.server
+        govde = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        sorgu = govde["messages"][0]["content"].split('"')[1]  # prompt: ... sorgusunu yazdı: "<sorgu>"
+        with sv.mu:
+            sv.ucusta += 1
+            sv.tepe = max(sv.tepe, sv.ucusta)
+            sv.sayac[sorgu] = n = sv.sayac.get(sorgu, 0) + 1
+        try:
+            time.sleep(sv.gecikme)
+            if sorgu.startswith("hata") and n == 1:
+                return self._yaz(503, {"error": "meşgul"})
+            if sorgu == "asili":
+                time.sleep(3)
+            self._yaz(200, {"model": govde["model"], "created_at": "2024-01-01T00:00:00Z",
+                            "message": {"role": "assistant", "content": f"Niyet {sorgu}"}, "done": True})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with sv.mu:
+                sv.ucusta -= 1
+
+    def _yaz(self, kod, veri):
+        govde = json.dumps(veri).encode("utf-8")
+        self.send_response(kod)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(govde)))
+        self.end_headers()
+        self.wfile.write(govde)
+
+    def log_message(self, *a):
+        pass
+
+@pytest.fixture
+def sunucu():
+    sv = _SahteOllama()
+    threading.Thread(target=sv.serve_forever, daemon=True).start()
+    yield sv
+    sv.shutdown()
+    sv.server_close()
+
+@pytest.fixture(autouse=True)
+def _gecici_llm_onbellegi(tmp_path, monkeypatch):
+    # yanıtlar depo önbelleğine yazılmasın, testler birbirinin yanıtını görmesin
+    monkeypatch.setattr(llm_onbellek, "_cache", llm_onbellek.LLMCache(str(tmp_path / "llm.sqlite"), ttl=0, bypass=False))
+
+def test_sira_korunur_ve_eszamanlilik_sinirda(sunucu):
+    sorgular = [f"sorgu {i}" for i in range(10)]
+    client = ollama.Client(host=sunucu.host, timeout=5)
+    t0 = time.time()
+    sonuc = niyetleri_belirle(sorgular, esz_zamanli=3, deneme=0, client=client, ilerleme=False)
+    sure = time.time() - t0
+    assert sonuc == [f"niyet {s}" for s in sorgular]
+    assert sunucu.tepe == 3
+    assert sure < 10 * sunucu.gecikme * 0.75  # sıralı olsaydı ≈ 2 sn
+
+def test_tekrarlanan_sorgu_bir_kez_sorulur(sunucu):
+    client = ollama.Client(host=sunucu.host, timeout=5)
+    sonuc = niyetleri_belirle(["a", "b", "a"], esz_zamanli=2, deneme=0, client=client, ilerleme=False)
+    assert sonuc == ["niyet a", "niyet b", "niyet a"]
+    assert sunucu.sayac == {"a": 1, "b": 1}
+
+def test_gecici_hata_yeniden_denenir(sunucu):
+    client = ollama.Client(host=sunucu.host, timeout=5)
+    sonuc = niyetleri_belirle(["hata 1", "x"], esz_zamanli=2, deneme=1, bekleme=0.05, client=client, ilerleme=False)
+    assert sonuc == ["niyet hata 1", "niyet x"]
+    assert sunucu.sayac["hata 1"] == 2
+
+def test_denemeler_biterse_none_digerleri_korunur(sunucu):
+    client = ollama.Client(host=sunucu.host, timeout=5)
+    sonuc = niyetleri_belirle(["hata 2", "y"], esz_zamanli=2, deneme=0, client=client, ilerleme=False)
+    assert sonuc == [None, "niyet y"]
+    assert sunucu.sayac["hata 2"] == 1
+
+def test_zaman_asimi_none_doner(sunucu):
+    client = ollama.Client(host=sunucu.host, timeout=1)
+    t0 = time.time()
+    sonuc = niyetleri_belirle(["asili", "z"], esz_zamanli=2, deneme=0, client=client, ilerleme=False)
+    assert sonuc == [None, "niyet z"]
+    assert time.time() - t0 < 2.5
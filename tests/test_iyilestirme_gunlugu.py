@@ -0,0 +1,114 @@
+# iyilestirme_gunlugu — yalnızca biten satır günlüğe girer, hata veren satır yeniden başlatmada tekrar denenir
+import json
+
+import pandas as pd
+import pytest
+
+from modules import iyilestirme_gunlugu as ig
+
+ISLER = [(1, "a", "p", "x", 0.5), (2, "hata", "p", "y", 0.5), (3, "c", "h1", "z", 0.4)]
+
+@pytest.fixture(autouse=True)
+def _gecici_gunluk(tmp_path, monkeypatch):
+    monkeypatch.setattr(ig, "GUNLUK_DIR", str(tmp_path / "iyilestirme"))
+
+def _calistir(cikti, cagrilar, hatali=("hata",), isler=ISLER):
+    def iyilestir(sorgu, metin, tag, eski, label):
+        cagrilar.append(sorgu)
+        if sorgu in hatali:
+            raise ValueError("LLM yanıtında JSON bulunamadı.")
+        return metin + "!", eski + 0.1
+
+    return ig.gunluklu_iyilestir("niyet", cikti, isler, lambda q, c, s: s, iyilestir,
+                                 lambda q, t, c, a: {"Sorgu": q, "Metin": c, "Yeni Metin": a},
+                                 "model", "v1", esz_zamanli=2)
+
+def test_hatali_satir_gunluge_girmez_ve_isaretlenir(tmp_path):
+    cikti = str(tmp_path / "cikti.csv")
+    satirlar = _calistir(cikti, [])
+    assert [s["Sorgu"] for s in satirlar] == ["a", "hata", "c"]
+    assert [s["Durum"] for s in satirlar] == ["ok", "hata", "ok"]
+    hatali = satirlar[1]
+    assert hatali["Yeni Skor"] is None and hatali["Yüzde Değişim"] is None
+    assert hatali["Yeni Metin"] == "y" and "JSON" in hatali["Hata"]
+
+    with open(ig.gunluk_yolu(cikti), encoding="utf-8") as f:
+        kayitlar = [json.loads(s) for s in f]
+    assert sorted(k["satir"]["Sorgu"] for k in kayitlar) == ["a", "c"]
+    assert all(k["satir"]["Durum"] == "ok" for k in kayitlar)
+
+def test_yeniden_baslatmada_yalnizca_hatali_satir_denenir(tmp_path):
+    cikti = str(tmp_path / "cikti.csv")
+    _calistir(cikti, [])
+    cagrilar = []
+    satirlar = _calistir(cikti, cagrilar, hatali=())
+    assert cagrilar == ["hata"]
+    assert [s["Durum"] for s in satirlar] == ["ok", "ok", "ok"]
+    assert satirlar[1]["Yeni Metin"] == "y!"
+
+def test_yarim_son_satir_atlanir(tmp_path):
+    cikti = str(tmp_path / "cikti.csv")
+    _calistir(cikti, [], hatali=())
+    with open(ig.gunluk_yolu(cikti), "a", encoding="utf-8") as f:
+        f.write('{"parmak_izi": "yarim", "sat')  # çökme anında yarım kalan kayıt
+    cagrilar = []
+    assert [s["Durum"] for s in _calistir(cikti, cagrilar, hatali=())] == ["ok"] * 3
+    assert cagrilar == []
+
+def test_csv_gunlukten_kurulur(tmp_path):
+    cikti = str(tmp_path / "cikti.csv")
+    _calistir(cikti, [])
+    assert ig.csv_yeniden_olustur(cikti) == 2
+    df = pd.read_csv(cikti)
+    assert sorted(df["Sorgu"]) == ["a", "c"]
+
+def test_bos_aday_satiri_bitmis_saymaz(monkeypatch):
+    niyet = pytest.importorskip("modules.niyet_iylestir")
+    monkeypatch.setattr(niyet, "_run_llm", lambda prompt, attempt=1: '{"Geliştirilmiş İçerik": ""}')
+    monkeypatch.setattr(niyet, "_similarity", lambda a, b: 0.5)
+    with pytest.raises(ValueError):
+        niyet._try_improve("niyet", "niyet", "metin", "p", 0.5, max_attempts=2)
+
+def test_csv_yalnizca_guncel_girdiden_kurulur(tmp_path):
+    cikti = str(tmp_path / "cikti.csv")
+    _calistir(cikti, [])
+    # top-K girdisi değişti: "a" satırı yerine "a2" geldi → eski kayıt budanır, CSV'ye karışmaz
+    _calistir(cikti, [], isler=[(1, "a2", "p", "x", 0.5)] + ISLER[1:])
+    with open(ig.gunluk_yolu(cikti), encoding="utf-8") as f:
+        assert sorted(json.loads(s)["satir"]["Sorgu"] for s in f) == ["a2", "c"]
+    assert ig.csv_yeniden_olustur(cikti) == 2
+    assert list(pd.read_csv(cikti)["Sorgu"]) == ["a2", "c"]
+
+def test_bozuk_yanit_onbellege_girmez_yeniden_baslatmada_tekrar_sorulur(tmp_path, monkeypatch):
+    # LLM önbelleği üzerinden gerçek akış: ilk çalıştırmada bozuk JSON, ikincisinde düzgün yanıt
+    ollama = pytest.importorskip("ollama")
+    from modules import llm_onbellek
+    from modules import sorgu_iyilestir as si
+
+    girdi = tmp_path / "icerik_sorgu_top10.csv"
+    pd.DataFrame({"Kullanıcı Sorgusu": ["reklam ver", "bozuk sorgu"], "HTML Kaynağı": ["h1", "p"],
+                  "Web İçeriği": ["Reklam", "Metin"], "Benzerlik Skoru": [0.5, 0.5]}).to_csv(girdi, index=False)
+    monkeypatch.setattr(si, "SORGU_IN_CSV", str(girdi))
+    monkeypatch.setattr(si, "SORGU_OUT_CSV", str(tmp_path / "icerik_sorgu_iyilestirme.csv"))
+    monkeypatch.setattr(si, "_similarity", lambda a, b: 0.5 + len(b) / 1000)
+    monkeypatch.setattr(llm_onbellek, "_cache", llm_onbellek.LLMCache(str(tmp_path / "llm.sqlite"), ttl=0, bypass=False))
+    bozuk, sorulan = [True], []
+
+    def chat(model, messages):
+        icerik = messages[0]["content"]
+        sorulan.append(icerik)
+        if '"bozuk sorgu"' in icerik and bozuk[0]:
+            return {"message": {"content": '{"Geliştirilmiş Metin": yarım}'}}  # {...} var, JSON değil
+        return {"message": {"content": '{"Geliştirilmiş Metin": "Daha uzun metin"}'}}
+
+    monkeypatch.setattr(ollama, "chat", chat)
+    si.run_sorgu_flow(max_attempts=1, parallel=1)
+    assert list(pd.read_csv(si.SORGU_OUT_CSV)["Durum"]) == ["ok", "hata"]
+
+    bozuk[0] = False
+    sorulan.clear()
+    si.run_sorgu_flow(max_attempts=1, parallel=1)
+    assert len(sorulan) == 1 and '"bozuk sorgu"' in sorulan[0]  # biten satır günlükten, hatalı olan LLM'den
+    df = pd.read_csv(si.SORGU_OUT_CSV)
+    assert list(df["Durum"]) == ["ok", "ok"]
+    assert list(df["Geliştirilmiş Metin"]) == ["Daha uzun metin"] * 2
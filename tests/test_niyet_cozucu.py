@@ -0,0 +1,94 @@
+# niyet_cozucu — kalıcı etiket indeksi (top-1) ve parti içi birleştirmenin önbelleğe yazılan niyetle tutarlılığı
+import zlib
+
+import numpy as np
+import pytest
+
+from modules import niyet_cozucu as nc
+
+def _v(*bilesen):
+    v = np.zeros(64, np.float32)
+    for i, a in bilesen:
+        v[i] = a
+    return v / np.linalg.norm(v)
+
+VEKTORLER = {
+    "x": _v((0, 1)),
+    "y": _v((1, 1)),
+    "z": _v((1, 0.97), (2, 0.24)),          # y'ye ≈ 0.97
+    "w": _v((5, 1)),
+    "reklam vermek": _v((3, 1)),
+    "reklam ver": _v((3, 0.95), (4, 0.31)),  # "reklam vermek"e ≈ 0.95
+}
+
+def _vektor(metin):
+    if metin in VEKTORLER:
+        return VEKTORLER[metin]
+    # tabloda olmayan metin (ör. LLM niyeti): ilk 8 boyuta dik, metne göre sabit rastgele vektör
+    v = np.random.default_rng(zlib.crc32(metin.encode("utf-8"))).normal(size=64).astype(np.float32)
+    v[:8] = 0
+    return v / np.linalg.norm(v)
+
+@pytest.fixture
+def kodlanan(monkeypatch):
+    cagrilar = []
+
+    def kodla(metinler):
+        metinler = list(metinler)
+        cagrilar.append(metinler)
+        return np.stack([_vektor(m) for m in metinler])
+
+    monkeypatch.setattr(nc, "kodla", kodla)
+    return cagrilar
+
+def test_etiket_indeksi_artimli_kurulur(tmp_path, kodlanan):
+    yol = str(tmp_path / "etiket_indeksi")
+    ix, anahtarlar = nc.etiket_indeksi(["x", "y"], yol)
+    assert kodlanan == [["x", "y"]]
+
+    ix, anahtarlar = nc.etiket_indeksi(["x", "y", "w"], yol)
+    assert kodlanan[-1] == ["w"]  # diskteki indeks yeniden kodlanmaz
+    skor, idler = ix.search(np.stack([VEKTORLER["z"], VEKTORLER["w"]]), k=1)
+    assert [anahtarlar[i] for i in idler[:, 0]] == ["y", "w"]
+    assert skor[0, 0] == pytest.approx(0.97, abs=0.01)
+
+    kodlanan.clear()
+    nc.etiket_indeksi(["x", "y", "w"], yol)
+    assert kodlanan == []
+
+    nc.etiket_indeksi(["x", "w"], yol)  # artık etiketli olmayan sorgu → baştan kurulur
+    assert kodlanan == [["x", "w"]]
+
+def test_en_yakin_etiketli_sorgudan_niyet(kodlanan):
+    def llm(sorgular):
+        raise AssertionError(f"LLM'e gitmemeliydi: {sorgular}")
+
+    sonuc = nc.niyetleri_coz(["z", "x"], llm=llm, kanonik_esik=0.99,
+                             etiketler={"x": "reklam vermek", "y": "reklam ver"}, kaydet=False)
+    assert sonuc == ["reklam ver", "reklam vermek"]
+
+def test_parti_ici_birlestirme_onbellekle_ayni(monkeypatch, kodlanan):
+    yazilan = {}
+    monkeypatch.setattr(nc, "_onbellege_yaz", lambda yeni: yazilan.update(yeni))
+    # x üç kez "reklam vermek"; y ve z (y'ye bağlanır) "reklam ver" → parti içinde "reklam vermek"e indirgenir
+    sorgular = ["x", "x", "x", "y", "z"]
+    sonuc = nc.niyetleri_coz(sorgular, llm=lambda s: [], esik=0.92, kanonik_esik=0.90,
+                             etiketler={"x": "reklam vermek", "y": "reklam ver"})
+    assert sonuc == ["reklam vermek"] * 5
+    assert yazilan["z"] == "reklam vermek"
+    donen = dict(zip(sorgular, sonuc))
+    assert all(donen[k] == n for k, n in yazilan.items())
+
+@pytest.mark.parametrize("etiketler", [{}, {"x": "reklam vermek"}])
+def test_uc_ve_fazla_etiketsiz_sorgu(kodlanan, etiketler):
+    # y ve z birbirine yakın: z, partide LLM'e gidecek y'nin niyetini alır; w ve "reklam ver" ayrı sorulur
+    sorulan = []
+
+    def llm(sorgular):
+        sorulan.extend(sorgular)
+        return [f"niyet {s}" for s in sorgular]
+
+    sorgular = ["y", "w", "z", "reklam ver"]
+    sonuc = nc.niyetleri_coz(sorgular, llm=llm, kanonik_esik=0.99, etiketler=dict(etiketler), kaydet=False)
+    assert sorulan == ["y", "w", "reklam ver"]
+    assert sonuc == ["niyet y", "niyet w", "niyet y", "niyet reklam ver"]
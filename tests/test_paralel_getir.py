@@ -0,0 +1,123 @@
+# paralel_getir.getir_hepsi — yerel http.server üzerinde sıra, host başına sınır ve zaman aşımı sonuçları
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from modules.paralel_getir import _http_get, aktif_saat, getir_hepsi_sync
+
+class _Sunucu(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Isleyici)
+        self.mu = threading.Lock()
+        self.ucusta = defaultdict(int)      # host -> şu an işlenen istek
+        self.tepe = defaultdict(int)        # host -> en yüksek eş zamanlı istek
+        self.baslangic = defaultdict(list)  # host -> istek başlangıç zamanları
+
+class _Isleyici(BaseHTTPRequestHandler):
+    def do_GET(self):
+        sv, host = self.server, self.headers.get("Host")
+        with sv.mu:
+            sv.ucusta[host] += 1
+            sv.tepe[host] = max(sv.tepe[host], sv.ucusta[host])
+            sv.baslangic[host].append(time.monotonic())
+        try:
+            q = parse_qs(urlparse(self.path).query)
+            time.sleep(float(q.get("uyu", ["0"])[0]))
+            kod = int(q.get("kod", ["200"])[0])
+            govde = self.path.encode("utf-8")
+            self.send_response(kod)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(govde)))
+            self.end_headers()
+            self.wfile.write(govde)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with sv.mu:
+                sv.ucusta[host] -= 1
+
+    def log_message(self, *a):
+        pass
+
+@pytest.fixture
+def sunucu():
+    sv = _Sunucu()
+    t = threading.Thread(target=sv.serve_forever, daemon=True)
+    t.start()
+    yield sv
+    sv.shutdown()
+    sv.server_close()
+
+def _adresler(sv):
+    port = sv.server_address[1]
+    # iki farklı host: 127.0.0.1 ve localhost aynı sunucuya gider, host kapıları ayrıdır
+    return f"http://127.0.0.1:{port}", f"http://localhost:{port}"
+
+def test_sonuclar_giris_sirasiyla(sunucu):
+    a, b = _adresler(sunucu)
+    urls = [f"{a}/1?uyu=0.3", f"{b}/2?uyu=0.05", f"{a}/3", f"{b}/4?uyu=0.1"]
+    sonuclar = getir_hepsi_sync(urls, _http_get, esz_zamanli=4, host_limit=2, host_bekleme=0)
+    assert [s.url for s in sonuclar] == urls
+    assert all(s.ok for s in sonuclar)
+    assert [s.icerik for s in sonuclar] == [urlparse(u).path + ("?" + urlparse(u).query if urlparse(u).query else "")
+                                            for u in urls]
+
+def test_host_basina_sinir_ve_bekleme(sunucu):
+    a, b = _adresler(sunucu)
+    urls = [f"{a}/{i}?uyu=0.1" for i in range(3)] + [f"{b}/{i}?uyu=0.1" for i in range(3)]
+    t0 = time.monotonic()
+    sonuclar = getir_hepsi_sync(urls, _http_get, esz_zamanli=4, host_limit=1, host_bekleme=0.2)
+    sure = time.monotonic() - t0
+    assert all(s.ok for s in sonuclar)
+    for host, tepe in sunucu.tepe.items():
+        assert tepe == 1, host
+        bas = sunucu.baslangic[host]
+        assert all(y - x >= 0.19 for x, y in zip(bas, bas[1:])), (host, bas)
+    # iki host paralel ilerler: 3 istek × (0.1 işlem + 0.2 bekleme) ≈ 0.7 sn; sıralı olsaydı ≈ 1.5 sn
+    assert sure < 1.2
+
+def test_zaman_asimi_ve_hata_durumlari(sunucu):
+    a, _ = _adresler(sunucu)
+    urls = [f"{a}/hizli", f"{a}/yavas?uyu=2", f"{a}/yok?kod=404"]
+    sonuclar = getir_hepsi_sync(urls, _http_get, esz_zamanli=3, host_limit=3, host_bekleme=0, url_timeout=0.5)
+    assert [s.durum for s in sonuclar] == ["ok", "zaman_asimi", "hata"]
+    assert "404" in sonuclar[2].hata
+    assert sonuclar[1].sure_ms < 1500
+
+def test_toplam_zaman_asimi(sunucu):
+    a, _ = _adresler(sunucu)
+    urls = [f"{a}/1?uyu=0.1", f"{a}/2?uyu=0.1", f"{a}/3?uyu=0.1", f"{a}/4?uyu=0.1"]
+    sonuclar = getir_hepsi_sync(urls, _http_get, esz_zamanli=1, host_limit=1, host_bekleme=0.3,
+                                toplam_timeout=0.5)
+    durumlar = [s.durum for s in sonuclar]
+    assert durumlar[0] == "ok"
+    assert durumlar[-1] == "toplam_zaman_asimi"
+
+def test_asilmis_istegin_arkasindaki_kuyruk_sureye_sayilmaz(sunucu):
+    # tek işçi: ilk URL zaman aşımına düşse de thread'de sürer; arkasındaki URL'ler
+    # executor kuyruğunda beklerken süreleri işlemez, kendi 0.5 sn'lerini alırlar
+    a, _ = _adresler(sunucu)
+    urls = [f"{a}/takili?uyu=1.2", f"{a}/1?uyu=0.1", f"{a}/2?uyu=0.1"]
+    sonuclar = getir_hepsi_sync(urls, _http_get, esz_zamanli=1, host_limit=1, host_bekleme=0, url_timeout=0.5)
+    assert [s.durum for s in sonuclar] == ["zaman_asimi", "ok", "ok"]
+
+def test_baska_kuyrukta_beklenen_sure_sayilmaz(sunucu):
+    # tarayıcı havuzu gibi: iş kuyruğa devredilirken saat durur, iş başlayınca yeniden başlar
+    a, _ = _adresler(sunucu)
+
+    def fetch(url):
+        saat = aktif_saat()
+        saat.durdur()
+        time.sleep(0.8)  # havuz slotu bekleniyor
+        saat.baslat()
+        return _http_get(url)
+
+    sonuclar = getir_hepsi_sync([f"{a}/1?uyu=0.1"], fetch, url_timeout=0.5, host_bekleme=0)
+    assert sonuclar[0].ok
+    assert aktif_saat() is None
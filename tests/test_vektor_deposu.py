@@ -0,0 +1,22 @@
+# vektor_deposu.EmbeddingStore — tahliye en son kullanılanları (bu oturumda okunanlar dahil) tutar
+import time
+
+import numpy as np
+
+from modules.vektor_deposu import EmbeddingStore
+
+def _v(i):
+    return np.full(4, i, np.float32)
+
+def test_tahliye_bu_oturumda_okunani_tutar(tmp_path):
+    # 3 vektörlük kapasite; tahliye 0.8 × 3 → 2 vektöre iner
+    depo = EmbeddingStore("test-model", root=str(tmp_path), max_bytes=3 * 4 * 4)
+    for i, k in enumerate("abc"):
+        depo.put_many({k: _v(i)})
+        time.sleep(0.01)
+    assert set(depo.get_many(["a"])) == {"a"}  # a en eski yazılan ama yeni okundu
+    time.sleep(0.01)
+    depo.put_many({"d": _v(3)})
+    kalan = depo.get_many(list("abcd"))
+    assert set(kalan) == {"a", "d"}
+    np.testing.assert_array_equal(kalan["a"], _v(0))
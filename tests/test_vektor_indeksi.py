@@ -0,0 +1,39 @@
+# vektor_indeksi.IVFIndex — küçük artımlarla büyüyen indeks kümelerini yeniden eğitir
+import numpy as np
+
+from modules.vektor_indeksi import IVF_YENIDEN_EGIT, ExactIndex, IVFIndex, vektor_indeksi_yukle
+
+def _veri(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    merkez = rng.normal(size=(20, dim))
+    return (merkez[rng.integers(20, size=n)] + 0.3 * rng.normal(size=(n, dim))).astype(np.float32)
+
+def test_artimli_buyumede_yeniden_egitilir(tmp_path):
+    P = _veri(400)
+    ix = IVFIndex(P.shape[1])
+    ix.add(P[:4], ids=np.arange(4))
+    ilk_nlist = ix.nlist
+    for bas in range(4, len(P), 4):  # niyet etiket indeksi gibi küçük partiler
+        ix.add(P[bas:bas + 4], ids=np.arange(bas, bas + 4))
+    assert ix.nlist > ilk_nlist
+    assert ix.egitim_n * IVF_YENIDEN_EGIT > len(ix)
+    assert np.bincount(ix._assign, minlength=ix.nlist).max() < len(P) / 2
+
+    ref = ExactIndex(P.shape[1])
+    ref.add(P)
+    Q = _veri(50, seed=1)
+    _, beklenen = ref.search(Q, k=1)
+    _, bulunan = ix.search(Q, k=1, nprobe=ix.nlist)
+    np.testing.assert_array_equal(bulunan, beklenen)
+
+    ix.save(str(tmp_path / "ivf"))
+    yuklu = vektor_indeksi_yukle(str(tmp_path / "ivf"))
+    assert (yuklu.nlist, yuklu.egitim_n, yuklu.nlist_istenen) == (ix.nlist, ix.egitim_n, None)
+
+def test_istenen_nlist_korunur():
+    P = _veri(200)
+    ix = IVFIndex(P.shape[1], nlist=8)
+    ix.add(P[:5])
+    assert ix.nlist == 5  # ilk partide vektör sayısıyla sınırlı
+    ix.add(P[5:])
+    assert ix.nlist == 8